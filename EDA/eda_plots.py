@@ -0,0 +1,303 @@
+import pandas as pd
+import numpy as np
+import plotly.express as px
+
+
+def operations_plots(Log_df, periodos_modelo, periods_before_eow, EOW= True):
+    # maximos/minimos para rangos del eje Y
+    x_max = Log_df.loc[Log_df["var"] == "x"].value.max()
+    x_min = Log_df.loc[Log_df["var"] == "x"].value.min()
+    y_max = Log_df.loc[Log_df["var"] == "y"].value.max()
+    y_min = Log_df.loc[Log_df["var"] == "y"].value.min()
+
+    stock_t0 = Log_df.loc[(Log_df["var"] == "x") & (Log_df["t"] == 0)].sort_values(
+        by=["class", "age"], ascending=[True, False]
+    )
+    fig0 = px.bar(
+        stock_t0,
+        x="class",
+        y="value",
+        color="age",
+        color_continuous_scale="brwnyl",
+        title="stock inicial por clase",
+        range_x=[0, 2],
+        range_y=[0, stock_t0.groupby("class").sum().max()["value"]],
+    )
+
+    fig0.update_traces(width=0.8)
+    fig0.update_layout(
+        height=500,
+        width=600,
+        xaxis_title="Clases",
+        yaxis_title="stock",
+    )
+    fig0.show()
+
+    ######################
+
+    stock_tn_before_eow = Log_df.loc[
+        (Log_df["var"].isin(["x", "y"])) & (Log_df["t"] == periods_before_eow)
+    ].sort_values(by=["class", "age"], ascending=[True, False])
+
+    stock_tn_before_eow["value"] = np.where(
+        stock_tn_before_eow["var"] == "y",
+        stock_tn_before_eow["value"] * -1,
+        stock_tn_before_eow["value"],
+    )
+    stock_tn_before_eow = (
+        stock_tn_before_eow.groupby(["t", "age", "class"]).sum().reset_index()
+    )
+
+    if EOW:
+
+        fign = px.bar(
+            stock_tn_before_eow,
+            x="class",
+            y="value",
+            color="age",
+            color_continuous_scale="brwnyl",
+            title="stock before EOW por clase",
+            range_x=[0, 2],
+            range_y=[0, stock_tn_before_eow.groupby("class").sum().max()["value"]],
+        )
+        fign.update_traces(width=0.8)
+        fign.update_layout(
+            height=500,
+            width=600,
+            xaxis_title="Clases",
+            yaxis_title="stock",
+        )
+        fign.show()
+
+    ######################
+
+    stock_tn = Log_df.loc[
+        (Log_df["var"].isin(["x", "y"])) & (Log_df["t"] == periodos_modelo)
+    ].sort_values(by=["class", "age"], ascending=[True, False])
+
+    stock_tn["value"] = np.where(
+        stock_tn["var"] == "y", stock_tn["value"] * -1, stock_tn["value"]
+    )
+    stock_tn = stock_tn.groupby(["t", "age", "class"]).sum().reset_index()
+    fign = px.bar(
+        stock_tn,
+        x="class",
+        y="value",
+        color="age",
+        color_continuous_scale="brwnyl",
+        title="stock final por clase",
+        range_x=[0, 2],
+        range_y=[0, stock_tn.groupby("class").sum().max()["value"]],
+    )
+    fign.update_traces(width=0.8)
+    fign.update_layout(
+        height=500,
+        width=600,
+        xaxis_title="Clases",
+        yaxis_title="stock",
+    )
+    fign.show()
+
+    ######################
+
+    stock = Log_df.loc[(Log_df["var"] == "x")].sort_values(by=["class", "age"], ascending=[True, False])
+    fig1 = px.bar(
+        stock,
+        x="t",
+        y="value",
+        color="age",
+        color_continuous_scale="brwnyl",
+        facet_col="class",
+        title="stock por edad y clase",
+        range_x=[0, periodos_modelo],
+        range_y=[0, x_max],
+    )
+
+    fig1.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
+
+    fig1.update_traces(width=1)
+    fig1.update_layout(
+        xaxis_title="tiempo",
+        xaxis2_title="tiempo",
+        xaxis3_title="tiempo",
+        yaxis_title="cantidad",
+    )
+    fig1.show()
+
+    ######################
+
+    ventas = Log_df.loc[(Log_df["var"] == "y")]
+
+    fig2 = px.bar(
+        ventas,
+        x="t",
+        y="value",
+        color="age",
+        color_continuous_scale="Blugrn",
+        facet_col="class",
+        title="ventas por edad y clase",
+        range_x=[0, periodos_modelo],
+        range_y=[0, y_max],
+    )
+
+    fig2.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
+
+    fig2.update_traces(width=2)
+    fig2.update_layout(
+        xaxis_title="tiempo",
+        xaxis2_title="tiempo",
+        xaxis3_title="tiempo",
+        yaxis_title="cantidad",
+    )
+    fig2.show()
+
+    ######################
+
+    trasp_df = Log_df.loc[Log_df["var"] == "w"].sort_values(by="t")
+    nacimientos_df = (
+        Log_df.loc[Log_df["var"] == "n"].sort_values(by="t").drop("class", axis=1)
+    )
+    nacimientos_df = nacimientos_df.rename(columns={"age": "class"})
+    nacimientos_df["class"] = nacimientos_df["class"].astype(str)
+
+    try:
+        # nacimientos barplot
+        fig4 = px.bar(
+            x=nacimientos_df.t,
+            y=nacimientos_df.value,
+            range_x=[-5, periodos_modelo],
+            color=nacimientos_df["class"],
+            title="nacimientos por clase",
+            color_discrete_sequence=px.colors.qualitative.T10,
+        )
+
+        fig4.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
+
+        fig4.update_traces(width=2)
+        fig4.update_layout(
+            height=500, width=600, xaxis_title="tiempo", yaxis_title="cantidad"
+        )
+        fig4.show()
+    except ValueError:
+        pass
+
+    ######################
+
+    try:
+        # traspasos barplot
+        fig3 = px.bar(
+            x=trasp_df.t,
+            y=trasp_df.value,
+            range_x=[-5, periodos_modelo],
+            title="traspasos de clase 2 a 3",
+            color_discrete_sequence=px.colors.qualitative.Vivid,
+        )
+
+        fig3.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
+
+        fig3.update_traces(width=2)
+        fig3.update_layout(
+            height=500, width=600, xaxis_title="tiempo", yaxis_title="cantidad"
+        )
+        fig3.show()
+    except ValueError:
+        pass
+
+
+def objective_function_plots(Log_df, periodos_modelo, periods_before_eow):
+    group_obj_func = (
+        Log_df.groupby(["var", "t"])["impact_on_obj_func"].sum().reset_index()
+    )
+
+    # total value per period
+    obj_sum = (
+        group_obj_func.groupby("t")
+        .sum()
+        .rename(columns={"impact_on_obj_func": "impact_on_obj_func"})
+    )
+    obj_sum["var"] = "total"
+    obj_sum.reset_index(inplace=True)
+
+    # CUIDADO, AGREGO EL TOTAL COMO UNA VARIABLE MAS, NO USAR PARA OTRAS COSAS
+    # PORQUE TIENE INFORMACION DUPLICADA
+    group_obj_func_2 = pd.concat([group_obj_func, obj_sum], axis=0)
+    group_obj_func_2 = group_obj_func_2.loc[group_obj_func_2.impact_on_obj_func != 0]
+    fig = px.line(
+        x=group_obj_func_2.t,
+        y=group_obj_func_2.impact_on_obj_func,
+        color=group_obj_func_2["var"],
+        range_x=[-5, periodos_modelo],
+        title="variacion de funcion de ganancia",
+    )
+
+    fig.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
+
+    fig.update_layout(xaxis_title="tiempo", yaxis_title="impacto funcion objetivo")
+    fig.show()
+
+    cumsum_df = Log_df.groupby("t").sum()['impact_on_obj_func'].reset_index()
+    cumsum_df["cumsum_obj_func"] = cumsum_df["impact_on_obj_func"].cumsum()
+    
+    fig2 = px.line(
+        cumsum_df, x="t", y="cumsum_obj_func", title="ganancia acumulada en el tiempo"
+    )
+
+    fig2.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
+
+    fig2.update_layout(xaxis_title="tiempo", yaxis_title="funcion objetivo acumulada")
+    fig2.show()
+
+
+def get_business_sales(business_sales_path, experiment, experiment_results, filter_from = '01/01/2019'):
+    df_sales = pd.read_csv(business_sales_path)
+    df_sales["FECHA"] = pd.to_datetime(df_sales["FECHA"], format="%Y-%m-%d")
+    df_sales = df_sales.loc[df_sales['FECHA'] > filter_from]
+
+    df_sales = df_sales.melt(
+        id_vars=["FECHA"],
+        value_vars=[
+            "VACAS",
+            "VAQUILLONAS270",
+            "NOVILLITOS391",
+            "NOVILLITOS300",
+            "TOROS",
+            "TERNEROS_DESTETE",
+            "TERNERAS_DESTETE",
+        ],
+        var_name="class",
+        value_name="value",
+    )
+
+    desde = pd.to_datetime(
+        experiment_results[experiment]["fecha_inicio"], format="%d/%m/%Y"
+    )
+    hasta = pd.to_datetime(
+        experiment_results[experiment]["fecha_fin_ejercicio"], format="%d/%m/%Y"
+    )
+
+    # df_sales = df_sales.loc[(df_sales["FECHA"] >= desde) & (df_sales["FECHA"] <= hasta)]
+
+    # Set the desired colors for each category
+    colors = {
+        "VACAS": "green",
+        "VAQUILLONAS270": "orange",
+        "NOVILLITOS391": "darkblue",
+        "NOVILLITOS300": "blue",
+        "TERNEROS_DESTETE": "fuchsia",
+        "TERNERAS_DESTETE": "lightpink",
+    }
+
+    fig2 = px.bar(
+        df_sales,
+        x="FECHA",
+        y="value",
+        color="class",
+        color_discrete_map=colors,  # Set the desired colors using color_discrete_map
+        title="ventas por categoria negocio"
+    )
+
+    fig2.add_vline(x=desde, line_dash="dash", line_color="red")
+    fig2.add_vline(x=hasta, line_dash="dash", line_color="red")
+
+
+    fig2.show()
@@ -1,68 +1,220 @@
+import importlib
+import os
 import pandas as pd
 import numpy as np
 import warnings
-import plotly.express as px
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
 warnings.filterwarnings("ignore")
 
+# graficos en eda_plots (plotly), se importan recien cuando se piden:
+# "from eda_utils import operations_plots" sigue andando sin cargar plotly en los runners
+PLOT_FUNCTIONS = ("operations_plots", "objective_function_plots", "get_business_sales")
 
-def read_text_file(file_name):
-    with open(file_name, "r") as f:
-        return f.read()
 
+def __getattr__(name):
+    if name in PLOT_FUNCTIONS:
+        package = __name__.rpartition(".")[0]
+        plots = importlib.import_module(f"{package}.eda_plots" if package else "eda_plots")
+        return getattr(plots, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def get_line_number_with_string(file_name, string):
-    with open(file_name, "r") as f:
-        for i, line in enumerate(f):
-            if string in line:
-                return i
 
+def _index_column(values, n_fields, position):
+    # indices ausentes (w#t#e no tiene clase, s#t no tiene edad ni clase) quedan como NA
+    return pd.arrays.IntegerArray(
+        np.array(values, dtype=np.int64), np.array(n_fields) <= position
+    )
 
-def select_line_number(raw, line_nr):
-    return raw.split("\n")[line_nr]
 
+def parse_scip_log(log_file_path):
+    """
+    Single pass over a SCIP log, splitting the variable names while streaming.
+
+    Returns:
+        tuple (objective value, DataFrame with variable, var, t, age, class, value
+        and unit_impact_on_obj_func columns). t/age/class hold the positional
+        "#" indices as integers, same positions format_log_df used to split.
+    """
+    objective_value = None
+    variables, var, t, age, clase, n_fields, values, coefs = ([] for _ in range(8))
+
+    with open(log_file_path, "r") as f:
+        # la solucion empieza en "objective value:", con o sin el encabezado que imprime -f
+        # (display solution en el shell interactivo no lo imprime)
+        for line in f:
+            if line.startswith("objective value:"):
+                objective_value = float(line.split()[-1])
+                break
+
+        # x#1#7#1     156 \t(obj:-10.27), hasta la linea en blanco antes de Statistics
+        for line in f:
+            if "(obj:" not in line:
+                break
+            variable, value, coef = line.split()
+            fields = variable.split("#")
+            n_fields.append(len(fields))
+            fields += ["0"] * (4 - len(fields))
+
+            variables.append(variable)
+            var.append(fields[0])
+            t.append(int(fields[1]))
+            age.append(int(fields[2]))
+            clase.append(int(fields[3]))
+            values.append(float(value))
+            coefs.append(float(coef[5:-1]))
+
+    Log_df = pd.DataFrame(
+        {
+            "variable": variables,
+            "var": var,
+            "t": _index_column(t, n_fields, 1),
+            "age": _index_column(age, n_fields, 2),
+            "class": _index_column(clase, n_fields, 3),
+            "value": np.array(values, dtype=np.float64),
+            "unit_impact_on_obj_func": np.array(coefs, dtype=np.float64),
+        }
+    )
 
-def read_scip_log(log_file_path):
-    Log_df = pd.DataFrame()
+    return objective_value, Log_df
+
+
+# campos del resumen que scip imprime al terminar de resolver, primera aparicion
+SCIP_STATS_FIELDS = {
+    "SCIP Status": "status",
+    "Solving Time (sec)": "solving_time",
+    "Solving Nodes": "nodes",
+    "Primal Bound": "primal_bound",
+    "Dual Bound": "dual_bound",
+    "Gap": "gap",
+    "First Solution": "first_solution",
+}
+
+
+def parse_scip_stats(log_file_path):
+    """
+    Solve summary of a SCIP log: status, solving time, nodes, bounds and gap (%), plus the
+    first incumbent and the seconds it took (first_solution_time) from the statistics.
+
+    Fields missing from the log (e.g. an interrupted run) are left as None.
+    """
+    stats = dict.fromkeys(list(SCIP_STATS_FIELDS.values()) + ["first_solution_time"])
+
+    with open(log_file_path, "r") as f:
+        for line in f:
+            name, sep, raw = line.partition(":")
+            field = SCIP_STATS_FIELDS.get(name.strip())
+            if not sep or field is None or stats[field] is not None:
+                continue
+
+            raw = raw.strip()
+            if field == "status":
+                stats[field] = raw
+            elif field == "nodes":
+                stats[field] = int(raw.split()[0])
+            elif field == "first_solution":
+                # +1.54e+05   (in run 1, after 1 nodes, 0.27 seconds, depth 13, found by <locks>)
+                if "seconds" in raw:
+                    stats[field] = float(raw.split()[0])
+                    stats["first_solution_time"] = float(raw.split(" seconds")[0].split()[-1])
+            elif raw.startswith("infinite"):
+                stats[field] = float("inf")
+            else:
+                stats[field] = float(raw.split()[0])
+
+            if all(v is not None for v in stats.values()):
+                break
+
+    return stats
+
+
+def bands_file(log_file_path):
+    """
+    Path of the bands saved next to the log of an age-banded model (AgeBands.save).
+    """
+    return f"{os.path.splitext(log_file_path)[0]}_bands.npz"
+
+
+def expand_bands(log_file_path, Log_df):
+    """
+    Per-age solution of a log: a banded model logs one x per band, expanded with the bands
+    saved next to the log (AgeBands.expand_log). Logs without bands are returned as is.
+    """
+    path = bands_file(log_file_path)
+    if Log_df.empty or not os.path.exists(path):
+        return Log_df
+
+    # solo los logs por bandas necesitan preprocessing
+    from preprocessing.AgeBands import AgeBands
+
+    bands, initial_stock = AgeBands.load(path)
+    return bands.expand_log(Log_df, initial_stock)
+
+
+def _solution_store():
+    package = __name__.rpartition(".")[0]
+    return importlib.import_module(f"{package}.solution_store" if package else "solution_store")
+
+
+def read_scip_log(log_file_path, store_dir=None):
+    """
+    Solution of a SCIP log, as parse_scip_log returns it, per age for banded models
+    (see expand_bands).
+
+    With store_dir, the solution is read from the solution store (see solution_store.py)
+    when the log is ingested there and didn't change since, and parsed otherwise. Stored
+    solutions keep the compact dtypes of the store and have no "variable" column.
+    """
+    Log_df = None
+    if store_dir is not None:
+        Log_df = _solution_store().stored_log(log_file_path, store_dir)
+    if Log_df is None:
+        Log_df = expand_bands(log_file_path, parse_scip_log(log_file_path)[1])
+
+    # log sin solucion: df vacio sin columnas, format_log_df levanta KeyError como antes
+    if Log_df.empty:
+        return pd.DataFrame()
 
-    raw = read_text_file(log_file_path)
-    results_line_nr = get_line_number_with_string(
-        log_file_path, "================================="
-    )
+    return Log_df
 
-    # once per log
-    objective_value = select_line_number(raw, results_line_nr + 2).split(" ")[-1]
 
-    row_from = (
-        get_line_number_with_string(log_file_path, "=================================")
-        + 3
-    )
-    row_to = get_line_number_with_string(log_file_path, "Statistics") - 2
-
-    # multiple times per log
-    for line_nr in range(row_from, row_to + 1):
-        variable = select_line_number(raw, line_nr).split(" ")[0]
-        value = select_line_number(raw, line_nr).split(" ")[-2]
-        unit_impact_on_obj_func = select_line_number(raw, line_nr).split(" ")[-1][6:-1]
-        row_data = pd.Series(
-            {
-                "variable": variable,
-                "value": value,
-                "unit_impact_on_obj_func": unit_impact_on_obj_func,
-            }
-        )
-        Log_df = pd.concat([Log_df, pd.DataFrame([row_data])], ignore_index=True)
+def write_scip_sol(log_file_path, sol_file_path, drop_vars=()):
+    """
+    Write the solution of a SCIP log as a .sol file, readable with SCIP's "read" command.
 
-    return Log_df
+    Args:
+        drop_vars: variable names (e.g. "k") left out, for models that don't declare them
+
+    Returns:
+        sol_file_path, or None if the log has no solution
+    """
+    objective_value, Log_df = parse_scip_log(log_file_path)
+    if objective_value is None:
+        return None
+
+    Log_df = Log_df.loc[~Log_df["var"].isin(drop_vars)]
+    with open(sol_file_path, "w") as f:
+        f.write(f"objective value: {objective_value}\n")
+        for variable, value in zip(Log_df["variable"], Log_df["value"]):
+            f.write(f"{variable} {value}\n")
+
+    return sol_file_path
 
 
 def format_log_df(Log_df):
-    Log_df["var"] = Log_df["variable"].str.split("#").str[0]
-    Log_df["t"] = Log_df["variable"].str.split("#").str[1]
-    Log_df["age"] = Log_df["variable"].str.split("#").str[2]
-    Log_df["class"] = Log_df["variable"].str.split("#").str[3]
+    if "var" not in Log_df:
+        # df armado a mano con solo variable/value/unit_impact_on_obj_func
+        fields = Log_df["variable"].str.split("#")
+        Log_df["var"] = fields.str[0]
+        Log_df["t"] = fields.str[1]
+        Log_df["age"] = fields.str[2]
+        Log_df["class"] = fields.str[3]
+    else:
+        # mismas etiquetas que el split de strings: "nan" para w/n que no tienen clase
+        Log_df["class"] = np.where(
+            Log_df["class"].isna(), np.nan, Log_df["class"].astype(object)
+        )
 
     Log_df = Log_df[["t", "var", "age", "class", "value", "unit_impact_on_obj_func"]]
     Log_df = Log_df.loc[Log_df["var"].isin(["x", "y", "w", "n"])]
@@ -142,251 +294,6 @@ def format_log_df(Log_df):
     return Log_df
 
 
-def operations_plots(Log_df, periodos_modelo, periods_before_eow, EOW= True):
-    # maximos/minimos para rangos del eje Y
-    x_max = Log_df.loc[Log_df["var"] == "x"].value.max()
-    x_min = Log_df.loc[Log_df["var"] == "x"].value.min()
-    y_max = Log_df.loc[Log_df["var"] == "y"].value.max()
-    y_min = Log_df.loc[Log_df["var"] == "y"].value.min()
-
-    stock_t0 = Log_df.loc[(Log_df["var"] == "x") & (Log_df["t"] == 0)].sort_values(
-        by=["class", "age"], ascending=[True, False]
-    )
-    fig0 = px.bar(
-        stock_t0,
-        x="class",
-        y="value",
-        color="age",
-        color_continuous_scale="brwnyl",
-        title="stock inicial por clase",
-        range_x=[0, 2],
-        range_y=[0, stock_t0.groupby("class").sum().max()["value"]],
-    )
-
-    fig0.update_traces(width=0.8)
-    fig0.update_layout(
-        height=500,
-        width=600,
-        xaxis_title="Clases",
-        yaxis_title="stock",
-    )
-    fig0.show()
-
-    ######################
-
-    stock_tn_before_eow = Log_df.loc[
-        (Log_df["var"].isin(["x", "y"])) & (Log_df["t"] == periods_before_eow)
-    ].sort_values(by=["class", "age"], ascending=[True, False])
-
-    stock_tn_before_eow["value"] = np.where(
-        stock_tn_before_eow["var"] == "y",
-        stock_tn_before_eow["value"] * -1,
-        stock_tn_before_eow["value"],
-    )
-    stock_tn_before_eow = (
-        stock_tn_before_eow.groupby(["t", "age", "class"]).sum().reset_index()
-    )
-
-    if EOW:
-
-        fign = px.bar(
-            stock_tn_before_eow,
-            x="class",
-            y="value",
-            color="age",
-            color_continuous_scale="brwnyl",
-            title="stock before EOW por clase",
-            range_x=[0, 2],
-            range_y=[0, stock_tn_before_eow.groupby("class").sum().max()["value"]],
-        )
-        fign.update_traces(width=0.8)
-        fign.update_layout(
-            height=500,
-            width=600,
-            xaxis_title="Clases",
-            yaxis_title="stock",
-        )
-        fign.show()
-
-    ######################
-
-    stock_tn = Log_df.loc[
-        (Log_df["var"].isin(["x", "y"])) & (Log_df["t"] == periodos_modelo)
-    ].sort_values(by=["class", "age"], ascending=[True, False])
-
-    stock_tn["value"] = np.where(
-        stock_tn["var"] == "y", stock_tn["value"] * -1, stock_tn["value"]
-    )
-    stock_tn = stock_tn.groupby(["t", "age", "class"]).sum().reset_index()
-    fign = px.bar(
-        stock_tn,
-        x="class",
-        y="value",
-        color="age",
-        color_continuous_scale="brwnyl",
-        title="stock final por clase",
-        range_x=[0, 2],
-        range_y=[0, stock_tn.groupby("class").sum().max()["value"]],
-    )
-    fign.update_traces(width=0.8)
-    fign.update_layout(
-        height=500,
-        width=600,
-        xaxis_title="Clases",
-        yaxis_title="stock",
-    )
-    fign.show()
-
-    ######################
-
-    stock = Log_df.loc[(Log_df["var"] == "x")].sort_values(by=["class", "age"], ascending=[True, False])
-    fig1 = px.bar(
-        stock,
-        x="t",
-        y="value",
-        color="age",
-        color_continuous_scale="brwnyl",
-        facet_col="class",
-        title="stock por edad y clase",
-        range_x=[0, periodos_modelo],
-        range_y=[0, x_max],
-    )
-
-    fig1.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
-
-    fig1.update_traces(width=1)
-    fig1.update_layout(
-        xaxis_title="tiempo",
-        xaxis2_title="tiempo",
-        xaxis3_title="tiempo",
-        yaxis_title="cantidad",
-    )
-    fig1.show()
-
-    ######################
-
-    ventas = Log_df.loc[(Log_df["var"] == "y")]
-
-    fig2 = px.bar(
-        ventas,
-        x="t",
-        y="value",
-        color="age",
-        color_continuous_scale="Blugrn",
-        facet_col="class",
-        title="ventas por edad y clase",
-        range_x=[0, periodos_modelo],
-        range_y=[0, y_max],
-    )
-
-    fig2.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
-
-    fig2.update_traces(width=2)
-    fig2.update_layout(
-        xaxis_title="tiempo",
-        xaxis2_title="tiempo",
-        xaxis3_title="tiempo",
-        yaxis_title="cantidad",
-    )
-    fig2.show()
-
-    ######################
-
-    trasp_df = Log_df.loc[Log_df["var"] == "w"].sort_values(by="t")
-    nacimientos_df = (
-        Log_df.loc[Log_df["var"] == "n"].sort_values(by="t").drop("class", axis=1)
-    )
-    nacimientos_df = nacimientos_df.rename(columns={"age": "class"})
-    nacimientos_df["class"] = nacimientos_df["class"].astype(str)
-
-    try:
-        # nacimientos barplot
-        fig4 = px.bar(
-            x=nacimientos_df.t,
-            y=nacimientos_df.value,
-            range_x=[-5, periodos_modelo],
-            color=nacimientos_df["class"],
-            title="nacimientos por clase",
-            color_discrete_sequence=px.colors.qualitative.T10,
-        )
-
-        fig4.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
-
-        fig4.update_traces(width=2)
-        fig4.update_layout(
-            height=500, width=600, xaxis_title="tiempo", yaxis_title="cantidad"
-        )
-        fig4.show()
-    except ValueError:
-        pass
-
-    ######################
-
-    try:
-        # traspasos barplot
-        fig3 = px.bar(
-            x=trasp_df.t,
-            y=trasp_df.value,
-            range_x=[-5, periodos_modelo],
-            title="traspasos de clase 2 a 3",
-            color_discrete_sequence=px.colors.qualitative.Vivid,
-        )
-
-        fig3.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
-
-        fig3.update_traces(width=2)
-        fig3.update_layout(
-            height=500, width=600, xaxis_title="tiempo", yaxis_title="cantidad"
-        )
-        fig3.show()
-    except ValueError:
-        pass
-
-
-def objective_function_plots(Log_df, periodos_modelo, periods_before_eow):
-    group_obj_func = (
-        Log_df.groupby(["var", "t"])["impact_on_obj_func"].sum().reset_index()
-    )
-
-    # total value per period
-    obj_sum = (
-        group_obj_func.groupby("t")
-        .sum()
-        .rename(columns={"impact_on_obj_func": "impact_on_obj_func"})
-    )
-    obj_sum["var"] = "total"
-    obj_sum.reset_index(inplace=True)
-
-    # CUIDADO, AGREGO EL TOTAL COMO UNA VARIABLE MAS, NO USAR PARA OTRAS COSAS
-    # PORQUE TIENE INFORMACION DUPLICADA
-    group_obj_func_2 = pd.concat([group_obj_func, obj_sum], axis=0)
-    group_obj_func_2 = group_obj_func_2.loc[group_obj_func_2.impact_on_obj_func != 0]
-    fig = px.line(
-        x=group_obj_func_2.t,
-        y=group_obj_func_2.impact_on_obj_func,
-        color=group_obj_func_2["var"],
-        range_x=[-5, periodos_modelo],
-        title="variacion de funcion de ganancia",
-    )
-
-    fig.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
-
-    fig.update_layout(xaxis_title="tiempo", yaxis_title="impacto funcion objetivo")
-    fig.show()
-
-    cumsum_df = Log_df.groupby("t").sum()['impact_on_obj_func'].reset_index()
-    cumsum_df["cumsum_obj_func"] = cumsum_df["impact_on_obj_func"].cumsum()
-    
-    fig2 = px.line(
-        cumsum_df, x="t", y="cumsum_obj_func", title="ganancia acumulada en el tiempo"
-    )
-
-    fig2.add_vline(x=periods_before_eow, line_dash="dash", line_color="red")
-
-    fig2.update_layout(xaxis_title="tiempo", yaxis_title="funcion objetivo acumulada")
-    fig2.show()
-
-
 def get_month_difference(start_date_ddmmyy, end_date_ddmmyy):
     start_date = datetime.strptime(start_date_ddmmyy, "%d/%m/%Y")
     end_date = datetime.strptime(end_date_ddmmyy, "%d/%m/%Y")
@@ -468,61 +375,6 @@ def get_revenue_before_eow(Log_df, periods_before_eow, PARAMS, experiment_result
 
     return obj_func_sum + sold_stock_quoted_sum, sold_stock_quoted_sum, stock_to_quote
 
-def get_business_sales(business_sales_path, experiment, experiment_results, filter_from = '01/01/2019'):
-    df_sales = pd.read_csv(business_sales_path)
-    df_sales["FECHA"] = pd.to_datetime(df_sales["FECHA"], format="%Y-%m-%d")
-    df_sales = df_sales.loc[df_sales['FECHA'] > filter_from]
-
-    df_sales = df_sales.melt(
-        id_vars=["FECHA"],
-        value_vars=[
-            "VACAS",
-            "VAQUILLONAS270",
-            "NOVILLITOS391",
-            "NOVILLITOS300",
-            "TOROS",
-            "TERNEROS_DESTETE",
-            "TERNERAS_DESTETE",
-        ],
-        var_name="class",
-        value_name="value",
-    )
-
-    desde = pd.to_datetime(
-        experiment_results[experiment]["fecha_inicio"], format="%d/%m/%Y"
-    )
-    hasta = pd.to_datetime(
-        experiment_results[experiment]["fecha_fin_ejercicio"], format="%d/%m/%Y"
-    )
-
-    # df_sales = df_sales.loc[(df_sales["FECHA"] >= desde) & (df_sales["FECHA"] <= hasta)]
-
-    # Set the desired colors for each category
-    colors = {
-        "VACAS": "green",
-        "VAQUILLONAS270": "orange",
-        "NOVILLITOS391": "darkblue",
-        "NOVILLITOS300": "blue",
-        "TERNEROS_DESTETE": "fuchsia",
-        "TERNERAS_DESTETE": "lightpink",
-    }
-
-    fig2 = px.bar(
-        df_sales,
-        x="FECHA",
-        y="value",
-        color="class",
-        color_discrete_map=colors,  # Set the desired colors using color_discrete_map
-        title="ventas por categoria negocio"
-    )
-
-    fig2.add_vline(x=desde, line_dash="dash", line_color="red")
-    fig2.add_vline(x=hasta, line_dash="dash", line_color="red")
-
-
-    fig2.show()
-
-
 def get_comparison_stats(Log_df, Log_df_h):
 
     # funcion objetivo
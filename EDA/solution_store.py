@@ -0,0 +1,225 @@
+"""
+Columnar store of SCIP solutions, so notebooks don't re-parse the .log files.
+
+Ingest once from the repo root:
+    python -m EDA.solution_store lp_logs_rev
+
+Then read_scip_log(path, store_dir) loads a log from the store with scan_solutions, and
+read_solution returns one experiment with the store's compact dtypes. Logs of banded models
+are stored per age (see eda_utils.expand_bands).
+
+Layout:
+    <store_dir>/solutions/experiment=<name>/part-0.parquet
+    <store_dir>/metadata.parquet    one row per experiment (objective, gap, time, nodes)
+"""
+import glob
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+if __package__:
+    from .eda_utils import expand_bands, parse_scip_log, parse_scip_stats
+else:
+    # importado como "solution_store" desde los notebooks de EDA/
+    from eda_utils import expand_bands, parse_scip_log, parse_scip_stats
+
+SOLUTION_SCHEMA = pa.schema(
+    [
+        ("var", pa.dictionary(pa.int8(), pa.string())),
+        ("t", pa.int16()),
+        ("age", pa.int16()),
+        ("class", pa.int8()),
+        ("value", pa.float64()),
+        ("unit_impact_on_obj_func", pa.float64()),
+    ]
+)
+
+METADATA_SCHEMA = pa.schema(
+    [
+        ("experiment", pa.string()),
+        ("objective", pa.float64()),
+        ("gap", pa.float64()),
+        ("solving_time", pa.float64()),
+        ("nodes", pa.int64()),
+        ("status", pa.string()),
+        ("log_mtime_ns", pa.int64()),
+    ]
+)
+
+EXPERIMENT_PARTITIONING = ds.partitioning(
+    pa.schema([("experiment", pa.string())]), flavor="hive"
+)
+
+# enteros nullable en pandas (w no tiene clase, s no tiene edad) en vez de float con NaN
+PANDAS_TYPES = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+}
+
+
+def default_store_dir(log_dir):
+    return os.path.join(log_dir, "solution_store")
+
+
+def _solutions_dir(store_dir):
+    return os.path.join(store_dir, "solutions")
+
+
+def _metadata_path(store_dir):
+    return os.path.join(store_dir, "metadata.parquet")
+
+
+def load_metadata(store_dir, experiments=None):
+    path = _metadata_path(store_dir)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=METADATA_SCHEMA.names)
+
+    filters = [("experiment", "in", list(experiments))] if experiments else None
+    return pq.read_table(path, filters=filters).to_pandas(
+        types_mapper=PANDAS_TYPES.get
+    )
+
+
+def ingest_log(log_file_path, store_dir):
+    experiment = os.path.splitext(os.path.basename(log_file_path))[0]
+    objective_value, Log_df = parse_scip_log(log_file_path)
+    Log_df = expand_bands(log_file_path, Log_df)
+    stats = parse_scip_stats(log_file_path)
+
+    table = pa.table(
+        {
+            "var": pa.array(Log_df["var"], pa.string()).dictionary_encode(),
+            "t": pa.array(Log_df["t"], pa.int16()),
+            "age": pa.array(Log_df["age"], pa.int16()),
+            "class": pa.array(Log_df["class"], pa.int8()),
+            "value": pa.array(Log_df["value"], pa.float64()),
+            "unit_impact_on_obj_func": pa.array(
+                Log_df["unit_impact_on_obj_func"], pa.float64()
+            ),
+        }
+    ).cast(SOLUTION_SCHEMA)
+
+    partition = os.path.join(_solutions_dir(store_dir), f"experiment={experiment}")
+    os.makedirs(partition, exist_ok=True)
+    pq.write_table(table, os.path.join(partition, "part-0.parquet"))
+
+    return {
+        "experiment": experiment,
+        "objective": objective_value,
+        "gap": stats["gap"],
+        "solving_time": stats["solving_time"],
+        "nodes": stats["nodes"],
+        "status": stats["status"],
+        "log_mtime_ns": os.stat(log_file_path).st_mtime_ns,
+    }
+
+
+def ingest_scip_logs(log_dir, store_dir=None, force=False):
+    """
+    Convert every .log in log_dir into the store, skipping logs already ingested.
+
+    Returns:
+        list of the experiments (re)ingested
+    """
+    store_dir = store_dir or default_store_dir(log_dir)
+    metadata = load_metadata(store_dir)
+    ingested_mtimes = dict(zip(metadata["experiment"], metadata["log_mtime_ns"]))
+
+    records = []
+    for path in sorted(glob.glob(os.path.join(log_dir, "*.log"))):
+        experiment = os.path.splitext(os.path.basename(path))[0]
+        if not force and ingested_mtimes.get(experiment) == os.stat(path).st_mtime_ns:
+            continue
+        records.append(ingest_log(path, store_dir))
+
+    if records:
+        updated = pd.DataFrame(records)
+        metadata = pd.concat(
+            [metadata.loc[~metadata["experiment"].isin(updated["experiment"])], updated],
+            ignore_index=True,
+        ).sort_values("experiment")
+        pq.write_table(
+            pa.Table.from_pandas(metadata, METADATA_SCHEMA, preserve_index=False),
+            _metadata_path(store_dir),
+        )
+
+    return [record["experiment"] for record in records]
+
+
+def scan_solutions(store_dir, experiments=None, var=None, t=None, columns=None):
+    """
+    Lazy read of the store, filters are pushed down to the parquet scan.
+
+    Args:
+        experiments: experiment names to read, all if None
+        var: variable names to keep (e.g. ["x", "y"])
+        t: a single period or an inclusive (from, to) tuple
+        columns: columns to read, all if None
+    """
+    dataset = ds.dataset(
+        _solutions_dir(store_dir), format="parquet", partitioning=EXPERIMENT_PARTITIONING
+    )
+
+    filters = []
+    if experiments is not None:
+        filters.append(ds.field("experiment").isin(list(experiments)))
+    if var is not None:
+        filters.append(ds.field("var").isin(list(var)))
+    if isinstance(t, tuple):
+        filters.append((ds.field("t") >= t[0]) & (ds.field("t") <= t[1]))
+    elif t is not None:
+        filters.append(ds.field("t") == t)
+
+    expression = None
+    for f in filters:
+        expression = f if expression is None else expression & f
+
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas(types_mapper=PANDAS_TYPES.get)
+
+
+def stored_log(log_file_path, store_dir):
+    """
+    Solution of a .log from the store, as scan_solutions returns it.
+
+    Returns:
+        DataFrame, or None if the log isn't ingested or changed since
+    """
+    experiment = os.path.splitext(os.path.basename(log_file_path))[0]
+    metadata = load_metadata(store_dir, [experiment])
+    if metadata.empty:
+        return None
+    if (
+        os.path.exists(log_file_path)
+        and metadata["log_mtime_ns"].iloc[0] != os.stat(log_file_path).st_mtime_ns
+    ):
+        return None
+
+    return scan_solutions(store_dir, [experiment], columns=SOLUTION_SCHEMA.names)
+
+
+def read_solution(store_dir, experiment, var=("x", "y", "w", "n"), t=None):
+    """
+    One experiment with the store's dtypes: the rows format_log_df keeps, plus its
+    impact_on_obj_func column. Class stays Int8 (format_log_df turns it into str labels)
+    and there are no t = 0 placeholder sales, format_log_df adds those if a plot needs them.
+    """
+    Log_df = scan_solutions(
+        store_dir, [experiment], var=var, t=t, columns=SOLUTION_SCHEMA.names
+    )
+    if Log_df.empty:
+        raise KeyError(f"{experiment} not found in {store_dir}")
+
+    Log_df["impact_on_obj_func"] = Log_df["value"] * Log_df["unit_impact_on_obj_func"]
+    return Log_df
+
+
+if __name__ == "__main__":
+    log_dir = sys.argv[1] if len(sys.argv) > 1 else "lp_logs"
+    ingested = ingest_scip_logs(log_dir)
+    print(f"ingested {len(ingested)} logs into {default_store_dir(log_dir)}")
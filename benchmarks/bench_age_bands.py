@@ -0,0 +1,80 @@
+"""
+Benchmark the age-banded model (BandedModel, in memory only) against the per-age
+flow formulation (NativeModel, model_strategy_1eng.zpl / model_strategy_2eng.zpl) on every
+recorded experiment.
+
+Inputs are rebuilt from the logs as in check_native_model. For both formulations: bands,
+rows, columns and nonzeros handed to the solver and solve time, HiGHS presolve included as
+in bench_cohort_model. Both objectives must match each other and the recorded SCIP run, and
+the banded log (one x per band) read back with read_scip_log must expand
+to the per-age stock with the same objective.
+
+Run from the repo root:
+    python -m benchmarks.bench_age_bands [log_dir] [experiment filter] [dense|live]
+"""
+import os
+import sys
+import tempfile
+
+from EDA.eda_utils import parse_scip_log, read_scip_log
+from benchmarks.check_native_model import LOG_DIR, REL_TOL, recorded_experiments
+from preprocessing.AgeBands import AgeBands
+from preprocessing.BandedModel import BandedModel
+from preprocessing.NativeModel import NativeModel, live_cells
+
+
+def main(log_dir=LOG_DIR, name_filter="", cells="dense"):
+    failures = 0
+    totals = {"ages": 0.0, "bands": 0.0}
+
+    print(
+        f"{'experiment':<45} {'model':<6} {'bands':>5} {'rows':>7} {'cols':>7} {'nnz':>8} "
+        f"{'solve (s)':>9} {'objective':>16}"
+    )
+    for name, strategy, log_path, inputs, _ in recorded_experiments(log_dir, name_filter):
+        if cells == "live":
+            inputs["live"] = live_cells(
+                inputs["initial_stock"],
+                inputs["prices"],
+                inputs["august_periods"],
+                inputs["PARAMS"],
+            )
+        scip_obj = parse_scip_log(log_path)[0]
+        bands = AgeBands(inputs["prices"], inputs["costs"], inputs["PARAMS"])
+
+        objectives = []
+        for label, model in (
+            ("ages", NativeModel(strategy=strategy, **inputs)),
+            ("bands", BandedModel(strategy=strategy, bands=bands, **inputs)),
+        ):
+            result = model.solve()
+            totals[label] += result["solving_time"]
+            objectives.append(result["objective"])
+
+            print(
+                f"{name:<45} {label:<6} {len(bands) if label == 'bands' else '':>5} "
+                f"{model.n_rows:>7} {model.n_cols:>7} {model.A.nnz:>8} "
+                f"{result['solving_time']:>9.2f} {result['objective']:>16.4f}"
+            )
+
+        with tempfile.TemporaryDirectory() as workdir:
+            log_path = os.path.join(workdir, f"{name}.log")
+            model.write_log(log_path, result)
+            Log_df = read_scip_log(log_path)
+        objectives.append((Log_df["value"] * Log_df["unit_impact_on_obj_func"]).sum())
+
+        ok = all(
+            abs(obj - scip_obj) <= REL_TOL * max(1.0, abs(scip_obj)) for obj in objectives
+        )
+        failures += not ok
+        if not ok:
+            print(f"{name:<45} MISMATCH, scip objective {scip_obj:.4f}, expanded {objectives[-1]:.4f}")
+
+    for label, t_solve in totals.items():
+        print(f"total {label:<6} solve {t_solve:.2f}s")
+
+    assert not failures, f"{failures} experiments differ between formulations or from SCIP"
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
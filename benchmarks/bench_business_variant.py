@@ -0,0 +1,94 @@
+"""
+Benchmark price lookups and the business variant valuation over a sweep of exercise windows.
+
+Run from the repo root:
+    python -m benchmarks.bench_business_variant [n windows]
+"""
+import copy
+import sys
+import time
+
+import pandas as pd
+
+from preprocessing.config import (
+    PARAMS,
+    PESOS_PROMEDIO,
+    path_parte_diario,
+    path_scrapped_prices_df,
+)
+from preprocessing.data_prep import (
+    append_daily_income_and_cost,
+    get_interplolator,
+    get_precios_scrapped,
+    get_ventas_inicial_from_parte_diario,
+    prices_to_usd_b,
+)
+from preprocessing.PriceIndex import PriceIndex
+
+
+def legacy_get_precios_del_periodo(periodo, df_precios):
+    # reference implementation: sorts the distance to every price on each call
+    closest_price = abs((df_precios.PERIODO_INICIO - periodo)).sort_values(ascending=True)
+    return df_precios.iloc[closest_price.index[0]]
+
+
+def main(n_windows=200):
+    df_precios = get_precios_scrapped(fecha_inicio="01/01/2014", input=path_scrapped_prices_df)
+    df_precios = prices_to_usd_b(
+        df_prices_ars=df_precios,
+        usd_b_path="data/usd_b_fill.csv",
+        cols_to_normalize=["VAQUILLONAS270", "VAQUILLONAS391", "NOVILLITOS300", "NOVILLITOS391"],
+    )
+    df_ventas = get_ventas_inicial_from_parte_diario(parte_diario_path=path_parte_diario)
+    costs_interpolator = get_interplolator(PARAMS, output_plot_path=None)
+
+    fechas = df_ventas.FECHA
+
+    # precio por venta, fila a fila como antes vs el indice
+    start = time.perf_counter()
+    legacy = [legacy_get_precios_del_periodo(fecha, df_precios) for fecha in fechas]
+    t_legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    price_index = PriceIndex(df_precios)
+    t_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [price_index.row(fecha) for fecha in fechas]
+    t_single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = price_index.rows(fechas)
+    t_batch = time.perf_counter() - start
+
+    # a igual distancia de dos precios el orden del sort anterior era arbitrario
+    empates = sum(
+        (df_precios.PERIODO_INICIO - fecha).abs().eq(abs(p.PERIODO_INICIO - fecha)).sum() > 1
+        for p, fecha in zip(legacy, fechas)
+    )
+    distintos = sum(p.PERIODO_INICIO != r["PERIODO_INICIO"] for p, r in zip(legacy, single))
+    assert distintos <= empates, (distintos, empates)
+    assert all(r["PERIODO_INICIO"] == b for r, b in zip(single, batch["PERIODO_INICIO"]))
+
+    # barrido de ejercicios de dos años
+    inicios = pd.date_range("2014-01-01", "2022-12-31", periods=int(n_windows))
+    start = time.perf_counter()
+    for inicio in inicios:
+        params = copy.deepcopy(PARAMS)
+        params["fecha_inicio"] = inicio.strftime("%d/%m/%Y")
+        params["fecha_fin_ejercicio"] = (inicio + pd.DateOffset(years=2)).strftime("%d/%m/%Y")
+        append_daily_income_and_cost(
+            df_ventas, price_index, params, PESOS_PROMEDIO, costs_interpolator
+        )
+    t_sweep = time.perf_counter() - start
+
+    print(f"{len(df_ventas)} sales, {empates} tied between two prices, {distintos} differ")
+    print(f"{'sort per lookup':<28} {t_legacy:>8.3f}s")
+    print(f"{'build price index':<28} {t_build:>8.3f}s")
+    print(f"{'index, one lookup per sale':<28} {t_single:>8.3f}s")
+    print(f"{'index, batch lookup':<28} {t_batch:>8.3f}s")
+    print(f"{f'{len(inicios)} windows valuation':<28} {t_sweep:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,81 @@
+"""
+Benchmark the cohort-indexed model (CohortModel, in memory only) against the
+flow formulation (NativeModel, model_strategy_1eng.zpl / model_strategy_2eng.zpl) on every
+recorded experiment.
+
+Inputs are rebuilt from the logs as in check_native_model. For both formulations: rows,
+columns and nonzeros handed to the solver, solve time with HiGHS presolve and without it.
+scipy's milp doesn't report the presolve time apart, the second column shows what presolve
+buys each formulation. Both presolved objectives must match each other and the recorded
+SCIP run. Without presolve HiGHS (scipy 1.13) reports some flow models optimal at a far
+lower objective: those runs are flagged and counted apart, their time is not comparable.
+
+Run from the repo root:
+    python -m benchmarks.bench_cohort_model [log_dir] [experiment filter] [dense|live]
+"""
+import sys
+
+from EDA.eda_utils import parse_scip_log
+from benchmarks.check_native_model import LOG_DIR, REL_TOL, recorded_experiments
+from preprocessing.CohortModel import CohortModel
+from preprocessing.NativeModel import NativeModel, live_cells
+
+
+def matches(obj, scip_obj):
+    return obj is not None and abs(obj - scip_obj) <= REL_TOL * max(1.0, abs(scip_obj))
+
+
+def main(log_dir=LOG_DIR, name_filter="", cells="dense"):
+    failures = 0
+    raw_failures = 0
+    totals = {"flow": [0.0, 0.0], "cohort": [0.0, 0.0]}
+
+    print(
+        f"{'experiment':<45} {'model':<6} {'rows':>7} {'cols':>7} {'nnz':>8} "
+        f"{'solve (s)':>9} {'no presolve (s)':>15} {'objective':>16}"
+    )
+    for name, strategy, log_path, inputs, _ in recorded_experiments(log_dir, name_filter):
+        if cells == "live":
+            inputs["live"] = live_cells(
+                inputs["initial_stock"],
+                inputs["prices"],
+                inputs["august_periods"],
+                inputs["PARAMS"],
+            )
+        scip_obj = parse_scip_log(log_path)[0]
+
+        objectives, raw_objectives = [], []
+        for label, model_class in (("flow", NativeModel), ("cohort", CohortModel)):
+            model = model_class(strategy=strategy, **inputs)
+            result = model.solve()
+            raw = model.solve(presolve=False)
+            totals[label][0] += result["solving_time"]
+            totals[label][1] += raw["solving_time"]
+            objectives.append(result["objective"])
+            raw_objectives.append(raw["objective"])
+
+            print(
+                f"{name:<45} {label:<6} {model.n_rows:>7} {model.n_cols:>7} {model.A.nnz:>8} "
+                f"{result['solving_time']:>9.2f} {raw['solving_time']:>15.2f} "
+                f"{result['objective']:>16.4f}"
+            )
+
+        ok = all(matches(obj, scip_obj) for obj in objectives)
+        failures += not ok
+        if not ok:
+            print(f"{name:<45} MISMATCH, scip objective {scip_obj:.4f}")
+
+        raw_ok = all(matches(obj, scip_obj) for obj in raw_objectives)
+        raw_failures += not raw_ok
+        if not raw_ok:
+            print(f"{name:<45} without presolve: {raw_objectives}, scip objective {scip_obj:.4f}")
+
+    for label, (t_solve, t_raw) in totals.items():
+        print(f"total {label:<6} solve {t_solve:.2f}s, without presolve {t_raw:.2f}s")
+    print(f"{raw_failures} experiments with a wrong optimum without presolve")
+
+    assert not failures, f"{failures} experiments differ between formulations or from SCIP"
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,106 @@
+"""
+Benchmark the monthly cost curve: skfda's monotone spline grid vs the NumPy CostCurve.
+
+The reference is the original get_interplolator (FDataGrid + SplineInterpolation, skfda
+has to be installed to run this). Both must give the same accumulated costs, monthly costs
+and cost matrix within REL_TOL, and the timings cover building the curve and the calls the
+valuations make (get_month_cost over a cow's 37 months).
+
+Run from the repo root:
+    python -m benchmarks.bench_cost_curve [repeats]
+"""
+import copy
+import sys
+import time
+
+import numpy as np
+
+from preprocessing.config import PARAMS
+from preprocessing.data_prep import (
+    _COST_MATRIX_CACHE,
+    get_cost_matrix,
+    get_interplolator,
+    get_month_cost,
+)
+
+REL_TOL = 1e-12
+VACA = list(range(13)) + [12] * 24
+
+
+def legacy_get_interplolator(PARAMS):
+    # reference implementation: skfda grid, monotone cubic spline and finite difference derivative
+    from skfda.representation.grid import FDataGrid
+    from skfda.representation.interpolation import SplineInterpolation
+
+    DataGrid = FDataGrid(
+        list(PARAMS["costos_meses_usd_c1_c2_pre_norm"].values()),
+        list(PARAMS["costos_meses_usd_c1_c2_pre_norm"].keys()),
+    )
+    DataGrid.interpolation = SplineInterpolation(interpolation_order=3, monotone=True)
+    monthly_cost = DataGrid.derivative()
+
+    for edad in (6, 17, 21):
+        PARAMS["costos_meses_usd_c1_c2"][edad] = float(
+            monthly_cost.evaluate(eval_points=list(range(edad + 1))).sum()
+            + DataGrid.evaluate(0).item()
+        )
+    PARAMS["costos_meses_usd_c1_c2"]["intercept"] = float(DataGrid.evaluate(0).item())
+
+    return monthly_cost
+
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeats
+
+
+def close(a, b):
+    a, b = np.ravel(a), np.ravel(b)
+    return np.all(np.abs(a - b) <= REL_TOL * np.maximum(1.0, np.abs(a)))
+
+
+def main(repeats=200):
+    repeats = int(repeats)
+    legacy_params, params = copy.deepcopy(PARAMS), copy.deepcopy(PARAMS)
+
+    start = time.perf_counter()
+    legacy_get_interplolator(copy.deepcopy(PARAMS))
+    t_import = time.perf_counter() - start
+
+    legacy, t_legacy_build = timed(lambda: legacy_get_interplolator(legacy_params), repeats)
+    curve, t_build = timed(lambda: get_interplolator(params), repeats)
+    for k, v in legacy_params["costos_meses_usd_c1_c2"].items():
+        assert close(v, params["costos_meses_usd_c1_c2"][k]), k
+
+    edades = np.arange(-1, PARAMS["meses_max_animales"] + 1)
+    puntos = np.concatenate([edades, np.linspace(-2, 25, 271)])
+    assert close(legacy.evaluate(eval_points=puntos), curve.evaluate(puntos))
+
+    cost_legacy, t_legacy_month = timed(
+        lambda: get_month_cost(VACA, legacy, legacy_params), repeats
+    )
+    cost, t_month = timed(lambda: get_month_cost(VACA, curve, params), repeats)
+    assert close(cost_legacy, cost)
+
+    def matrix(interpolator, params):
+        _COST_MATRIX_CACHE.clear()
+        return get_cost_matrix(interpolator, params)
+
+    matrix_legacy, t_legacy_matrix = timed(lambda: matrix(legacy, legacy_params), repeats)
+    matrix_new, t_matrix = timed(lambda: matrix(curve, params), repeats)
+    assert close(matrix_legacy, matrix_new)
+
+    print(f"mean of {repeats} runs, first skfda call (imports) {t_import:.3f}s")
+    print(f"{'':<22} {'skfda':>10} {'CostCurve':>10}")
+    for label, a, b in [
+        ("build curve", t_legacy_build, t_build),
+        ("get_month_cost", t_legacy_month, t_month),
+        ("get_cost_matrix", t_legacy_matrix, t_matrix),
+    ]:
+        print(f"{label:<22} {a * 1e3:>8.3f}ms {b * 1e3:>8.3f}ms")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,104 @@
+"""
+Throughput of the .dat writers, in rows per second, on a prices.dat sized table.
+
+Per-line appends (the original generators), one joined string with str() per value,
+DatWriter in text, gzip and with the .npy sidecar, and reading the table back from the
+text or the sidecar. Every text output must be byte identical.
+
+Run from the repo root:
+    python -m benchmarks.bench_dat_writer [periods] [repeats]
+"""
+import filecmp
+import gzip
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_prices_dat import write_line_to_file
+from preprocessing.DatWriter import read_dat, sidecar_path, write_dat
+
+EDADES = 122
+CLASES = 3
+
+
+def legacy_write(path, columns):
+    # reference implementation: one "\t".join(str(x)) line and one open() per row
+    for row in zip(*(c.tolist() for c in columns)):
+        write_line_to_file(path, "\t".join(str(x) for x in list(row) + ["\n"]))
+
+
+def joined_write(path, columns):
+    with open(path, "w") as f:
+        rows = zip(*(c.tolist() for c in columns))
+        f.write("".join("\t".join(str(x) for x in row) + "\t\n" for row in rows))
+
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeats
+
+
+def main(periods=120, repeats=5):
+    periods, repeats = int(periods), int(repeats)
+    periodos, edades, clases = (
+        a.ravel()
+        for a in np.meshgrid(
+            np.arange(1, periods + 1),
+            np.arange(-1, EDADES - 1),
+            np.arange(1, CLASES + 1),
+            indexing="ij",
+        )
+    )
+    rng = np.random.default_rng(0)
+    precios = rng.integers(0, 400_000, len(periodos))
+    columns = (periodos, edades, clases, precios)
+    n = len(periodos)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = lambda name: os.path.join(tmp, name)
+
+        def legacy():
+            if os.path.exists(path("legacy.dat")):
+                os.remove(path("legacy.dat"))
+            legacy_write(path("legacy.dat"), columns)
+
+        _, t_legacy = timed(legacy, 1)
+        _, t_joined = timed(lambda: joined_write(path("joined.dat"), columns), repeats)
+        _, t_text = timed(lambda: write_dat(path("writer.dat"), *columns), repeats)
+        _, t_gz = timed(lambda: write_dat(path("writer.dat.gz"), *columns), repeats)
+        _, t_sidecar = timed(lambda: write_dat(path("sidecar.dat"), *columns, sidecar=True), repeats)
+
+        for name in ("joined.dat", "writer.dat", "sidecar.dat"):
+            assert filecmp.cmp(path("legacy.dat"), path(name), shallow=False), name
+        with gzip.open(path("writer.dat.gz"), "rb") as f, open(path("legacy.dat"), "rb") as g:
+            assert f.read() == g.read()
+
+        from_text, t_read_text = timed(lambda: read_dat(path("writer.dat")), repeats)
+        from_npy, t_read_npy = timed(lambda: read_dat(path("sidecar.dat")), repeats)
+        assert np.array_equal(from_text, np.column_stack(columns))
+        assert np.array_equal(from_npy, np.column_stack(columns))
+        text_size = os.path.getsize(path("writer.dat"))
+        npy_size = os.path.getsize(sidecar_path(path("sidecar.dat")))
+        gz_size = os.path.getsize(path("writer.dat.gz"))
+
+    print(f"{n} rows ({periods} periods), mean of {repeats} runs")
+    for label, t in [
+        ("per-line append", t_legacy),
+        ("joined str()", t_joined),
+        ("DatWriter text", t_text),
+        ("DatWriter gzip", t_gz),
+        ("DatWriter text + .npy", t_sidecar),
+        ("read text (loadtxt)", t_read_text),
+        ("read .npy sidecar", t_read_npy),
+    ]:
+        print(f"{label:<24} {t:>8.4f}s {n / t:>14,.0f} rows/s")
+    print(f"sizes: text {text_size:,} B, gzip {gz_size:,} B, npy {npy_size:,} B")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,85 @@
+"""
+Benchmark discounting the forecast prices: per-cell loop vs vector multiply vs a batched
+disc_fact sweep.
+
+Run from the repo root:
+    python -m benchmarks.bench_discount [n rates]
+"""
+import copy
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.config import PARAMS, PESOS_PROMEDIO
+from preprocessing.data_prep import (
+    SCRAPPED_COLS,
+    apply_discount_factor_to_prices,
+    get_discounted_price_tensors,
+    get_precios_modelo,
+    get_price_tensor,
+)
+from preprocessing.generate_LP_inputs import path_precios_forecast
+
+FECHA_INICIO = "18/01/2019"
+PERIODOS = 120
+
+
+def legacy_apply_discount_factor_to_prices(df_precios, discount_factor_percent, fecha_inicio):
+    # reference implementation: months from start in python and one .loc write per cell
+    discount_rate = discount_factor_percent / 100.0
+    df_precios = df_precios.sort_values("PERIODO_INICIO").reset_index(drop=True)
+    start_date = pd.to_datetime(fecha_inicio, format="%d/%m/%Y")
+
+    for index, row in df_precios.iterrows():
+        if row["PERIODO_INICIO"] > start_date:
+            periods_from_start = (row["PERIODO_INICIO"].year - start_date.year) * 12 + (
+                row["PERIODO_INICIO"].month - start_date.month
+            )
+            discount_multiplier = (1 - discount_rate) ** periods_from_start
+            for col in SCRAPPED_COLS:
+                df_precios.loc[index, col] = df_precios.loc[index, col] * discount_multiplier
+
+    return df_precios
+
+
+def main(n_rates=20):
+    df_precios = pd.read_csv(path_precios_forecast)
+    df_precios["PERIODO_INICIO"] = pd.to_datetime(df_precios["PERIODO_INICIO"])
+    params = dict(copy.deepcopy(PARAMS), fecha_inicio=FECHA_INICIO, periodos_modelo=PERIODOS)
+    rates = np.linspace(0.1, 2.0, int(n_rates))
+
+    start = time.perf_counter()
+    legacy = legacy_apply_discount_factor_to_prices(df_precios, rates[0], FECHA_INICIO)
+    t_legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = apply_discount_factor_to_prices(df_precios, rates[0], FECHA_INICIO)
+    t_new = time.perf_counter() - start
+    pd.testing.assert_frame_equal(legacy, new, check_exact=True)
+
+    # un tensor por tasa, como cada experimento por separado
+    start = time.perf_counter()
+    one_by_one = []
+    for r in rates:
+        discounted = apply_discount_factor_to_prices(df_precios, r, FECHA_INICIO)
+        one_by_one.append(
+            get_price_tensor(get_precios_modelo(discounted, params), params, PESOS_PROMEDIO)
+        )
+    t_loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = get_discounted_price_tensors(df_precios, rates, params, PESOS_PROMEDIO)
+    t_batch = time.perf_counter() - start
+    assert np.array_equal(np.stack(one_by_one), batch)
+
+    print(f"{len(df_precios)} forecast rows, {len(rates)} rates, {PERIODOS} periods")
+    print(f"{'discount, per-cell .loc':<28} {t_legacy:>8.4f}s")
+    print(f"{'discount, vector multiply':<28} {t_new:>8.4f}s")
+    print(f"{'tensors, one rate at a time':<28} {t_loop:>8.4f}s")
+    print(f"{'tensors, batched':<28} {t_batch:>8.4f}s")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,86 @@
+"""
+Import time of the numeric core, from python -X importtime in fresh processes.
+
+Every experiment worker pays this before writing its first .dat line. The check fails
+(exit code 1) if a core module pulls in a plotting library or if its import takes more
+than the budget on top of pandas, which every core module needs anyway. Plotting lives
+in preprocessing.plots and EDA.eda_plots and is imported only when a plot is asked for.
+
+Run from the repo root:
+    python -m benchmarks.bench_import_time [repeats] [budget seconds]
+"""
+import subprocess
+import sys
+
+CORE_MODULES = [
+    "preprocessing.data_prep",
+    "preprocessing.generate_LP_inputs",
+    "preprocessing.generate_business_variant",
+    "preprocessing.experiment_runner",
+    "preprocessing.sweep",
+    "preprocessing.NativeModel",
+    "EDA.eda_utils",
+]
+
+PLOTTING = ("seaborn", "matplotlib", "plotly", "skfda")
+
+# segundos por encima de "import pandas"
+BUDGET = 0.25
+
+
+def import_time(module):
+    """
+    Returns:
+        tuple (cumulative import time in seconds, set of modules imported)
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    # "import time: self [us] | cumulative | imported package"
+    cumulative, imported = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, total, name = line[len("import time:") :].split("|")
+        cumulative[name.strip()] = int(total)
+        imported.add(name.strip())
+
+    return cumulative[module] / 1e6, imported
+
+
+def best_of(module, repeats):
+    runs = [import_time(module) for _ in range(repeats)]
+    return min(t for t, _ in runs), runs[0][1]
+
+
+def main(repeats=5, budget=BUDGET):
+    repeats, budget = int(repeats), float(budget)
+    baseline, _ = best_of("pandas", repeats)
+
+    failures = []
+    print(f"best of {repeats} runs, import pandas: {baseline:.3f}s, budget +{budget:.3f}s")
+    print(f"{'module':<42} {'import (s)':>10} {'over pandas':>12} plotting")
+    for module in CORE_MODULES:
+        seconds, imported = best_of(module, repeats)
+        plotting = sorted({name.split(".")[0] for name in imported} & set(PLOTTING))
+        print(
+            f"{module:<42} {seconds:>10.3f} {seconds - baseline:>12.3f} "
+            f"{', '.join(plotting) or '-'}"
+        )
+
+        if plotting:
+            failures.append(f"{module} imports {', '.join(plotting)}")
+        if seconds - baseline > budget:
+            failures.append(f"{module} takes {seconds - baseline:.3f}s over pandas")
+
+    if failures:
+        print("\n".join(["", "FAILED:"] + failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,99 @@
+"""
+Benchmark the multinomial initial stock sampler against the per-animal draws it replaced,
+for herds of growing size. Both must give the same mean stock per (age, class) cell.
+
+Run from the repo root:
+    python -m benchmarks.bench_initial_stock
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.config import PARAMS, intervalos_madurez
+from preprocessing.data_prep import get_stock_inicial_matrix
+
+HERDS = [2_000, 20_000, 200_000]
+REPEATS = 20
+
+
+def truncated_normal(mean, std, lower_bound, upper_bound, size=1):
+    # rejection sampling, one draw per animal, as the original sampler did
+    samples = []
+    while len(samples) < size:
+        x = np.random.normal(mean, std)
+        if lower_bound <= x <= upper_bound:
+            samples.append(x)
+    return np.array(samples)
+
+
+def legacy_stock_matrix(stock_row, categorias, PARAMS, clases, meses_max_animales, intervalos):
+    # reference implementation: one random draw per animal
+    stock = np.zeros((meses_max_animales + 2, clases), dtype=np.int64)
+    for cat in categorias:
+        if cat == "VACAS":
+            edades_random = truncated_normal(
+                60, 10, intervalos[cat][0], intervalos[cat][1], size=int(stock_row[cat].values[0])
+            ).astype(int)
+        else:
+            edades_random = np.random.randint(
+                intervalos[cat][0], intervalos[cat][1] + 1, int(stock_row[cat].values[0])
+            )
+        np.add.at(stock, (edades_random + 1, intervalos[cat][2] - 1), 1)
+
+    return stock
+
+
+def herd_row(head_count):
+    # mismo peso para cada categoria del parte diario
+    categorias = list(intervalos_madurez)
+    per_cat = head_count // len(categorias)
+    return pd.DataFrame({cat: [per_cat] for cat in categorias}), categorias
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    args = (PARAMS["clases"], PARAMS["meses_max_animales"], intervalos_madurez)
+    params = dict(PARAMS, SCRAMBLE_NUMS=False)
+
+    print(f"{'head count':>10} {'legacy (s)':>11} {'new (s)':>9} {'max mean diff':>14}")
+    for head_count in HERDS:
+        stock_row, categorias = herd_row(head_count)
+
+        legacy, t_legacy = timed(legacy_stock_matrix, stock_row, categorias, params, *args)
+        new, t_new = timed(get_stock_inicial_matrix, stock_row, categorias, params, *args)
+        assert legacy.sum() == new.sum() == head_count // len(categorias) * len(categorias)
+
+        # misma distribucion: promedio de REPEATS sorteos con semillas distintas
+        mean_legacy = np.mean(
+            [legacy_stock_matrix(stock_row, categorias, params, *args) for _ in range(REPEATS)],
+            axis=0,
+        )
+        mean_new = np.mean(
+            [
+                get_stock_inicial_matrix(
+                    stock_row, categorias, dict(params, stock_seed=seed), *args
+                )
+                for seed in range(REPEATS)
+            ],
+            axis=0,
+        )
+        diff = np.abs(mean_legacy - mean_new).max() / max(1.0, mean_legacy.max())
+
+        print(f"{head_count:>10} {t_legacy:>11.4f} {t_new:>9.4f} {diff:>14.4f}")
+
+    seeded = dict(params, stock_seed=42)
+    stock_row, categorias = herd_row(HERDS[0])
+    assert (
+        get_stock_inicial_matrix(stock_row, categorias, seeded, *args)
+        == get_stock_inicial_matrix(stock_row, categorias, seeded, *args)
+    ).all(), "same stock_seed must give the same stock"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark stock lookups on the parsed-once parte diario against re-reading the csv per call.
+
+Run from the repo root:
+    python -m benchmarks.bench_parte_diario [parte diario csv]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from preprocessing.config import path_parte_diario
+from preprocessing.data_prep import get_stock_row
+from preprocessing.ParteDiario import load_parte_diario
+
+# una fecha cada 17 dias, con y sin datos en el parte diario
+FECHAS = pd.date_range("2014-01-01", "2024-12-31", freq="17D")
+
+
+def legacy_get_stock_row(parte_diario_path, FECHA_INICIO_MODELO):
+    # reference implementation: reads and parses the whole csv on every call
+    df_stock_parte = pd.read_csv(parte_diario_path, usecols=[x for x in range(0, 15)])
+    df_stock_parte.rename(
+        columns={"MACHOS": "OREJANO_MACHOS", "HEMBRAS": "OREJANO_HEMBRAS"}, inplace=True
+    )
+    df_stock_parte.loc[119, "FECHA"] = "11/15/2014"
+    df_stock_parte.loc[356, "FECHA"] = "6/28/2019"
+    df_stock_parte["FECHA"] = pd.to_datetime(df_stock_parte["FECHA"], format="%m/%d/%Y")
+
+    return df_stock_parte.loc[df_stock_parte["FECHA"] == FECHA_INICIO_MODELO]
+
+
+def main(parte_diario_path=path_parte_diario):
+    start = time.perf_counter()
+    legacy = [legacy_get_stock_row(parte_diario_path, fecha) for fecha in FECHAS]
+    t_legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = [get_stock_row(parte_diario_path, fecha)[0] for fecha in FECHAS]
+    t_new = time.perf_counter() - start
+
+    for a, b in zip(legacy, new):
+        pd.testing.assert_frame_equal(a, b)
+
+    # fin de ejercicio sin datos: el primer dia con datos, antes un get_stock_row por dia
+    parte_diario = load_parte_diario(parte_diario_path)
+    start = time.perf_counter()
+    found = [parte_diario.next_stock_row(fecha)[1] for fecha in FECHAS]
+    t_next = time.perf_counter() - start
+
+    print(f"{len(FECHAS)} dates, {sum(not row.empty for row in new)} with data")
+    print(f"{'re-read csv per lookup':<28} {t_legacy:>8.3f}s")
+    print(f"{'parsed once (incl. load)':<28} {t_new:>8.3f}s")
+    print(f"{'next available date':<28} {t_next:>8.3f}s {sum(f is not None for f in found)} found")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
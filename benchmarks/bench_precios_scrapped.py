@@ -0,0 +1,79 @@
+"""
+Benchmark reading the scraped prices: row loop vs vectorized parse vs the parquet cache.
+
+Run from the repo root:
+    python -m benchmarks.bench_precios_scrapped [scrapping csv] [repeats]
+"""
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from preprocessing.config import path_scrapped_prices_df
+from preprocessing.data_prep import (
+    SCRAPPED_COLS,
+    get_precios_scrapped,
+    parse_precios_scrapped,
+)
+
+
+def legacy_get_precios_scrapped(input):
+    # reference implementation: iterrows parse and a .loc fill of the missing tail months
+    df_scrapping = pd.read_csv(input)
+
+    append_list = []
+    for index, row in df_scrapping.iterrows():
+        clean_row = [row[col].split(",")[2] for col in SCRAPPED_COLS]
+        clean_row = [x[3:] if len(x) > 3 else x for x in clean_row]
+        clean_row.append(row["periodo_inicio"])
+        append_list.append(clean_row)
+
+    df_precios = pd.DataFrame(data=append_list, columns=SCRAPPED_COLS + ["PERIODO_INICIO"])
+    df_precios["PERIODO_INICIO"] = pd.to_datetime(df_precios["PERIODO_INICIO"], format="%d/%m/%Y")
+    df_precios[SCRAPPED_COLS] = df_precios[SCRAPPED_COLS].apply(pd.to_numeric)
+
+    for value in range(101, 109):
+        for col in SCRAPPED_COLS:
+            df_precios.loc[value, col] = round(df_precios.loc[value - 1, col] * 1.02)
+        df_precios.loc[value, "PERIODO_INICIO"] = df_precios.loc[
+            value - 1, "PERIODO_INICIO"
+        ] + pd.DateOffset(months=1)
+
+        df_precios["YYYYMM"] = df_precios.PERIODO_INICIO.dt.strftime("%Y%m")
+
+    return df_precios
+
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeats
+
+
+def main(input=path_scrapped_prices_df, repeats=20):
+    repeats = int(repeats)
+    legacy, t_legacy = timed(lambda: legacy_get_precios_scrapped(input), repeats)
+    parsed, t_parsed = timed(lambda: parse_precios_scrapped(input), repeats)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        get_precios_scrapped(None, input, cache_dir=cache_dir)
+        t_first = time.perf_counter() - start
+        cached, t_cached = timed(
+            lambda: get_precios_scrapped(None, input, cache_dir=cache_dir), repeats
+        )
+
+    pd.testing.assert_frame_equal(legacy, parsed, check_exact=True)
+    pd.testing.assert_frame_equal(legacy, cached, check_exact=True)
+
+    print(f"{len(legacy)} price rows, mean of {repeats} runs")
+    print(f"{'iterrows + .loc fill':<28} {t_legacy:>8.4f}s")
+    print(f"{'vectorized parse':<28} {t_parsed:>8.4f}s")
+    print(f"{'parse + write parquet':<28} {t_first:>8.4f}s")
+    print(f"{'parquet cache hit':<28} {t_cached:>8.4f}s")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,99 @@
+"""
+Benchmark price-only scenarios the way the native sweep solves a disc_fact chain.
+
+The scenarios are the forecast prices with a range of discount rates, solved in order:
+- fresh: a NativeModel built over its own live cells and solved for each scenario
+- reused: one NativeModel over the live cells of every scenario, set_prices and solve
+- screened: the reused model through sweep.screened_solve, from the binaries of the
+  previous scenario
+Times include building the models. All three must reach the same objectives.
+
+Run from the repo root:
+    python -m benchmarks.bench_price_scenarios [periods] [strategy]
+"""
+import copy
+import sys
+import time
+
+import numpy as np
+
+from preprocessing.config import PARAMS, PESOS_PROMEDIO, intervalos_madurez, path_parte_diario
+from preprocessing.data_prep import get_discounted_price_tensors
+from preprocessing.generate_LP_inputs import build_native_inputs, get_forecast_prices
+from preprocessing.NativeModel import NativeModel, live_cells
+from preprocessing.sweep import binary_pattern, screened_solve
+
+FECHA_INICIO = "18/01/2019"
+DISC_FACTS = [0.0, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0]
+REL_TOL = 1e-6
+
+
+def main(periods=24, strategy=1):
+    params = dict(
+        copy.deepcopy(PARAMS),
+        fecha_inicio=FECHA_INICIO,
+        periodos_modelo=int(periods),
+        mantain_c3_stock=1,
+    )
+    strategy = int(strategy)
+    inputs, _ = build_native_inputs(params, PESOS_PROMEDIO, path_parte_diario, intervalos_madurez)
+    inputs.pop("live")
+
+    scenarios = get_discounted_price_tensors(
+        get_forecast_prices(params, False), DISC_FACTS, params, PESOS_PROMEDIO
+    )
+
+    def live(prices):
+        return live_cells(inputs["initial_stock"], prices, inputs["august_periods"], params)
+
+    start = time.perf_counter()
+    fresh = [
+        NativeModel(
+            PARAMS=params, strategy=strategy, live=live(prices), **dict(inputs, prices=prices)
+        ).solve()
+        for prices in scenarios
+    ]
+    t_fresh = time.perf_counter() - start
+
+    def chain_model():
+        upper = np.max(scenarios, axis=0)
+        return NativeModel(
+            PARAMS=params, strategy=strategy, live=live(upper), **dict(inputs, prices=upper)
+        )
+
+    start = time.perf_counter()
+    model, reused = chain_model(), []
+    for prices in scenarios:
+        model.set_prices(prices)
+        reused.append(model.solve())
+    t_reused = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model, screened, pattern = chain_model(), [], None
+    for prices in scenarios:
+        model.set_prices(prices)
+        result = screened_solve(model, pattern)
+        if result["success"]:
+            pattern = binary_pattern(model, result["x"])
+        screened.append(result)
+    t_screened = time.perf_counter() - start
+
+    print(f"{'disc_fact':>9} {'objective':>14} {'nodes':>6} {'branched':>8} {'fixed':>6}")
+    for disc_fact, a, b, c in zip(DISC_FACTS, fresh, reused, screened):
+        for other in (b, c):
+            assert abs(a["objective"] - other["objective"]) <= REL_TOL * max(
+                1.0, abs(a["objective"])
+            ), (disc_fact, a["objective"], other["objective"])
+        print(
+            f"{disc_fact:>9} {a['objective']:>14.2f} {a['nodes'] or 0:>6} "
+            f"{str(c['branched']):>8} {c['fixed_binaries']:>6}"
+        )
+
+    print(f"{len(scenarios)} scenarios, {periods} periods, strategy {strategy}")
+    print(f"{'build + solve each':<20} {t_fresh:>8.3f}s")
+    print(f"{'reused model':<20} {t_reused:>8.3f}s")
+    print(f"{'reused + screened':<20} {t_screened:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,142 @@
+"""
+Benchmark prices.dat generation against the original per-(t,e,c) loop.
+
+Run from the repo root:
+    python -m benchmarks.bench_prices_dat
+"""
+import copy
+import filecmp
+import itertools
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.config import PARAMS, PESOS_PROMEDIO
+from preprocessing.data_prep import precios_scrapped_to_dat
+
+HORIZONS = [24, 48, 120, 240]
+
+
+def synthetic_precios(n_periods, fecha_inicio="18/01/2019", seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.to_datetime(fecha_inicio, format="%d/%m/%Y")
+    return pd.DataFrame(
+        {
+            "VAQUILLONAS270": rng.uniform(1.2, 2.4, n_periods),
+            "VAQUILLONAS391": rng.uniform(1.1, 2.2, n_periods),
+            "NOVILLITOS300": rng.uniform(1.3, 2.6, n_periods),
+            "NOVILLITOS391": rng.uniform(1.2, 2.5, n_periods),
+            "PERIODO_INICIO": [start + pd.DateOffset(months=i) for i in range(n_periods)],
+        }
+    )
+
+
+def write_line_to_file(path, line):
+    # the original .dat generators append one line per open()
+    with open(path, "a") as f:
+        f.write(line)
+
+
+def legacy_precios_scrapped_to_dat(df_precios, PARAMS, PATH_DAT_FILES, peso_prom_dict):
+    # reference implementation: one dataframe scan and one file open per (t, e, c)
+    df_precios_cut = df_precios[
+        df_precios["PERIODO_INICIO"]
+        >= pd.to_datetime(PARAMS["fecha_inicio"], format="%d/%m/%Y")
+    ].copy()
+    df_precios_cut["periodo_mes_modelo"] = np.arange(1, len(df_precios_cut) + 1)
+
+    for periodo, edad_animal, clase in itertools.product(
+        range(1, PARAMS["periodos_modelo"] + 1),
+        range(-1, PARAMS["meses_max_animales"] + 1),
+        range(1, PARAMS["clases"] + 1),
+    ):
+        row = df_precios_cut.loc[df_precios_cut["periodo_mes_modelo"] == periodo]
+
+        if (edad_animal in [6, 7, 8]) & (clase in [1, 2]):
+            precio = (
+                float(row["NOVILLITOS300"].iloc[0])
+                * peso_prom_dict["peso_prom_destete"]
+                * PARAMS["multiplicador_destete"]
+            )
+        elif (edad_animal in [16, 17, 18]) & (clase in [1, 2]):
+            if clase == 1:
+                precio = (
+                    float(row["VAQUILLONAS270"].iloc[0])
+                    * peso_prom_dict["peso_prom_vaquillonas"]
+                )
+            if clase == 2:
+                precio = (
+                    float(row["NOVILLITOS300"].iloc[0])
+                    * peso_prom_dict["peso_prom_novillitos"]
+                )
+        elif (edad_animal in [30, 31, 32, 33, 34, 35, 36]) & (clase in [1, 2]):
+            if clase == 1:
+                precio = (
+                    float(row["VAQUILLONAS391"].iloc[0])
+                    * peso_prom_dict["peso_prom_vaquillonas_pesados"]
+                )
+            if clase == 2:
+                precio = (
+                    float(row["NOVILLITOS391"].iloc[0])
+                    * peso_prom_dict["peso_prom_novillos_pesados"]
+                )
+        elif (clase == 3) & (edad_animal >= PARAMS["venta_c3_from"]):
+            precio = (
+                int(row["VAQUILLONAS270"].iloc[0])
+                * peso_prom_dict["peso_prom_vaquillonas"]
+                * PARAMS["multiplicador_c3"]
+            )
+        else:
+            precio = 0
+
+        precio = round(precio)
+
+        valores = [periodo, edad_animal, clase, precio, "\n"]
+        line = "\t".join(str(x) for x in valores)
+        write_line_to_file(PATH_DAT_FILES["precios"], line)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    df_precios = synthetic_precios(max(HORIZONS) + 12)
+    params = copy.deepcopy(PARAMS)
+    params["fecha_inicio"] = "18/01/2019"
+
+    print(f"{'periods':>8} {'rows':>8} {'legacy (s)':>11} {'vector (s)':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_paths = {"precios": os.path.join(tmp, "prices_legacy.dat")}
+        new_paths = {"precios": os.path.join(tmp, "prices.dat")}
+
+        for periodos in HORIZONS:
+            params["periodos_modelo"] = periodos
+            for path in (legacy_paths["precios"], new_paths["precios"]):
+                if os.path.exists(path):
+                    os.remove(path)
+
+            t_legacy = timed(
+                legacy_precios_scrapped_to_dat, df_precios, params, legacy_paths, PESOS_PROMEDIO
+            )
+            t_new = timed(
+                precios_scrapped_to_dat, df_precios, params, new_paths, PESOS_PROMEDIO
+            )
+
+            assert filecmp.cmp(
+                legacy_paths["precios"], new_paths["precios"], shallow=False
+            ), f"prices.dat differs from the legacy output at {periodos} periods"
+
+            rows = periodos * (params["meses_max_animales"] + 2) * params["clases"]
+            print(
+                f"{periodos:>8} {rows:>8} {t_legacy:>11.3f} {t_new:>11.4f} {t_legacy / t_new:>7.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Rolling horizon vs the monolithic solve on the recorded long horizon experiments.
+
+Inputs are rebuilt from the logs as in check_native_model, so prices are only known for the
+cells the recorded run sold: the windows can only choose among those sales. "no c3" counts
+the windows that had to drop mantain_c3_stock. Plans that violate the monolithic model get
+no objective nor gap, only their status and violation.
+
+Run from the repo root:
+    python -m benchmarks.bench_rolling_horizon [log_dir] [experiment filter]
+"""
+import sys
+
+from benchmarks.check_native_model import LOG_DIR, recorded_experiments
+from preprocessing.NativeModel import NativeModel, live_cells
+from preprocessing.rolling_horizon import solve_rolling_horizon
+
+# (window, step) en periodos
+CONFIGS = [(24, 12), (36, 12), (48, 24)]
+
+
+def main(log_dir=LOG_DIR, name_filter="120periods"):
+    print(
+        f"{'experiment':<42} {'window':>7} {'objective':>14} {'gap (%)':>8} "
+        f"{'time (s)':>9} {'max win (s)':>11} {'violation':>9} {'no c3':>5}"
+    )
+    for name, strategy, _, inputs, _ in recorded_experiments(log_dir, name_filter):
+        live = live_cells(
+            inputs["initial_stock"], inputs["prices"], inputs["august_periods"], inputs["PARAMS"]
+        )
+        monolithic = NativeModel(strategy=strategy, live=live, **inputs).solve()
+        print(
+            f"{name:<42} {'-':>7} {monolithic['objective']:>14.2f} {0:>8.2f} "
+            f"{monolithic['solving_time']:>9.2f}"
+        )
+
+        for window, step in CONFIGS:
+            result = solve_rolling_horizon(
+                window=window, step=step, strategy=strategy, live=live, **inputs
+            )
+            if not result["success"]:
+                print(
+                    f"{'':<42} {f'{window}/{step}':>7} {result['status']}, "
+                    f"no c3 {sum(not w['mantain_c3_stock'] for w in result['windows'])}"
+                )
+                continue
+
+            gap = 100 * (monolithic["objective"] - result["objective"]) / abs(
+                monolithic["objective"]
+            )
+            print(
+                f"{'':<42} {f'{window}/{step}':>7} {result['objective']:>14.2f} {gap:>8.2f} "
+                f"{result['solving_time']:>9.2f} "
+                f"{max(w['solving_time'] for w in result['windows']):>11.2f} "
+                f"{result['max_violation']:>9.1e} "
+                f"{sum(not w['mantain_c3_stock'] for w in result['windows']):>5}"
+            )
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,86 @@
+"""
+Benchmark the single-pass SCIP log parser against the original read_scip_log.
+
+Run from the repo root:
+    python -m benchmarks.bench_scip_log [log_dir]
+"""
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+from EDA.eda_utils import format_log_df, read_scip_log
+
+LOG_DIR = "lp_logs"
+
+
+def legacy_read_scip_log(log_file_path):
+    # reference implementation: re-scans the file and splits the whole log three times per row
+    def get_line_number_with_string(file_name, string):
+        with open(file_name, "r") as f:
+            for i, line in enumerate(f):
+                if string in line:
+                    return i
+
+    def select_line_number(raw, line_nr):
+        return raw.split("\n")[line_nr]
+
+    Log_df = pd.DataFrame()
+
+    with open(log_file_path, "r") as f:
+        raw = f.read()
+
+    row_from = (
+        get_line_number_with_string(log_file_path, "=================================")
+        + 3
+    )
+    row_to = get_line_number_with_string(log_file_path, "Statistics") - 2
+
+    for line_nr in range(row_from, row_to + 1):
+        variable = select_line_number(raw, line_nr).split(" ")[0]
+        value = select_line_number(raw, line_nr).split(" ")[-2]
+        unit_impact_on_obj_func = select_line_number(raw, line_nr).split(" ")[-1][6:-1]
+        row_data = pd.Series(
+            {
+                "variable": variable,
+                "value": value,
+                "unit_impact_on_obj_func": unit_impact_on_obj_func,
+            }
+        )
+        Log_df = pd.concat([Log_df, pd.DataFrame([row_data])], ignore_index=True)
+
+    return Log_df
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(log_dir=LOG_DIR):
+    logs = sorted(glob.glob(os.path.join(log_dir, "*.log")))
+    total_legacy = total_new = 0.0
+
+    print(f"{'log':<50} {'rows':>6} {'legacy (s)':>11} {'new (s)':>9} {'speedup':>8}")
+    for path in logs:
+        legacy_df, t_legacy = timed(lambda p: format_log_df(legacy_read_scip_log(p)), path)
+        new_df, t_new = timed(lambda p: format_log_df(read_scip_log(p)), path)
+
+        pd.testing.assert_frame_equal(legacy_df, new_df, check_dtype=False)
+
+        total_legacy += t_legacy
+        total_new += t_new
+        print(
+            f"{os.path.basename(path):<50} {len(new_df):>6} {t_legacy:>11.3f} {t_new:>9.4f} {t_legacy / t_new:>7.0f}x"
+        )
+
+    print(
+        f"{'total (' + str(len(logs)) + ' logs)':<50} {'':>6} {total_legacy:>11.3f} {total_new:>9.4f} {total_legacy / total_new:>7.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,69 @@
+"""
+Benchmark loading a whole experiment set from the solution store vs parsing the logs.
+
+Run from the repo root:
+    python -m benchmarks.bench_solution_store [log_dir]
+"""
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from EDA.eda_utils import format_log_df, read_scip_log
+from EDA.solution_store import ingest_scip_logs, read_solution, scan_solutions
+
+LOG_DIR = "lp_logs_rev"
+
+
+def main(log_dir=LOG_DIR):
+    logs = sorted(glob.glob(os.path.join(log_dir, "*.log")))
+    experiments = [os.path.splitext(os.path.basename(path))[0] for path in logs]
+
+    start = time.perf_counter()
+    parsed = {
+        experiment: format_log_df(read_scip_log(path))
+        for experiment, path in zip(experiments, logs)
+    }
+    t_logs = time.perf_counter() - start
+    mem_logs = sum(df.memory_usage(deep=True).sum() for df in parsed.values())
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        start = time.perf_counter()
+        ingest_scip_logs(log_dir, store_dir)
+        t_ingest = time.perf_counter() - start
+
+        # mismo resultado que parsear el log
+        for experiment, path in zip(experiments, logs):
+            pd.testing.assert_frame_equal(
+                parsed[experiment].reset_index(drop=True),
+                format_log_df(read_scip_log(path, store_dir)).reset_index(drop=True),
+                check_dtype=False,
+            )
+
+        start = time.perf_counter()
+        typed = {experiment: read_solution(store_dir, experiment) for experiment in experiments}
+        t_typed = time.perf_counter() - start
+        mem_typed = sum(df.memory_usage(deep=True).sum() for df in typed.values())
+
+        start = time.perf_counter()
+        solutions = scan_solutions(store_dir)
+        t_store = time.perf_counter() - start
+        mem_store = solutions.memory_usage(deep=True).sum()
+
+        start = time.perf_counter()
+        sales = scan_solutions(store_dir, var=["y"], t=(1, 24))
+        t_filtered = time.perf_counter() - start
+
+    print(f"{len(logs)} logs, {len(solutions)} solution rows")
+    print(f"{'parse logs':<28} {t_logs:>8.3f}s {mem_logs / 1e6:>8.2f} MB")
+    print(f"{'ingest (once)':<28} {t_ingest:>8.3f}s")
+    print(f"{'read_solution, each':<28} {t_typed:>8.3f}s {mem_typed / 1e6:>8.2f} MB")
+    print(f"{'scan store':<28} {t_store:>8.3f}s {mem_store / 1e6:>8.2f} MB")
+    print(f"{'scan store, y with t<=24':<28} {t_filtered:>8.3f}s {len(sales):>8} rows")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
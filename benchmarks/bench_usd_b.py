@@ -0,0 +1,57 @@
+"""
+Benchmark the USD B normalization: prefix sums over the daily series vs slicing per price row.
+
+Run from the repo root:
+    python -m benchmarks.bench_usd_b [usd b csv]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.DolarNormalizer import load_dolar_normalizer
+
+USD_B_PATH = "data/usd_b_fill.csv"
+
+# una fecha por dia, como un precio diario
+FECHAS = pd.date_range("2014-01-01", "2022-12-31", freq="D")
+
+
+def legacy_mean_last_n_days(df, to_date, n):
+    # reference implementation: slices and casts the daily frame for every date
+    from_date = to_date - pd.Timedelta(days=n - 1)
+    return df[from_date:to_date]["avg"].astype(int).mean()
+
+
+def main(usd_b_path=USD_B_PATH):
+    df = pd.read_csv(usd_b_path, index_col=0, parse_dates=True)
+
+    start = time.perf_counter()
+    dln = load_dolar_normalizer(usd_b_path)
+    t_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_dolar_normalizer(usd_b_path)
+    t_reload = time.perf_counter() - start
+
+    print(f"{len(FECHAS)} dates, {len(df)} days of USD B")
+    print(f"{'load + prefix sums':<28} {t_load:>8.3f}s")
+    print(f"{'load again (memoized)':<28} {t_reload:>8.3f}s")
+
+    for n in (7, 30, 90):
+        start = time.perf_counter()
+        legacy = np.array([legacy_mean_last_n_days(df, fecha, n) for fecha in FECHAS])
+        t_legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = dln.mean_last_n_days(FECHAS, n)
+        t_new = time.perf_counter() - start
+
+        assert np.array_equal(legacy, new, equal_nan=True), n
+        print(f"{f'n={n} slice per date':<28} {t_legacy:>8.3f}s")
+        print(f"{f'n={n} prefix sums':<28} {t_new:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
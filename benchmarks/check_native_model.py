@@ -0,0 +1,175 @@
+"""
+Check the in-memory HiGHS model against the recorded SCIP/ZIMPL runs.
+
+The raw price and stock data are not needed: each experiment is rebuilt from its own log.
+Initial stock comes from x[0], prices from the objective coefficients of the sold cells
+(every other cell gets price 0) and costs from get_cost_matrix with the recorded params.
+Blocking unsold cells keeps the recorded solution feasible and can only lower the optimum,
+so an optimal SCIP run must give the same objective. Each run is solved twice, over the
+full grid and over the live cells only, both must agree.
+
+Run from the repo root:
+    python -m benchmarks.check_native_model [log_dir] [experiment filter]
+"""
+import copy
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from EDA.eda_utils import parse_scip_log, parse_scip_stats
+from preprocessing.data_prep import get_august_periods, get_cost_matrix, get_interplolator
+from preprocessing.NativeModel import NativeModel, live_cells
+
+LOG_DIR = "lp_logs_rev"
+REL_TOL = 1e-6
+
+
+def original_problem_vars(log_path):
+    with open(log_path, "r") as f:
+        for line in f:
+            if line.startswith("original problem has"):
+                return int(line.split()[3])
+
+
+def cell(df, column, shift):
+    return df[column].to_numpy(dtype=int) + shift
+
+
+def inputs_from_log(log_path, PARAMS, costs):
+    _, Log_df = parse_scip_log(log_path)
+    P, nE = PARAMS["periodos_modelo"], PARAMS["meses_max_animales"] + 2
+    params = copy.deepcopy(PARAMS)
+
+    x = Log_df.loc[Log_df["var"] == "x"]
+    stock_t0 = x.loc[x["t"] == 0]
+    initial_stock = np.zeros((nE, 3))
+    initial_stock[cell(stock_t0, "age", 1), cell(stock_t0, "class", -1)] = stock_t0["value"]
+
+    sold = Log_df.loc[(Log_df["var"] == "y") & (Log_df["t"] >= 1)]
+    prices = np.zeros((P, nE, 3))
+    prices[cell(sold, "t", -1), cell(sold, "age", 1), cell(sold, "class", -1)] = sold[
+        "unit_impact_on_obj_func"
+    ]
+
+    # los costos registrados tienen que coincidir con la matriz de costos de los params
+    held = x.loc[x["t"] >= 1]
+    cost_diff = np.abs(
+        -held["unit_impact_on_obj_func"].to_numpy()
+        - costs[cell(held, "t", -1), cell(held, "age", 1), cell(held, "class", -1)]
+    ).max()
+
+    # overrides por experimento que no quedan en experiments_results.json
+    s = Log_df.loc[Log_df["var"] == "s"]
+    if len(s):
+        params["fix_cost_sales"] = -s["unit_impact_on_obj_func"].iloc[0] / (nE * 3)
+
+    births = Log_df.loc[(Log_df["var"] == "n") & (Log_df["age"] == 1)]
+    for t, value in zip(births["t"], births["value"]):
+        c3_adultas = x.loc[(x["t"] == t) & (x["class"] == 3) & (x["age"] >= 24), "value"].sum()
+        if c3_adultas > 0:
+            params["pregnancy_index"] = round(2 * value / c3_adultas, 6)
+            break
+
+    return prices, initial_stock, params, cost_diff
+
+
+def recorded_experiments(log_dir=LOG_DIR, name_filter=""):
+    """
+    Yield the NativeModel inputs of every recorded run in log_dir.
+
+    Returns:
+        generator of (name, strategy, log_path, inputs dict for NativeModel, cost_diff)
+    """
+    with open(os.path.join(log_dir, "params.json")) as f:
+        PARAMS = json.load(f)
+    with open(os.path.join(log_dir, "experiments_results.json")) as f:
+        experiments = json.load(f)
+
+    # params.json de params_record trae los params de cada experimento, los viejos solo la base
+    experiment_params = PARAMS.pop("experiments", {})
+    for params in [PARAMS, *experiment_params.values()]:
+        # json guarda las edades de la curva de costos como strings
+        params["costos_meses_usd_c1_c2_pre_norm"] = {
+            int(k): v for k, v in params["costos_meses_usd_c1_c2_pre_norm"].items()
+        }
+
+    costs = get_cost_matrix(get_interplolator(PARAMS), PARAMS)
+
+    for experiment, results in experiments.items():
+        base = experiment_params.get(experiment, PARAMS)
+        for suffix, strategy in (("_h", 2), ("", 1)):
+            name = f"{experiment}{suffix}"
+            log_path = os.path.join(log_dir, f"{name}.log")
+            if name_filter not in name or not os.path.exists(log_path):
+                continue
+
+            params = copy.deepcopy(base)
+            params.update(
+                {k: results[k] for k in ("fecha_inicio", "periodos_modelo", "mantain_c3_stock")}
+            )
+            # las corridas con disc_fact registradas descuentan tambien el costo mensual
+            costs_exp = costs[None] * (
+                (1 - results.get("disc_fact", 0) / 100)
+                ** np.arange(params["periodos_modelo"])[:, None, None]
+            )
+            prices, initial_stock, params, cost_diff = inputs_from_log(
+                log_path, params, costs_exp
+            )
+            inputs = {
+                "prices": prices,
+                "costs": costs_exp,
+                "initial_stock": initial_stock,
+                "PARAMS": params,
+                "august_periods": get_august_periods(params)[0],
+            }
+            yield name, strategy, log_path, inputs, cost_diff
+
+
+def main(log_dir=LOG_DIR, name_filter=""):
+    failures = 0
+
+    print(
+        f"{'experiment':<45} {'scip obj':>14} {'native obj':>14} {'rel diff':>9} "
+        f"{'scip (s)':>9} {'native (s)':>10} {'cols':>7} {'live':>7} {'live (s)':>10}"
+    )
+    for name, strategy, log_path, inputs, cost_diff in recorded_experiments(
+        log_dir, name_filter
+    ):
+        model = NativeModel(strategy=strategy, **inputs)
+        result = model.solve()
+
+        start = time.perf_counter()
+        live = live_cells(
+            inputs["initial_stock"], inputs["prices"], inputs["august_periods"], inputs["PARAMS"]
+        )
+        live_model = NativeModel(strategy=strategy, live=live, **inputs)
+        t_live_build = time.perf_counter() - start
+        live_result = live_model.solve()
+
+        stats = parse_scip_stats(log_path)
+        scip_obj = parse_scip_log(log_path)[0]
+
+        rel_diff = abs(result["objective"] - scip_obj) / max(1.0, abs(scip_obj))
+        live_diff = abs(live_result["objective"] - scip_obj) / max(1.0, abs(scip_obj))
+        ok = (
+            max(rel_diff, live_diff) < REL_TOL
+            and cost_diff < 1e-6
+            and model.n_vars == original_problem_vars(log_path)
+        )
+        failures += not ok
+        print(
+            f"{name:<45} {scip_obj:>14.4f} {result['objective']:>14.4f} {rel_diff:>9.1e} "
+            f"{stats['solving_time']:>9.2f} {result['solving_time']:>10.2f} "
+            f"{model.n_cols:>7} {live_model.n_cols:>7} "
+            f"{live_result['solving_time'] + t_live_build:>10.2f}"
+            f"{'' if ok else '  MISMATCH'}"
+        )
+
+    assert not failures, f"{failures} experiments differ from the recorded SCIP runs"
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,75 @@
+"""
+Synthetic data/ files with a fixed seed, so the suite's golden .dat check doesn't depend on
+the private data: same file names and columns build_LP_inputs reads, random values.
+
+    write_fixture(root)  # root/data/...
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from preprocessing.config import path_parte_diario, path_scrapped_prices_df
+
+FIXTURE_SEED = 2019
+
+# rutas fijas en el codigo (prices_to_usd_b, get_forecast_prices)
+PATH_USD_B = "data/usd_b_fill.csv"
+PATH_PRECIOS_FORECAST = "data/df_precios_usd_w_forecast203301.csv"
+
+CATEGORIAS = ["VAQUILLONAS270", "VAQUILLONAS391", "NOVILLITOS300", "NOVILLITOS391"]
+STOCK_COLS = [
+    "VACAS", "VAQ 1-2", "VAQ. 1-2 Servicio", "VAQ. 2-3", "NOVILLOS", "NOVILLITOS",
+    "TERNEROS", "TERNERAS", "MACHOS", "HEMBRAS", "TOROS", "TORITOS"
+]
+SALES_COLS = ["?", "vacas", "vaquillonas", "novillos", "novillitos", "toros", "terneros", "terneras"]
+
+
+def write_fixture(root, seed=FIXTURE_SEED):
+    """
+    Write the parte diario, scrapped prices, usd B and forecast prices under root, at the
+    paths of config relative to the repo root. Prices cover every suite horizon from 2019.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+
+    # parte diario diario desde 2014, con algunos dias faltantes
+    dates = pd.date_range("2014-01-01", "2024-12-31", freq="D")
+    dates = dates[~dates.isin(pd.to_datetime(["2021-01-08", "2021-01-09", "2022-01-06"]))]
+    n = len(dates)
+    parte = pd.DataFrame(
+        {"ESTAB.": "LC", "FECHA": [f"{d.month}/{d.day}/{d.year}" for d in dates]}
+    )
+    total = np.zeros(n, dtype=int)
+    for col in STOCK_COLS:
+        stock = rng.integers(0, 300, n).astype(float)
+        stock[rng.random(n) < 0.05] = np.nan
+        parte[col] = stock
+        total += np.nan_to_num(stock).astype(int)
+    parte["TOTAL"] = [f"{t:,}" for t in total]
+    for i in range(15, 25):
+        parte[f"extra{i}"] = 0
+    parte["VENTAS"] = np.where(rng.random(n) < 0.03, "venta", None)
+    for col in SALES_COLS:
+        parte[col] = np.where(rng.random(n) < 0.03, rng.integers(1, 50, n), np.nan)
+    parte.to_csv(os.path.join(root, path_parte_diario), index=False)
+
+    # precios scrappeados en pesos, mensuales
+    periodos = pd.date_range("2014-01-05", periods=101, freq="MS") + pd.Timedelta(days=4)
+    scrapped = pd.DataFrame({"periodo_inicio": periodos.strftime("%d/%m/%Y")})
+    for col in CATEGORIAS:
+        ars = np.linspace(20, 600, len(periodos)) * rng.uniform(0.9, 1.1, len(periodos))
+        scrapped[col] = [f"x,y,AR${int(v)}" for v in ars]
+    scrapped.to_csv(os.path.join(root, path_scrapped_prices_df), index=False)
+
+    dias = pd.date_range("2013-06-01", "2024-12-31", freq="D")
+    dias = dias[rng.random(len(dias)) > 0.2]
+    usd_b = np.linspace(5, 1000, len(dias)) * rng.uniform(0.95, 1.05, len(dias))
+    pd.DataFrame({"avg": usd_b}, index=dias).to_csv(os.path.join(root, PATH_USD_B))
+
+    periodos = pd.date_range("2014-01-05", "2040-01-05", freq="MS") + pd.Timedelta(days=4)
+    forecast = pd.DataFrame({"PERIODO_INICIO": periodos.strftime("%Y-%m-%d")})
+    for col in CATEGORIAS:
+        forecast[col] = rng.uniform(1.3, 2.4, len(periodos))
+    forecast["YYYYMM"] = periodos.strftime("%Y%m")
+    forecast.to_csv(os.path.join(root, PATH_PRECIOS_FORECAST), index=False)
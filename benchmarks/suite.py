@@ -0,0 +1,385 @@
+"""
+Benchmark suite over the whole pipeline at several horizons (periodos_modelo), appended to a
+JSON history so regressions between commits show up.
+
+For each horizon, best of `repeats` runs:
+- inputs/<artifact>: build_LP_inputs without cache, seconds per .dat artifact and in total
+- business: business_variant over the same exercise window
+- solve/<stage>: build_native_inputs, building and solving NativeModel for both strategies
+  (HiGHS, no SCIP needed)
+- logs/<source>: read_scip_log + format_log_df on the stored lp_logs of that horizon and on
+  the logs the native solve writes in SCIP's format
+
+Golden check: build_LP_inputs runs on the synthetic data of fixture.py (fixed seed) and the
+sha256 of every .dat must match GOLDEN_PATH, committed with the repo and recorded with the
+baseline writers, so an optimized code path has to produce the same files byte for byte.
+initial_stock.dat is sampled and left out. A missing GOLDEN_PATH, or a horizon with nothing
+recorded, is an error: record them with update_golden = "update" on a commit whose .dat
+files are known to be right.
+
+The timed stages read the private data/ files when they are all there, and the synthetic
+data of fixture.py otherwise, so a clean clone times them too. Stages whose window the data
+doesn't cover (prices forecast, parte diario) are skipped.
+Every run is appended to HISTORY_PATH with its commit and data source, and compared with
+the last run on the same data of another commit (or the last one, before the first commit):
+stages SLOWER times slower are flagged.
+
+Run from the repo root:
+    python -m benchmarks.suite [horizons] [repeats] [update_golden] [log_dir]
+    python -m benchmarks.suite 24,48,120,240 3
+"""
+import contextlib
+import copy
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from EDA.eda_utils import format_log_df, read_scip_log
+from benchmarks.fixture import PATH_PRECIOS_FORECAST, PATH_USD_B, write_fixture
+from preprocessing.config import (
+    PARAMS,
+    PATH_DAT_FILES,
+    PESOS_PROMEDIO,
+    intervalos_madurez,
+    path_parte_diario,
+    path_scrapped_prices_df,
+)
+from preprocessing.generate_business_variant import business_variant
+from preprocessing.generate_LP_inputs import build_LP_inputs, build_native_inputs
+from preprocessing.InputCache import file_digest
+from preprocessing.NativeModel import NativeModel
+
+HORIZONS = (24, 48, 120, 240)
+FECHA_INICIO = "18/01/2019"
+# el stock inicial se muestrea: con semilla fija los .dat son comparables entre corridas
+STOCK_SEED = 2019
+LOG_DIR = "lp_logs"
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+HISTORY_PATH = os.path.join(RESULTS_DIR, "history.json")
+GOLDEN_PATH = os.path.join("benchmarks", "golden_dat.json")
+# muestreado, con otro generador que el de los writers de referencia
+UNSEEDED_ARTIFACTS = ("stock_inicial",)
+# lo que leen las etapas medidas, si falta alguno se mide sobre el fixture
+DATA_FILES = (path_parte_diario, path_scrapped_prices_df, PATH_USD_B, PATH_PRECIOS_FORECAST)
+
+# por debajo de esto la diferencia es ruido
+SLOWER = 1.25
+MIN_SECONDS = 0.005
+
+
+def horizon_params(periods):
+    params = copy.deepcopy(PARAMS)
+    params["fecha_inicio"] = FECHA_INICIO
+    params["periodos_modelo"] = periods
+    params["mantain_c3_stock"] = 1
+    params["stock_seed"] = STOCK_SEED
+    fin = pd.to_datetime(FECHA_INICIO, format="%d/%m/%Y") + relativedelta(months=periods)
+    params["fecha_fin_ejercicio"] = fin.strftime("%d/%m/%Y")
+
+    return params
+
+
+def best_of(repeats, fn):
+    """
+    Returns:
+        tuple (result of the last call, best time in seconds)
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    return result, best
+
+
+def bench_inputs(periods, repeats, workdir):
+    """
+    Returns:
+        timings by artifact plus "total"
+    """
+    dat_files = {k: os.path.join(workdir, v) for k, v in PATH_DAT_FILES.items()}
+    for path in dat_files.values():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    timings = {}
+    for _ in range(repeats):
+        run = {}
+        start = time.perf_counter()
+        build_LP_inputs(
+            horizon_params(periods),
+            dat_files,
+            path_scrapped_prices_df,
+            PESOS_PROMEDIO,
+            path_parte_diario,
+            intervalos_madurez,
+            costs_plot_path=None,
+            timings=run,
+        )
+        run["total"] = time.perf_counter() - start
+        timings = {k: min(v, timings.get(k, v)) for k, v in run.items()}
+
+    return timings
+
+
+@contextlib.contextmanager
+def working_dir(path):
+    # build_LP_inputs lee data/... relativo al directorio actual
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def fixture_digests(horizons, root):
+    """
+    sha256 of every .dat build_LP_inputs writes on the synthetic data of fixture.py, but
+    the sampled initial stock (its random stream changed with stock_seed).
+
+    Args:
+        root: directory write_fixture wrote to
+
+    Returns:
+        dict horizon -> {artifact: sha256}
+    """
+    for path in PATH_DAT_FILES.values():
+        os.makedirs(os.path.join(root, os.path.dirname(path)), exist_ok=True)
+
+    digests = {}
+    with working_dir(root):
+        for periods in horizons:
+            build_LP_inputs(
+                horizon_params(periods),
+                PATH_DAT_FILES,
+                path_scrapped_prices_df,
+                PESOS_PROMEDIO,
+                path_parte_diario,
+                intervalos_madurez,
+                costs_plot_path=None,
+            )
+            digests[periods] = {
+                k: file_digest(path)
+                for k, path in PATH_DAT_FILES.items()
+                if k not in UNSEEDED_ARTIFACTS
+            }
+
+    return digests
+
+
+def bench_solve(periods, repeats, workdir):
+    """
+    Returns:
+        tuple (timings by stage, paths of the logs written)
+    """
+    params = horizon_params(periods)
+    (inputs, _), timings = best_of(
+        repeats,
+        lambda: build_native_inputs(
+            params, PESOS_PROMEDIO, path_parte_diario, intervalos_madurez
+        ),
+    )
+    timings = {"native_inputs": timings}
+
+    logs = []
+    for strategy in (1, 2):
+        model, timings[f"build_s{strategy}"] = best_of(
+            repeats, lambda: NativeModel(PARAMS=params, strategy=strategy, **inputs)
+        )
+        result, timings[f"highs_s{strategy}"] = best_of(repeats, model.solve)
+        log_path = os.path.join(workdir, f"native_{periods}_s{strategy}.log")
+        model.write_log(log_path, result)
+        logs.append(log_path)
+
+    return timings, logs
+
+
+def bench_logs(log_paths, repeats):
+    def analyse():
+        for log_path in log_paths:
+            format_log_df(read_scip_log(log_path))
+
+    return best_of(repeats, analyse)[1]
+
+
+def stored_logs(log_dir, periods):
+    if not os.path.isdir(log_dir):
+        return []
+    pattern = re.compile(rf"_{periods}periods.*\.log$")
+    return sorted(os.path.join(log_dir, f) for f in os.listdir(log_dir) if pattern.search(f))
+
+
+def check_golden(golden, periods, digests, update):
+    """
+    Returns:
+        list of artifacts whose .dat differs from the recorded one, or a note if the
+        horizon has nothing recorded
+    """
+    if update:
+        golden[str(periods)] = digests
+        return []
+
+    recorded = golden.get(str(periods))
+    if recorded is None:
+        return ["no digests recorded, run with update_golden = 'update'"]
+
+    return sorted(k for k in recorded if digests.get(k) != recorded[k])
+
+
+def commit():
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True
+        ).stdout.strip()
+
+    return git("rev-parse", "--short", "HEAD") or None, bool(git("status", "--porcelain"))
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def dump_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def run(horizons, repeats, log_dir, workdir):
+    """
+    Time every stage on the data/ files of the current directory.
+
+    Returns:
+        tuple (seconds by "stage@horizon", skipped stages with the reason)
+    """
+    results, skipped = {}, {}
+
+    for periods in horizons:
+        # cada etapa por separado: si los datos no cubren la ventana se saltea esa sola
+        def stage(name, fn):
+            try:
+                return fn()
+            except AssertionError as e:
+                skipped[f"{name}@{periods}"] = str(e) or "data doesn't cover the window"
+            except OSError as e:
+                skipped[f"{name}@{periods}"] = f"missing data: {e}"
+
+        horizon_dir = os.path.join(workdir, str(periods))
+        timings = stage("inputs", lambda: bench_inputs(periods, repeats, horizon_dir))
+        if timings is not None:
+            results.update({f"inputs/{k}@{periods}": v for k, v in timings.items()})
+
+        t = stage(
+            "business",
+            lambda: best_of(
+                repeats,
+                lambda: business_variant(
+                    horizon_params(periods),
+                    PESOS_PROMEDIO,
+                    path_parte_diario,
+                    path_scrapped_prices_df,
+                ),
+            )[1],
+        )
+        if t is not None:
+            results[f"business@{periods}"] = t
+
+        native_logs = []
+        out = stage("solve", lambda: bench_solve(periods, repeats, horizon_dir))
+        if out is not None:
+            timings, native_logs = out
+            results.update({f"solve/{k}@{periods}": v for k, v in timings.items()})
+
+        for source, logs in (("stored", stored_logs(log_dir, periods)), ("native", native_logs)):
+            if logs:
+                results[f"logs/{source}@{periods}"] = bench_logs(logs, repeats)
+
+    return results, skipped
+
+
+def main(horizons=None, repeats=3, update_golden="", log_dir=LOG_DIR):
+    horizons = [int(h) for h in horizons.split(",")] if horizons else list(HORIZONS)
+    repeats = int(repeats)
+
+    update = update_golden == "update"
+    assert update or os.path.exists(GOLDEN_PATH), (
+        f"{GOLDEN_PATH} not found, record it with update_golden = 'update'"
+    )
+
+    data = "private" if all(os.path.exists(path) for path in DATA_FILES) else "fixture"
+    # los logs guardados son del repo, no del fixture
+    log_dir = os.path.abspath(log_dir)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        fixture_root = os.path.join(workdir, "fixture")
+        write_fixture(fixture_root)
+        digests = fixture_digests(horizons, fixture_root)
+        with working_dir(os.getcwd() if data == "private" else fixture_root):
+            results, skipped = run(horizons, repeats, log_dir, workdir)
+
+    golden = load_json(GOLDEN_PATH, {})
+    changed = {
+        periods: check_golden(golden, periods, d, update) for periods, d in digests.items()
+    }
+    if update:
+        dump_json(GOLDEN_PATH, golden)
+
+    history = load_json(HISTORY_PATH, [])
+    sha, dirty = commit()
+    # las corridas sin "data" son de antes del fixture, sobre los datos privados
+    same_data = [h for h in history if h.get("data", "private") == data]
+    previous = next(
+        (h for h in reversed(same_data) if h["commit"] != sha),
+        same_data[-1] if same_data else None,
+    )
+    history.append(
+        {
+            "commit": sha,
+            "dirty": dirty,
+            "data": data,
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "repeats": repeats,
+            "results": results,
+            "skipped": skipped,
+        }
+    )
+    dump_json(HISTORY_PATH, history)
+
+    before = previous["results"] if previous else {}
+    print(f"commit {sha}{' (dirty)' if dirty else ''}, best of {repeats}, {data} data")
+    if previous:
+        print(f"compared with {previous['commit']} ({previous['date']})")
+    print(f"{'stage':<36} {'seconds':>9} {'previous':>9} {'ratio':>6}")
+    slower = []
+    for name, seconds in results.items():
+        prev = before.get(name)
+        ratio = seconds / prev if prev else float("nan")
+        flag = prev is not None and ratio > SLOWER and seconds - prev > MIN_SECONDS
+        slower += [name] if flag else []
+        print(
+            f"{name:<36} {seconds:>9.4f} {prev if prev is not None else float('nan'):>9.4f} "
+            f"{ratio:>6.2f}{'  SLOWER' if flag else ''}"
+        )
+    for name, reason in skipped.items():
+        print(f"{name:<36} skipped: {reason}")
+
+    print(f"{len(slower)} stages slower than {SLOWER}x the previous run")
+    failures = {p: c for p, c in changed.items() if c}
+    assert not failures, f".dat files differ from {GOLDEN_PATH}: {failures}"
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
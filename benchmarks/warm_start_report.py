@@ -0,0 +1,60 @@
+"""
+Time to first solution and solving time of both strategies for every experiment of a run,
+read from the SCIP logs. Compare a run with warm_start=True against a cold one (e.g.
+lp_logs_rev) to measure the speedup of starting the free model from the heuristic solution.
+
+Run from the repo root:
+    python -m benchmarks.warm_start_report [log_dir] [cold_log_dir]
+"""
+import json
+import os
+import sys
+
+from EDA.eda_utils import parse_scip_stats
+
+LOG_DIR = "lp_logs"
+
+
+def run_stats(log_dir):
+    with open(os.path.join(log_dir, "experiments_results.json")) as f:
+        experiments = json.load(f)
+
+    stats = {}
+    for experiment, results in experiments.items():
+        for suffix in ("_h", ""):
+            log_path = os.path.join(log_dir, f"{experiment}{suffix}.log")
+            if os.path.exists(log_path):
+                warm_start = results.get(f"warm_start{suffix}", False)
+                stats[f"{experiment}{suffix}"] = dict(
+                    parse_scip_stats(log_path), warm_start=warm_start
+                )
+
+    return stats
+
+
+def main(log_dir=LOG_DIR, cold_log_dir=None):
+    stats = run_stats(log_dir)
+    cold = run_stats(cold_log_dir) if cold_log_dir else {}
+
+    nan = float("nan")
+    print(
+        f"{'experiment':<45} {'warm':>5} {'first sol (s)':>13} {'solving (s)':>11} "
+        f"{'cold first':>10} {'cold solving':>12}"
+    )
+    for name, s in stats.items():
+        c = cold.get(name, {})
+        print(
+            f"{name:<45} {str(s['warm_start']):>5} {s['first_solution_time'] or nan:>13.2f} "
+            f"{s['solving_time'] or nan:>11.2f} {c.get('first_solution_time') or nan:>10.2f} "
+            f"{c.get('solving_time') or nan:>12.2f}"
+        )
+
+    for label, run in (("total", stats), ("cold total", cold)):
+        if run:
+            first = sum(s["first_solution_time"] or 0 for s in run.values())
+            solving = sum(s["solving_time"] or 0 for s in run.values())
+            print(f"{label:<45} {'':>5} {first:>13.2f} {solving:>11.2f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
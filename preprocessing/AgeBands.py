@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+from preprocessing.NativeModel import ZERO_TOL, stock_from_decisions
+
+# edades con restricciones propias en los .zpl, no se juntan con la anterior
+C3_BAND_STARTS = (12, 24, 30)  # llegan las transferencias, paren, "young" de mantain
+TRANSFER_AGE = 11
+
+
+class AgeBands:
+    """
+    Exact aggregation of the age axis: runs of consecutive ages of a class that the model
+    can't tell apart are collapsed into one stock, a band.
+
+    Ages of a band have the same holding cost in every period, no sales (price <= 0 in
+    every period) and no transfers, and take part in the same constraints. A head that
+    enters a band at its first age leaves it untouched width periods later, so the flow
+    of a band is its inflow minus the inflow of width periods before: no approximation.
+
+    Ages with their own role stay alone: -1, 0 (births) and class 2 at 11 months
+    (transfers). Class 3 bands start again at 12 (receives the transfers), 24 (counts for
+    the births) and 30 (young stock of mantain_c3_stock). Ages with a price stay alone as
+    well, so only the decision-free stretches of the 10 years collapse.
+    """
+
+    def __init__(self, prices, costs, PARAMS):
+        """
+        Args:
+            prices: (periodos, edades, clases) array, as returned by get_price_tensor
+            costs: (edades, clases) array as returned by get_cost_matrix, or (periodos, edades, clases)
+            PARAMS: model parameters
+        """
+        P, M = PARAMS["periodos_modelo"], PARAMS["meses_max_animales"]
+        nE, nC = M + 2, np.shape(prices)[-1]
+        E = np.arange(-1, M + 1)
+        costs = np.broadcast_to(np.asarray(costs, dtype=float), (P, nE, nC))
+
+        quiet = (np.asarray(prices) <= 0).all(axis=0)
+        quiet[E == TRANSFER_AGE, 1] = False
+
+        # joins[e, c]: la edad e sigue en la banda de e - 1
+        joins = np.zeros((nE, nC), dtype=bool)
+        joins[1:] = quiet[1:] & quiet[:-1] & (costs[:, 1:] == costs[:, :-1]).all(axis=0)
+        joins[E <= 0] = False
+        joins[E == 1, :2] = False
+        joins[np.isin(E, C3_BAND_STARTS), 2] = False
+
+        starts_e, starts_c = np.nonzero(~joins.T)[::-1]
+        self.clase = starts_c + 1
+        self.first = E[starts_e]
+        # la banda termina donde empieza la siguiente de la misma clase
+        next_first = np.append(self.first[1:], M + 1)
+        next_first[np.append(self.clase[1:] != self.clase[:-1], True)] = M + 1
+        self.last = next_first - 1
+        self.width = self.last - self.first + 1
+
+        # banda de cada (edad, clase), edades desplazadas en 1 y clases en -1
+        self.band = np.cumsum(~joins.T).reshape(nC, nE).T - 1
+        self.M = M
+
+    def save(self, path, initial_stock):
+        """
+        Save the bands and the initial stock expand_log needs, read back with AgeBands.load.
+        """
+        np.savez(
+            path,
+            clase=self.clase,
+            first=self.first,
+            last=self.last,
+            band=self.band,
+            M=self.M,
+            initial_stock=np.asarray(initial_stock, dtype=float),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns:
+            tuple (AgeBands, initial_stock) as saved by AgeBands.save
+        """
+        with np.load(path) as data:
+            bands = cls.__new__(cls)
+            bands.clase, bands.first, bands.last = data["clase"], data["first"], data["last"]
+            bands.width = bands.last - bands.first + 1
+            bands.band, bands.M = data["band"], int(data["M"])
+            return bands, data["initial_stock"]
+
+    def __len__(self):
+        return len(self.first)
+
+    def previous(self, b):
+        """
+        Band the first age of band b comes from, None for age -1.
+        """
+        if self.first[b] == -1:
+            return None
+        return self.band[self.first[b], self.clase[b] - 1]
+
+    def band_stock(self, x):
+        """
+        Per-age stock (periodos + 1, edades, clases) summed by band.
+
+        Returns:
+            (periodos + 1, bandas) array
+        """
+        x = np.asarray(x)
+        stock = np.zeros((len(x), len(self)))
+        for c in range(x.shape[-1]):
+            np.add.at(stock.T, self.band[:, c], x[:, :, c].T)
+        return stock
+
+    def expand_log(self, Log_df, initial_stock):
+        """
+        Per-age Log_df out of the solution of a banded model, as parse_scip_log returns it.
+
+        Band stocks x (and the o aging-out flows) are replaced by the stock of every age,
+        rebuilt from the initial stock and the y, w and n of the solution. Their unit
+        impact is minus the holding cost of the band, 0 at t = 0.
+        """
+        P = int(Log_df["t"].max())
+        nE, nC = self.band.shape
+        decisions = {
+            "y": np.zeros((P + 1, nE, nC)),
+            "w": np.zeros((P + 1, nE)),
+            "n": np.zeros((P + 1, nC)),
+        }
+        # n#t#c: la clase queda en la posicion de la edad
+        for var, values in decisions.items():
+            rows = Log_df[Log_df["var"] == var]
+            t, age = rows["t"].to_numpy(int), rows["age"].to_numpy(int)
+            if var == "y":
+                index = (t, age + 1, rows["class"].to_numpy(int) - 1)
+            elif var == "w":
+                index = (t, age + 1)
+            else:
+                index = (t, age - 1)
+            np.add.at(values, index, rows["value"].to_numpy())
+
+        stock = stock_from_decisions(initial_stock, *decisions.values())
+
+        x_rows = Log_df[Log_df["var"] == "x"]
+        cost = dict(
+            zip(
+                zip(*(x_rows[k].astype(int) for k in ("t", "age", "class"))),
+                x_rows["unit_impact_on_obj_func"],
+            )
+        )
+        t, e, c = np.nonzero(stock > ZERO_TOL)
+        ages, classes = e - 1, c + 1
+        firsts = self.first[self.band[e, c]]
+        x_df = pd.DataFrame(
+            {
+                "variable": [f"x#{a}#{b}#{k}" for a, b, k in zip(t, ages, classes)],
+                "var": "x",
+                "t": pd.array(t, dtype="Int64"),
+                "age": pd.array(ages, dtype="Int64"),
+                "class": pd.array(classes, dtype="Int64"),
+                "value": stock[t, e, c],
+                "unit_impact_on_obj_func": [
+                    cost.get((a, b, k), 0.0) if a > 0 else 0.0
+                    for a, b, k in zip(t, firsts, classes)
+                ],
+            }
+        )
+
+        return pd.concat(
+            [Log_df[~Log_df["var"].isin(["x", "o"])], x_df], ignore_index=True
+        )
@@ -0,0 +1,211 @@
+import numpy as np
+from scipy import sparse
+
+from EDA.eda_utils import bands_file
+from preprocessing.AgeBands import AgeBands
+from preprocessing.NativeModel import NativeModel, stock_from_decisions
+
+
+def _combine(*parts):
+    # suma de expresiones lineales {columna: coef}, None es la constante
+    out = {}
+    for coef, expr in parts:
+        for col, value in expr.items():
+            out[col] = out.get(col, 0.0) + coef * value
+    return out
+
+
+class BandedModel(NativeModel):
+    """
+    NativeModel over age bands, in memory only: the flow formulation of
+    model_strategy_1eng.zpl / model_strategy_2eng.zpl with one stock per band, see AgeBands.
+
+    The x column of the first age of a band holds the stock of the whole band, the other
+    ages of the band have no x column, nor y from period 1 on (they have no price). The
+    flow is one row per band and period: the band keeps its stock, gains what enters at
+    its first age and loses what leaves its last age, which entered width periods before.
+    Sales, transfers, births and maintain rows are NativeModel's over the columns left.
+
+    solve fills the x of every age from y, w and n. write_log writes one x per band and
+    saves the bands next to the log: read_scip_log and solution_store.ingest_log expand it
+    back to every age.
+    """
+
+    def __init__(self, *args, bands=None, live=None, **kwargs):
+        """
+        Args:
+            bands: AgeBands of the prices and costs, computed from them if None
+            live: as in NativeModel, the ages inside a band are dropped either way
+        """
+        self.bands = bands
+        super().__init__(*args, live={} if live is None else live, **kwargs)
+
+    def _drop_dead_cells(self, live):
+        bands = self.bands
+        P1 = self.P + 1
+
+        # x: primera edad de cada banda, viva si alguna edad de la banda lo esta
+        x_live = np.ones((P1, self.nE, self.nC), dtype=bool)
+        if "x" in live:
+            x_live[:] = False
+            x_live.flat[live["x"]] = True
+        t, b = np.nonzero(bands.band_stock(x_live))
+        x_cells = self.x(t, bands.first[b], bands.clase[b]) - self.blocks["x"][0]
+
+        y_live = np.ones((P1, self.nE, self.nC), dtype=bool)
+        if "y" in live:
+            y_live[:] = False
+            y_live.flat[live["y"]] = True
+        y_live[1:] &= ~(bands.width > 1)[bands.band]
+
+        super()._drop_dead_cells(
+            {**live, "x": np.sort(x_cells), "y": np.flatnonzero(y_live)}
+        )
+
+        # filas con una sola columna viva (transferencias y ventas en edades de una banda):
+        # pasan a ser cotas, HiGHS presolve devuelve soluciones suboptimas con gap 0 si quedan
+        A = self.A.tocsr()
+        single = np.diff(A.indptr) == 1
+        single[single] = A.data[A.indptr[:-1][single]] != 0
+        first = A.indptr[:-1][single]
+        cols, coef = self.columns[A.indices[first]], A.data[first]
+        single = np.flatnonzero(single)
+        lo, hi = self.row_lo[single] / coef, self.row_hi[single] / coef
+        lo, hi = np.where(coef > 0, lo, hi), np.where(coef > 0, hi, lo)
+        np.maximum.at(self.lb, cols, lo)
+        np.minimum.at(self.ub, cols, hi)
+        self._keep_rows(np.setdiff1d(np.arange(self.n_rows), single))
+
+    ### MODEL ###
+
+    def _build_objective(self):
+        super()._build_objective()
+        if self.bands is None:
+            self.bands = AgeBands(self.prices, self.costs, self.PARAMS)
+
+    def _transfers_0(self):
+        if self.initial_transfers is None:
+            return np.zeros(self.nE)
+        return np.asarray(self.initial_transfers, dtype=float)
+
+    def _build_bounds(self):
+        super()._build_bounds()
+        bands, E = self.bands, np.arange(-1, self.M + 1)
+
+        # r_initial_stock_set por banda
+        e, c = self._grid(E, np.arange(1, self.nC + 1))
+        self.lb[self.x(0, e, c)] = self.ub[self.x(0, e, c)] = 0
+        x0 = self.x(0, bands.first, bands.clase)
+        self.lb[x0] = self.ub[x0] = bands.band_stock(self.initial_stock[None])[0]
+
+        # lo que pasa en el periodo 1 a una edad dentro de una banda no tiene x propio:
+        # y[0] <= x[0] -/+ w[0] en su lugar, despues la banda se mueve entera
+        left = self.initial_stock.copy()
+        left[:, 1] -= self._transfers_0()
+        left[:, 2] += self._transfers_0()
+        feeds = np.zeros((self.nE, self.nC), dtype=bool)
+        feeds[:-1] = (bands.width > 1)[bands.band][1:]
+        e, c = np.nonzero(feeds)
+        cols = self.y(0, e - 1, c + 1)
+        self.ub[cols] = np.minimum(self.ub[cols], left[e, c])
+
+    def _step(self, t, e, c):
+        # x[t + 1, e + 1, c] - x[t, e, c]
+        terms = {self.y(t, e, c): -1.0}
+        if c == 2:
+            terms[self.w(t, e)] = -1.0
+        elif c == 3:
+            terms[self.w(t, e)] = 1.0
+        return terms
+
+    def _build_flow(self):
+        bands = self.bands
+        stock_0 = self.initial_stock
+        first_memo, last_memo = {}, {}
+
+        def first_stock(t, b):
+            # x[t, primera edad, c] para t >= 1
+            if (t, b) not in first_memo:
+                first, c = bands.first[b], bands.clase[b]
+                prev = bands.previous(b)
+                if first == 0 and c < 3:
+                    expr = {self.n(t, c): 1.0}
+                elif prev is None:
+                    expr = {}
+                else:
+                    expr = _combine(
+                        (1, last_stock(t - 1, prev)), (1, self._step(t - 1, first - 1, c))
+                    )
+                first_memo[t, b] = expr
+            return first_memo[t, b]
+
+        def last_stock(t, b):
+            # x[t, ultima edad, c]: lo que entro a la banda width - 1 periodos antes
+            if (t, b) not in last_memo:
+                first, last, c = bands.first[b], bands.last[b], bands.clase[b]
+                width = bands.width[b]
+                if t == 0:
+                    expr = {None: stock_0[last + 1, c - 1]}
+                elif width == 1:
+                    expr = {self.x(t, first, c): 1.0}
+                elif t >= width:
+                    expr = first_stock(t - width + 1, b)
+                else:
+                    e = last - t
+                    expr = _combine(
+                        (1, {None: stock_0[e + 1, c - 1]}), (1, self._step(0, e, c))
+                    )
+                last_memo[t, b] = expr
+            return last_memo[t, b]
+
+        rows, cols, data, rhs = [], [], [], []
+        for t in range(1, self.P + 1):
+            for b in range(len(bands)):
+                first, last, c = bands.first[b], bands.last[b], bands.clase[b]
+                # edad -1 acotada en 0, edad 0 de c1/c2 en connect_age_0_and_births
+                if first == -1 or (first == 0 and c < 3):
+                    continue
+
+                parts = [(1, {self.x(t, first, c): 1.0}), (-1, first_stock(t, b))]
+                if bands.width[b] > 1:
+                    parts += [(-1, {self.x(t - 1, first, c): 1.0}), (1, last_stock(t - 1, b))]
+                    if t == 1:
+                        parts += [(-1, self._step(0, e, c)) for e in range(first, last)]
+                expr = {k: v for k, v in _combine(*parts).items() if v != 0 or k is None}
+
+                rhs.append(-expr.pop(None, 0.0))
+                rows += [len(rhs) - 1] * len(expr)
+                cols += list(expr)
+                data += list(expr.values())
+
+        A = sparse.coo_matrix((data, (rows, cols)), shape=(len(rhs), self.n_vars))
+        self._add_matrix_rows("r_flow_bands", A, rhs, rhs)
+
+    ### SOLVE ###
+
+    def solve(self, *args, **kwargs):
+        result = super().solve(*args, **kwargs)
+        if result["x"] is not None:
+            offset, shape = self.blocks["x"]
+            stock = stock_from_decisions(
+                self.initial_stock, *(self.values(result["x"], name) for name in "ywn")
+            )
+            result["x"][offset : offset + int(np.prod(shape))] = stock.ravel()
+
+        return result
+
+    def write_log(self, log_path, result):
+        x = result["x"]
+        if x is not None:
+            # x solo en la primera edad de cada banda, con el stock de toda la banda
+            offset, shape = self.blocks["x"]
+            stock = self.values(x, "x").copy()
+            x = x.copy()
+            x[offset : offset + int(np.prod(shape))] = 0
+            bands = self.bands
+            x[self.x(np.arange(shape[0])[:, None], bands.first, bands.clase)] = (
+                bands.band_stock(stock)
+            )
+
+        super().write_log(log_path, {**result, "x": x})
+        self.bands.save(bands_file(log_path), self.initial_stock)
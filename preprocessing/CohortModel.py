@@ -0,0 +1,233 @@
+import numpy as np
+from scipy import sparse
+
+from preprocessing.NativeModel import NativeModel, stock_from_decisions
+
+
+def cost_to_go(costs, PARAMS):
+    """
+    Cost a head held at (t, e, c) still pays along its cohort: the cost of every later cell
+    of its diagonal (t + k, e + k, c) up to the last period or the maximum age.
+
+    c1/c2 animals at age -1 don't reach age 0 (it is set by the births), so their cost to
+    go is 0, class 3 cohorts start at age -1.
+
+    Args:
+        costs: (edades, clases) array as returned by get_cost_matrix, or (periodos, edades, clases)
+        PARAMS: model parameters
+
+    Returns:
+        float array of shape (periodos + 1, edades, clases), ages start at -1
+    """
+    P, nE = PARAMS["periodos_modelo"], PARAMS["meses_max_animales"] + 2
+    nC = np.shape(costs)[-1]
+    costs = np.broadcast_to(np.asarray(costs, dtype=float), (P, nE, nC))
+
+    # costs[t - 1] es el costo del periodo t
+    R = np.zeros((P + 1, nE, nC))
+    for t in range(P - 1, -1, -1):
+        R[t, :-1] = costs[t, 1:] + R[t + 1, 1:]
+        R[t, 0, :2] = 0
+
+    return R
+
+
+class CohortModel(NativeModel):
+    """
+    NativeModel indexed by cohort, in memory only: the flow formulation of
+    model_strategy_1eng.zpl / model_strategy_2eng.zpl with the stock variables made implicit.
+
+    The flow equations move each head along a diagonal (t + k, e + k, c), so the stock of a
+    cell is its cohort's base (x[0], the births n[t - e] or 0) minus what the cohort sold
+    and transferred before t. With x implicit:
+
+    - flow, control sales, control transfers and x >= 0 become one capacity row per c1/c2
+      cohort (everything it sells or transfers is at most its base) and two per class 3
+      cohort (before and after the transfer it receives at 11 months)
+    - the holding cost moves to the decisions: a sale saves the cost to go of the cohort,
+      a birth pays it, a transfer swaps the class 2 one for the class 3 one. What x[0]
+      pays if nothing is sold is a constant, added back to the objective
+    - births and the class 3 maintain rows sum the class 3 stock expression
+
+    x keeps its block in the layout but has no columns, solve fills it from y, w and n.
+    """
+
+    def __init__(self, *args, live=None, **kwargs):
+        # x sin columnas, el resto vivo o denso como en NativeModel
+        live = {**(live or {}), "x": np.array([], dtype=np.int64)}
+        super().__init__(*args, live=live, **kwargs)
+
+    ### MODEL ###
+
+    def _build_objective(self):
+        super()._build_objective()
+        P, E, C = self.P, np.arange(-1, self.M + 1), np.arange(1, self.nC + 1)
+        self.cost_to_go = R = cost_to_go(self.costs, self.PARAMS)
+
+        offset, shape = self.blocks["x"]
+        self.obj[offset : offset + int(np.prod(shape))] = 0
+
+        t, e, c = self._grid(np.arange(P + 1), E, C)
+        self.obj[self.y(t, e, c)] += R.ravel()
+
+        t, e = self._grid(np.arange(P + 1), E)
+        self.obj[self.w(t, e)] = (R[:, :, 1] - R[:, :, 2]).ravel()
+
+        # n[t,c] entra a x[t,0,c]: paga ese periodo y todo lo que sigue
+        t, c = self._grid(np.arange(1, P + 1), np.array([1, 2]))
+        self.obj[self.n(t, c)] = -(self.costs[t - 1, 1, c - 1] + R[t, 1, c - 1])
+
+        self.objective_offset = -(self.initial_stock * R[0]).sum()
+
+    def _build_bounds(self):
+        super()._build_bounds()
+        offset, shape = self.blocks["x"]
+        self.lb[offset : offset + int(np.prod(shape))] = 0
+        self.ub[offset : offset + int(np.prod(shape))] = 0
+
+        # r_non_negative_age_stock: nada que vender a edad -1
+        t, c = self._grid(np.arange(1, self.P + 1), np.arange(1, self.nC + 1))
+        self.ub[self.y(t, -1, c)] = 0
+
+    def _cohort_rows(self, d, cols, coef, n_cohorts):
+        return sparse.coo_matrix(
+            (np.broadcast_to(np.asarray(coef, dtype=float), np.shape(cols)), (d, cols)),
+            shape=(n_cohorts, self.n_vars),
+        )
+
+    def _c3_stock(self, periods):
+        """
+        x[t,e,3] of each period as base + X @ v, v the full variable vector.
+
+        Returns:
+            dict t -> (base (edades,), X csr (edades, n_vars))
+        """
+        nE, E = self.nE, np.arange(-1, self.M + 1)
+        rows = np.arange(nE)
+        shift = sparse.eye(nE, k=-1, format="csr")
+
+        def pick(cols, coef):
+            return sparse.csr_matrix(
+                (np.full(nE, coef), (rows, cols)), shape=(nE, self.n_vars)
+            )
+
+        base = self.initial_stock[:, 2].copy()
+        X = sparse.csr_matrix((nE, self.n_vars))
+        stock = {0: (base, X)}
+        for t in range(1, max(periods, default=0) + 1):
+            X = shift @ (X - pick(self.y(t - 1, E, 3), 1) + pick(self.w(t - 1, E), 1))
+            base = np.concatenate([[0.0], base[:-1]])
+            stock[t] = (base, X)
+
+        return {t: stock[t] for t in periods}
+
+    def _build_constraints(self):
+        P, M = self.P, self.M
+        T = np.arange(1, P + 1)
+        E = np.arange(-1, M + 1)
+        stock_0 = self.initial_stock
+
+        # r_cohort_c1 / r_cohort_c2: cohorte d = t - e, base x[0,-d] si d <= 0, n[d] si no
+        n_cohorts = P + M + 1
+        t, e = self._grid(np.arange(P + 1), np.arange(0, M + 1))
+        d = t - e
+        born = np.arange(1, P + 1)
+        for c in (1, 2):
+            A = self._cohort_rows(d + M, self.y(t, e, c), 1, n_cohorts)
+            A += self._cohort_rows(born + M, self.n(born, c), -1, n_cohorts)
+            if c == 2:
+                # solo w[t,11] y las transferencias fijas de w[0] pueden ser > 0
+                into = ((e == 11) | (t == 0)) & (e < M)
+                tw, ew = t[into], e[into]
+                A += self._cohort_rows(tw - ew + M, self.w(tw, ew), 1, n_cohorts)
+            base_0 = np.zeros(n_cohorts)
+            base_0[: M + 1] = stock_0[1:, c - 1][::-1]
+            self._add_matrix_rows(f"r_cohort_c{c}", A, -np.inf, base_0)
+
+        # r_cohort_c3: cohorte d = t - e desde la edad -1, recibe w[d + 11, 11] a los 12 meses
+        n_cohorts = P + M + 2
+        t, e = self._grid(np.arange(P + 1), E)
+        d = t - e
+        base_3 = np.zeros(n_cohorts)
+        base_3[: M + 2] = stock_0[:, 2][::-1]
+
+        A = self._cohort_rows(d + M, self.y(t, e, 3), 1, n_cohorts)
+        tw, ew = self._grid(np.arange(P), E)
+        into = ((ew == 11) | (tw == 0)) & (ew < M)
+        tw, ew = tw[into], ew[into]
+        A += self._cohort_rows(tw - ew + M, self.w(tw, ew), -1, n_cohorts)
+        self._add_matrix_rows("r_cohort_c3", A, -np.inf, base_3)
+
+        # antes de la transferencia el stock tampoco puede quedar negativo
+        received = np.arange(-10, P - 11)
+        before = (e <= 11) & np.isin(d, received)
+        A = self._cohort_rows(d[before] + M, self.y(t[before], e[before], 3), 1, n_cohorts)
+        A = A.tocsr()[received + M]
+        self._add_matrix_rows("r_cohort_c3_before_transfer", A, -np.inf, base_3[received + M])
+
+        # r_minimum_sales / r_maximum_sales, ventas de clase 1 y 2 por periodo
+        t, e, c = np.meshgrid(T, E, [1, 2], indexing="ij")
+        ventas_c1_c2 = self.y(t, e, c).reshape(P, -1)
+        self._add_rows(
+            "r_minimum_sales",
+            [(ventas_c1_c2, 1), (self.s(T), -self.PARAMS["ventas_min_por_mes"])],
+            0,
+            np.inf,
+        )
+        self._add_rows(
+            "r_maximum_sales",
+            [(ventas_c1_c2, 1), (self.s(T), -self.PARAMS["virtual_ventas_max_por_mes"])],
+            -np.inf,
+            0,
+        )
+
+        august = self.august_periods
+        maintain = self.PARAMS["mantain_c3_stock"] == 1
+        stock_3 = self._c3_stock(august + ([P] if maintain else []))
+
+        # r_births_c1 / r_births_c2
+        preg = self.PARAMS["pregnancy_index"] / 2
+        for c in (1, 2):
+            for t in august:
+                base, X = stock_3[t]
+                row = sparse.csr_matrix(
+                    ([1.0], ([0], [self.n(t, c)])), shape=(1, self.n_vars)
+                ) - preg * X[E >= 24].sum(axis=0)
+                rhs = preg * base[E >= 24].sum()
+                self._add_matrix_rows(f"r_births_c{c}", sparse.csr_matrix(row), rhs, rhs)
+
+        if maintain:
+            base, X = stock_3[P]
+            row = sparse.csr_matrix(X.sum(axis=0))
+            if self.c3_target is not None:
+                target_all, target_young = self.c3_target
+            else:
+                target_all, target_young = stock_0[:, 2].sum(), stock_0[E < 30, 2].sum()
+            self._add_matrix_rows(
+                "r_maintain_c3_bigger_or_equal_end_of_period_all",
+                row,
+                target_all - base.sum(),
+                np.inf,
+            )
+            self._add_matrix_rows(
+                "r_maintain_c3_bigger_or_equal_end_of_period_young",
+                row,
+                target_young - base.sum(),
+                np.inf,
+            )
+
+    ### SOLVE ###
+
+    def solve(self, *args, **kwargs):
+        result = super().solve(*args, **kwargs)
+        if result["x"] is not None:
+            offset, shape = self.blocks["x"]
+            stock = stock_from_decisions(
+                self.initial_stock, *(self.values(result["x"], name) for name in "ywn")
+            )
+            result["x"][offset : offset + int(np.prod(shape))] = stock.ravel()
+            result["objective"] += self.objective_offset
+        if result["dual_bound"] is not None:
+            result["dual_bound"] += self.objective_offset
+
+        return result
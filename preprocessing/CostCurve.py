@@ -0,0 +1,138 @@
+import numpy as np
+
+
+def pchip_slopes(x, y):
+    """
+    Node derivatives of the monotone cubic (PCHIP, Fritsch-Carlson) through (x, y).
+
+    Same formulas as scipy.interpolate.PchipInterpolator: weighted harmonic mean of the
+    neighbouring secants inside, zero at local extrema, and the shape preserving three point
+    formula at both ends.
+    """
+    h = np.diff(x)
+    m = np.diff(y) / h
+    if len(x) == 2:
+        return np.full(2, m[0])
+
+    d = np.zeros(len(x))
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    flat = (np.sign(m[1:]) != np.sign(m[:-1])) | (m[1:] == 0) | (m[:-1] == 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        whmean = (w1 / m[:-1] + w2 / m[1:]) / (w1 + w2)
+    d[1:-1] = np.where(flat, 0.0, 1.0 / np.where(flat, 1.0, whmean))
+
+    d[0] = _edge_slope(h[0], h[1], m[0], m[1])
+    d[-1] = _edge_slope(h[-1], h[-2], m[-1], m[-2])
+
+    return d
+
+
+def _edge_slope(h0, h1, m0, m1):
+    d = ((2 * h0 + h1) * m0 - h0 * m1) / (h0 + h1)
+    if np.sign(d) != np.sign(m0):
+        return 0.0
+    if np.sign(m0) != np.sign(m1) and abs(d) > 3.0 * abs(m0):
+        return 3.0 * m0
+    return d
+
+
+def node_derivatives(x, y):
+    """
+    Second order accurate derivative of (x, y) at every node, as findiff's non-uniform
+    FinDiff that skfda's FDataGrid.derivative() used: the weights of each three point stencil
+    (forward at the first node, backward at the last, central inside) solve its Vandermonde
+    system. Same values as np.gradient(y, x, edge_order=2), but bit for bit the old ones.
+    """
+    n = len(x)
+    d = np.zeros(n)
+    for k in range(n):
+        offsets = np.arange(3) if k == 0 else np.arange(-2, 1) if k == n - 1 else np.arange(-1, 2)
+        diffs = x[k + offsets] - x[k]
+        weights = np.linalg.solve(diffs[None, :] ** np.arange(3)[:, None], [0.0, 1.0, 0.0])
+        for w, off in zip(weights, offsets):
+            d[k] += w * y[k + off]
+
+    return d
+
+
+class Pchip:
+    """
+    Monotone piecewise cubic through (x, y), evaluated as scipy's PPoly: power basis on
+    each interval, the end pieces extrapolate.
+    """
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+
+        d = pchip_slopes(self.x, self.y)
+        h = np.diff(self.x)
+        m = np.diff(self.y) / h
+        t = (d[:-1] + d[1:] - 2 * m) / h
+        self._c = np.stack([t / h, (m - d[:-1]) / h - t, d[:-1], self.y[:-1]])
+
+    def __call__(self, points):
+        points = np.asarray(points, dtype=float)
+        i = np.clip(np.searchsorted(self.x, points, side="right") - 1, 0, len(self.x) - 2)
+        s = points - self.x[i]
+        c3, c2, c1, c0 = self._c[:, i]
+
+        # mismo orden de sumas que PPoly: c0 + c1 s + c2 s^2 + c3 s^3
+        return c0 + c1 * s + c2 * (s * s) + c3 * (s * s * s)
+
+
+class CostCurve:
+    """
+    Accumulated cost curve of c1/c2 animals by age in months and its monthly cost.
+
+    The accumulated cost is the monotone cubic through the cost points
+    (costos_meses_usd_c1_c2_pre_norm). The monthly cost is the second order finite
+    difference derivative of those points, interpolated the same way: what skfda's
+    FDataGrid.derivative() of the SplineInterpolation(3, monotone=True) grid gave.
+
+    Integer ages -1..max_age are tabulated once (monthly and cumulative from age 0), so the
+    cost matrix and the stock valuations are lookups.
+    """
+
+    def __init__(self, costos, max_age=None):
+        """
+        Args:
+            costos: dict age in months -> accumulated cost
+            max_age: last age of the lookup tables, the last cost point if None
+        """
+        meses = np.array(sorted(costos), dtype=float)
+        acumulado = np.array([costos[k] for k in sorted(costos)], dtype=float)
+
+        self.accumulated = Pchip(meses, acumulado)
+        self.monthly = Pchip(meses, node_derivatives(meses, acumulado))
+        self.intercept = float(self.accumulated(0.0))
+
+        max_age = int(meses[-1]) if max_age is None else max_age
+        self.ages = np.arange(-1, max_age + 1)
+        self.table = self.monthly(self.ages)
+        # costo acumulado de los meses 0..edad, sin el intercept
+        self.cumulative_table = np.concatenate([[0.0], np.cumsum(self.table[1:])])
+
+    def evaluate(self, eval_points):
+        """
+        Monthly cost at the given ages, from the lookup table for tabulated integer ages.
+        """
+        points = np.asarray(eval_points, dtype=float)
+        i = points.astype(int) + 1
+        tabulated = (points == np.round(points)) & (i >= 0) & (i < len(self.table))
+        if tabulated.all():
+            return self.table[i]
+
+        return self.monthly(points)
+
+    def cumulative(self, ages):
+        """
+        Sum of the monthly cost over the months 0..age of each age (0 for age -1), without
+        the intercept.
+        """
+        ages = np.asarray(ages, dtype=int)
+        if ages.max(initial=-1) >= self.ages[-1] + 1:
+            raise ValueError(f"ages up to {self.ages[-1]} are tabulated, got {ages.max()}")
+
+        return self.cumulative_table[ages + 1]
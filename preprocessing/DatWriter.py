@@ -0,0 +1,102 @@
+import gzip
+import os
+
+import numpy as np
+
+# 1 MB de buffer: los .dat se escriben en pocos write() grandes
+BUFFER_SIZE = 1 << 20
+
+
+def sidecar_path(path):
+    """
+    prices.dat (or prices.dat.gz) -> prices.npy
+    """
+    if path.endswith(".gz"):
+        path = path[:-3]
+    return os.path.splitext(path)[0] + ".npy"
+
+
+class DatWriter:
+    """
+    Buffered writer of the tab separated tables read by the .zpl models.
+
+    Rows are given as columns (numpy arrays or lists) and formatted in bulk, every value
+    with str() as the original generators did, so the text is the same byte for byte:
+    "periodo\\tedad\\tclase\\tvalor\\t\\n". A path ending in .gz is gzipped (ZIMPL reads
+    gzipped files when built with zlib).
+
+    With sidecar=True the rows are also kept and saved on close as a 2D .npy array next to
+    the .dat (see sidecar_path), for backends that don't parse ZIMPL text. read_dat loads it.
+    """
+
+    def __init__(self, path, sep="\t", end="\t\n", header=None, sidecar=False):
+        self.path = path
+        self.sep = sep
+        self.end = end
+        self.sidecar = sidecar
+        self.rows = 0
+        self._chunks = []
+
+        if path.endswith(".gz"):
+            self._f = gzip.open(path, "wt")
+        else:
+            self._f = open(path, "w", buffering=BUFFER_SIZE)
+        if header is not None:
+            self._f.write(f"{header}\n")
+
+    def write(self, *columns):
+        """
+        Append rows, one value of every column per row. Columns must have the same length.
+        """
+        # tolist() da ints y floats de python: mismo str() que las filas armadas a mano
+        values = [c.tolist() if isinstance(c, np.ndarray) else list(c) for c in columns]
+        n = len(values[0])
+        assert all(len(v) == n for v in values), [len(v) for v in values]
+
+        template = self.sep.join("{}" for _ in values) + self.end
+        self._f.write("".join(map(template.format, *values)))
+        self.rows += n
+
+        if self.sidecar:
+            self._chunks.append(np.column_stack([np.asarray(c) for c in columns]))
+
+    def close(self):
+        self._f.close()
+        if self.sidecar:
+            table = np.concatenate(self._chunks) if self._chunks else np.empty((0, 0))
+            np.save(sidecar_path(self.path), table)
+            self._chunks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_dat(path, *columns, sep="\t", end="\t\n", header=None, sidecar=False):
+    """
+    Write a whole table at once with DatWriter.
+
+    Returns:
+        number of rows written
+    """
+    with DatWriter(path, sep=sep, end=end, header=header, sidecar=sidecar) as writer:
+        writer.write(*columns)
+
+    return writer.rows
+
+
+def read_dat(path):
+    """
+    Read a numeric table written by DatWriter, from its .npy sidecar when there is one
+    at least as recent as the text.
+
+    Returns:
+        2D array, one column per written column
+    """
+    npy = sidecar_path(path)
+    if os.path.exists(npy) and os.path.getmtime(npy) >= os.path.getmtime(path):
+        return np.load(npy)
+
+    return np.loadtxt(path, ndmin=2)
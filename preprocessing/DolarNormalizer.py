@@ -1,15 +1,51 @@
-
+import numpy as np
 import pandas as pd
 
+from preprocessing.InputCache import file_digest
+
+# normalizadores ya levantados, keyed por sha256 del csv
+_LOADED = {}
+
+
 class DolarNormalizer:
     def __init__(self, filename):
         # Load DataFrame from CSV file
         self.df = pd.read_csv(filename, index_col=0, parse_dates=True)
-        
+
+        # sumas acumuladas del dolar diario (truncado a int, como la media original)
+        order = np.argsort(self.df.index.to_numpy(), kind="stable")
+        self._fechas = self.df.index.to_numpy()[order]
+        self._cumsum = np.concatenate(
+            [[0], np.cumsum(self.df["avg"].astype(int).to_numpy()[order])]
+        )
+
     def mean_last_n_days(self, to_date, n):
-        from_date = to_date - pd.Timedelta(days=n-1)
-        df_slice = self.df[from_date:to_date]
-        mean = df_slice['avg'].astype(int).mean()
-        
-        return mean
-    
+        """
+        Mean USD B of the n days up to to_date, both included, over the days with data.
+
+        Args:
+            to_date: date or array of dates
+            n: window length in days
+
+        Returns:
+            float, or numpy array for an array of dates (NaN if the window has no data)
+        """
+        to_dates = np.asarray(pd.to_datetime(to_date), dtype="datetime64[ns]")
+        from_dates = to_dates - np.timedelta64(n - 1, "D")
+
+        desde = np.searchsorted(self._fechas, from_dates, side="left")
+        hasta = np.searchsorted(self._fechas, to_dates, side="right")
+        dias = hasta - desde
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = (self._cumsum[hasta] - self._cumsum[desde]) / dias
+
+        return mean if mean.ndim else float(mean)
+
+
+def load_dolar_normalizer(filename):
+    digest = file_digest(filename)
+    if digest not in _LOADED:
+        _LOADED[digest] = DolarNormalizer(filename)
+
+    return _LOADED[digest]
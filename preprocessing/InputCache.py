@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+log = logging.getLogger("logger")
+
+# subirlo cuando cambia la salida de algun writer de .dat: el key solo ve params, fuentes y
+# flags, no el codigo que los escribe
+CACHE_VERSION = 1
+
+# sha256 ya calculados, keyed por (path, mtime, size) para no re-hashear archivos sin cambios
+_FILE_DIGESTS = {}
+
+
+def file_digest(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    if key not in _FILE_DIGESTS:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _FILE_DIGESTS[key] = digest.hexdigest()
+
+    return _FILE_DIGESTS[key]
+
+
+class InputCache:
+    """
+    Content-addressed store for generated model input (.dat) files.
+
+    Each artifact is stored under the hash of the parameters, source files and
+    flags that produced it, and materialized into model_inputs/ on later hits. The key
+    also holds CACHE_VERSION, bumped whenever a .dat writer changes its output.
+    """
+
+    def __init__(self, cache_dir="model_inputs_cache", link=False):
+        self.cache_dir = cache_dir
+        # hard-link en vez de copiar: solo si nadie reescribe los .dat in place
+        self.link = link
+        self.stats = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, artifact, params, sources=(), flags=None):
+        payload = {
+            "version": CACHE_VERSION,
+            "artifact": artifact,
+            "params": params,
+            "sources": {os.path.basename(path): file_digest(path) for path in sources},
+            "flags": flags or {},
+        }
+        blob = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _cached_path(self, artifact, key, output):
+        return os.path.join(self.cache_dir, artifact, key, os.path.basename(output))
+
+    def _count(self, artifact, outcome):
+        self.stats.setdefault(artifact, {"hits": 0, "misses": 0})[outcome] += 1
+
+    def fetch(self, artifact, key, outputs):
+        cached = [self._cached_path(artifact, key, output) for output in outputs]
+
+        if not all(os.path.exists(path) for path in cached):
+            self._count(artifact, "misses")
+            log.info(f"input cache miss: {artifact} [{key[:12]}]")
+            return False
+
+        for path, output in zip(cached, outputs):
+            if os.path.exists(output):
+                os.remove(output)
+            if self.link:
+                try:
+                    os.link(path, output)
+                    continue
+                except OSError:
+                    pass
+            shutil.copyfile(path, output)
+
+        self._count(artifact, "hits")
+        log.info(f"input cache hit: {artifact} [{key[:12]}]")
+        return True
+
+    def store(self, artifact, key, outputs):
+        for output in outputs:
+            cached = self._cached_path(artifact, key, output)
+            os.makedirs(os.path.dirname(cached), exist_ok=True)
+
+            # escribo a un temporal y renombro, otro proceso puede estar leyendo el mismo key
+            tmp = f"{cached}.{os.getpid()}.tmp"
+            shutil.copyfile(output, tmp)
+            os.replace(tmp, cached)
+
+    def report(self):
+        log.info("input cache stats per artifact:")
+        for artifact, counts in sorted(self.stats.items()):
+            log.info(
+                f"  {artifact:<15} hits: {counts['hits']:>4}  misses: {counts['misses']:>4}"
+            )
+
+        return self.stats
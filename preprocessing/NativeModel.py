@@ -0,0 +1,841 @@
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+# edades de venta de lo nacido en la estrategia 2, mismos sets que model_strategy_2eng.zpl
+STAGE_1_SELL_AGES = [6, 7, 8]
+STAGE_2_AND_3_SELL_AGES = [16, 17, 18, 30, 31, 32, 33, 34, 35, 36]
+HEURISTIC_SALES = (
+    ("heuristic_sales_1", STAGE_1_SELL_AGES),
+    ("heuristic_sales_2", STAGE_2_AND_3_SELL_AGES),
+)
+
+# valores por debajo de esto no se escriben en la solucion, como hace scip
+ZERO_TOL = 1e-9
+
+
+def stock_upper_bounds(initial_stock, august_periods, PARAMS, initial_transfers=None):
+    """
+    Upper bounds of x, w and n implied by the flow constraints: no sales, every
+    class 2 animal transferred at 11 months and every August birth realized.
+    initial_transfers are the fixed w[0] of a rolling horizon window.
+
+    Returns:
+        tuple (x (periodos + 1, edades, clases), w (periodos + 1, edades), n (periodos + 1, clases))
+    """
+    P, nE = PARAMS["periodos_modelo"], PARAMS["meses_max_animales"] + 2
+    ub_x = np.zeros((P + 1, nE, 3))
+    ub_w = np.zeros((P + 1, nE))
+    ub_n = np.zeros((P + 1, 3))
+    ub_x[0] = initial_stock
+    if initial_transfers is not None:
+        ub_w[0] = initial_transfers
+    august = set(august_periods)
+
+    # indices de edad desplazados en 1: la edad e esta en e + 1
+    for t in range(1, P + 1):
+        ub_x[t, 2:, :2] = ub_x[t - 1, 1:-1, :2]
+        ub_x[t, 1:, 2] = ub_x[t - 1, :-1, 2] + ub_w[t - 1, :-1]
+        if t in august:
+            ub_n[t, :2] = PARAMS["pregnancy_index"] / 2 * ub_x[t, 25:, 2].sum()
+        ub_x[t, 1, :2] = ub_n[t, :2]
+        ub_w[t, 12] = ub_x[t, 12, 1]
+
+    return ub_x, ub_w, ub_n
+
+
+def stock_from_decisions(initial_stock, y, w, n):
+    """
+    x over (T u {0}) x E x C implied by the flow constraints for given sales, transfers and
+    births, for models that don't carry the stock of every cell (ages shifted +1).
+
+    Args:
+        initial_stock: (edades, clases) array
+        y: (periodos + 1, edades, clases) array
+        w: (periodos + 1, edades) array
+        n: (periodos + 1, clases) array
+    """
+    P = len(y) - 1
+    stock = np.zeros(np.shape(y))
+    stock[0] = initial_stock
+    for t in range(1, P + 1):
+        left = stock[t - 1] - y[t - 1]
+        stock[t, 2:, :2] = left[1:-1, :2]
+        stock[t, 2:, 1] -= w[t - 1, 1:-1]
+        stock[t, 1:, 2] = left[:-1, 2] + w[t - 1, :-1]
+        stock[t, 1, :2] = n[t, :2]
+
+    return stock
+
+
+def live_cells(
+    initial_stock,
+    prices,
+    august_periods,
+    PARAMS,
+    initial_transfers=None,
+):
+    """
+    Reachability pre-pass: cells that can be nonzero in some feasible solution.
+
+    A stock cell is live if some cohort of the initial stock or of an August birth can
+    reach it, a sale cell if its stock is live and it has a positive price (y[0] has no
+    price and is only bounded by x[0]), a transfer only at 11 months.
+
+    Returns:
+        dict var -> sorted flat indices of the live cells in the (periodos + 1, ...) block
+    """
+    ub_x, ub_w, ub_n = stock_upper_bounds(
+        initial_stock, august_periods, PARAMS, initial_transfers
+    )
+    P = PARAMS["periodos_modelo"]
+
+    live_x = ub_x > 0
+    live_y = live_x.copy()
+    live_y[1:] &= np.asarray(prices) > 0
+    live_y[P] = False
+
+    return {
+        "x": np.flatnonzero(live_x),
+        "y": np.flatnonzero(live_y),
+        "w": np.flatnonzero(ub_w > 0),
+        "n": np.flatnonzero(ub_n > 0),
+    }
+
+
+class NativeModel:
+    """
+    In-memory version of model_strategy_1eng.zpl (strategy 1) and model_strategy_2eng.zpl
+    (strategy 2), built as a sparse constraint matrix and solved with HiGHS via SciPy.
+
+    Variables keep the ZIMPL layout and names: x, y over (T u {0}) x E x C, w over
+    (T u {0}) x E, n over (T u {0}) x C, binaries s over T, and k, l over T for strategy 2.
+    Single-variable constraints (initial stock, zero prices, no transfers...) are set as
+    bounds instead of rows.
+    """
+
+    def __init__(
+        self,
+        prices,
+        costs,
+        initial_stock,
+        PARAMS,
+        august_periods,
+        strategy=1,
+        live=None,
+        initial_sales=None,
+        initial_transfers=None,
+        c3_target=None,
+        c3_reach=None,
+        terminal_value=None,
+        open_heuristics=(),
+        carried_births=None,
+    ):
+        """
+        Args:
+            prices: (periodos, edades, clases) array, as returned by get_price_tensor
+            costs: (edades, clases) array as returned by get_cost_matrix, or (periodos, edades, clases)
+            initial_stock: (edades, clases) array, as returned by get_stock_inicial_matrix
+            PARAMS: model parameters, same fields written to parameters.dat
+            august_periods: birth periods as returned by get_august_periods, may include 0
+            strategy: 1 for the free model, 2 adds the k/l sales and transfers heuristics
+            live: live cells per variable as returned by live_cells, the solver only gets
+                those columns and the rows that still have a live variable. Dense if None
+            initial_sales: (edades, clases) array, fixes y[0] to decisions already taken
+                (rolling horizon windows). Free as in the .zpl if None
+            initial_transfers: (edades,) array, fixes w[0] the same way. Zero if None
+            c3_target: (all, young) class 3 stock the last period has to keep when
+                mantain_c3_stock is on. The x[0] stock if None
+            c3_reach: (edades, clases) array, class 3 stock at the end of the horizon each
+                head of the last period can still become (intermediate rolling horizon
+                windows). The c3_target rows weigh the last period with it instead of
+                counting its class 3 heads
+            terminal_value: (edades, clases) array, value of each head left in stock in the
+                last period on top of its cost (intermediate rolling horizon windows). 0 if None
+            open_heuristics: (name, t) of the heuristic sales rows whose calves can still be
+                sold after the last period (intermediate rolling horizon windows): at most
+                30% of them are sold in this model's ages. Exactly 30% as in the .zpl otherwise
+            carried_births: list of (t, births, sold, open) for the class 2 births of earlier
+                rolling horizon windows, t <= 0 in the periods of this model: the heuristic
+                sales and transfers still due in this model's periods. sold and open give,
+                for each sales stage, the heads already sold and whether it goes on after
+                the last period
+        """
+        self.P = PARAMS["periodos_modelo"]
+        self.M = PARAMS["meses_max_animales"]
+        self.nE = self.M + 2
+        self.nC = 3
+        self.strategy = strategy
+        self.PARAMS = PARAMS
+        self.august_periods = sorted(august_periods)
+
+        self.prices = np.asarray(prices, dtype=float)
+        self.costs = np.broadcast_to(
+            np.asarray(costs, dtype=float), (self.P, self.nE, self.nC)
+        )
+        self.initial_stock = np.asarray(initial_stock, dtype=float)
+        self.initial_sales = initial_sales
+        self.initial_transfers = initial_transfers
+        self.c3_target = c3_target
+        self.c3_reach = c3_reach
+        self.terminal_value = terminal_value
+        self.open_heuristics = set(open_heuristics)
+        self.carried_births = carried_births or []
+
+        assert self.prices.shape == (self.P, self.nE, self.nC), self.prices.shape
+        assert self.initial_stock.shape == (self.nE, self.nC), self.initial_stock.shape
+
+        blocks = [
+            ("x", (self.P + 1, self.nE, self.nC)),
+            ("y", (self.P + 1, self.nE, self.nC)),
+            ("w", (self.P + 1, self.nE)),
+            ("n", (self.P + 1, self.nC)),
+            ("s", (self.P,)),
+        ]
+        if strategy == 2:
+            blocks += [("k", (self.P,)), ("l", (self.P,))]
+
+        self.blocks = {}
+        offset = 0
+        for name, shape in blocks:
+            self.blocks[name] = (offset, shape)
+            offset += int(np.prod(shape))
+        self.n_vars = offset
+
+        self.lb = np.zeros(self.n_vars)
+        self.ub = np.full(self.n_vars, np.inf)
+        self.integrality = np.zeros(self.n_vars, dtype=np.uint8)
+        self.obj = np.zeros(self.n_vars)
+
+        self._rows, self._cols, self._data, self._lo, self._hi = [], [], [], [], []
+        self.n_rows = 0
+        self.row_families = {}
+
+        self._build_objective()
+        self._build_bounds()
+        self._build_constraints()
+        if strategy == 2:
+            self._build_heuristics()
+
+        self.A = csr_matrix(
+            (
+                np.concatenate(self._data),
+                (np.concatenate(self._rows), np.concatenate(self._cols)),
+            ),
+            shape=(self.n_rows, self.n_vars),
+        )
+        self.row_lo = np.concatenate(self._lo)
+        self.row_hi = np.concatenate(self._hi)
+        self.row_families = {
+            name: np.concatenate([np.arange(sl.start, sl.stop) for sl in slices])
+            for name, slices in self.row_families.items()
+        }
+
+        self.columns = np.arange(self.n_vars)
+        if live is not None:
+            self._drop_dead_cells(live)
+        self.n_cols = len(self.columns)
+
+    def _drop_dead_cells(self, live):
+        keep = np.ones(self.n_vars, dtype=bool)
+        for name, cells in live.items():
+            offset, shape = self.blocks[name]
+            keep[offset : offset + int(np.prod(shape))] = False
+            keep[offset + np.asarray(cells, dtype=np.int64)] = True
+
+        assert not self.lb[~keep].any(), "dead cells must allow 0"
+        self.columns = np.flatnonzero(keep)
+        A = self.A[:, self.columns]
+
+        # filas que se quedan sin variables vivas: 0 tiene que cumplirlas
+        empty = np.diff(A.indptr) == 0
+        assert (
+            (self.row_lo[empty] <= 0) & (self.row_hi[empty] >= 0)
+        ).all(), "a constraint cannot be met with its live cells"
+
+        self.A = A
+        self._keep_rows(np.flatnonzero(~empty))
+
+    def _keep_rows(self, rows):
+        new_row = np.full(self.n_rows, -1)
+        new_row[rows] = np.arange(len(rows))
+
+        self.A = self.A[rows]
+        self.row_lo, self.row_hi = self.row_lo[rows], self.row_hi[rows]
+        self.row_families = {
+            name: new_row[idx][new_row[idx] >= 0] for name, idx in self.row_families.items()
+        }
+        self.n_rows = len(rows)
+
+    ### INDICES ###
+
+    def values(self, x, name):
+        """
+        Block of a solution vector with its (t, ...) shape, ages shifted +1 and classes -1.
+        """
+        offset, shape = self.blocks[name]
+        return x[offset : offset + int(np.prod(shape))].reshape(shape)
+
+    def _index(self, name, *position):
+        offset, shape = self.blocks[name]
+        return offset + np.ravel_multi_index(np.broadcast_arrays(*position), shape)
+
+    # indices de columna con la misma indexacion que el .zpl (edades desde -1, clases desde 1)
+    def x(self, t, e, c):
+        return self._index("x", t, np.asarray(e) + 1, np.asarray(c) - 1)
+
+    def y(self, t, e, c):
+        return self._index("y", t, np.asarray(e) + 1, np.asarray(c) - 1)
+
+    def w(self, t, e):
+        return self._index("w", t, np.asarray(e) + 1)
+
+    def n(self, t, c):
+        return self._index("n", t, np.asarray(c) - 1)
+
+    def s(self, t):
+        return self._index("s", np.asarray(t) - 1)
+
+    def k(self, t):
+        return self._index("k", np.asarray(t) - 1)
+
+    def l(self, t):
+        return self._index("l", np.asarray(t) - 1)
+
+    def _add_rows(self, name, terms, lo, hi):
+        """
+        Append a family of rows. Each term is (cols, coef) with cols of shape (m,) or (m, k),
+        k variables of the same row sharing the coefficient.
+        """
+        m = np.shape(terms[0][0])[0]
+        rows = np.arange(self.n_rows, self.n_rows + m)
+
+        for cols, coef in terms:
+            cols = np.asarray(cols).reshape(m, -1)
+            coef = np.asarray(coef, dtype=float)
+            if coef.ndim:
+                coef = coef.reshape(-1, 1)
+            coef = np.broadcast_to(coef, cols.shape)
+            self._rows.append(np.repeat(rows, cols.shape[1]))
+            self._cols.append(cols.ravel())
+            self._data.append(coef.ravel())
+
+        self._lo.append(np.broadcast_to(np.asarray(lo, dtype=float), (m,)))
+        self._hi.append(np.broadcast_to(np.asarray(hi, dtype=float), (m,)))
+        self.row_families.setdefault(name, []).append(slice(self.n_rows, self.n_rows + m))
+        self.n_rows += m
+
+    def _add_matrix_rows(self, name, A, lo, hi):
+        """
+        Append a family of rows given as a sparse (m, n_vars) matrix.
+        """
+        A = A.tocoo()
+        self._rows.append(A.row + self.n_rows)
+        self._cols.append(A.col)
+        self._data.append(A.data)
+        self._lo.append(np.broadcast_to(np.asarray(lo, dtype=float), (A.shape[0],)))
+        self._hi.append(np.broadcast_to(np.asarray(hi, dtype=float), (A.shape[0],)))
+        self.row_families.setdefault(name, []).append(
+            slice(self.n_rows, self.n_rows + A.shape[0])
+        )
+        self.n_rows += A.shape[0]
+
+    def _grid(self, *axes):
+        return [a.ravel() for a in np.meshgrid(*axes, indexing="ij")]
+
+    ### MODEL ###
+
+    def _build_objective(self):
+        T, E, C = self._grid(
+            np.arange(1, self.P + 1), np.arange(-1, self.M + 1), np.arange(1, self.nC + 1)
+        )
+        self.obj[self.y(T, E, C)] = self.prices.ravel()
+        self.obj[self.x(T, E, C)] = -self.costs.ravel()
+        if self.terminal_value is not None:
+            e, c = self._grid(np.arange(-1, self.M + 1), np.arange(1, self.nC + 1))
+            self.obj[self.x(self.P, e, c)] += np.ravel(self.terminal_value)
+
+        # el costo fijo de venta esta dentro de la suma sobre T*E*C en el .zpl: se paga |E|*|C| veces
+        self.obj[self.s(np.arange(1, self.P + 1))] = (
+            -self.PARAMS["fix_cost_sales"] * self.nE * self.nC
+        )
+
+    def set_prices(self, prices, fix_cost_sales=None):
+        """
+        Swap the sale prices of a built model, and the fixed sale cost if given: only the
+        objective and the r_no_zero_price_sales bounds change, the constraint matrix and
+        columns are kept. A sale cell dropped as dead can't get a price, so build the model
+        over the live cells of every price tensor it will take (live_cells of their
+        elementwise max).
+
+        Args:
+            prices: (periodos, edades, clases) array, as returned by get_price_tensor
+        """
+        prices = np.asarray(prices, dtype=float)
+        assert prices.shape == self.prices.shape, prices.shape
+
+        T, E, C = self._grid(
+            np.arange(1, self.P + 1), np.arange(-1, self.M + 1), np.arange(1, self.nC + 1)
+        )
+        column = np.zeros(self.n_vars, dtype=bool)
+        column[self.columns] = True
+        missing = (prices.ravel() > 0) & ~column[self.y(T, E, C)] & column[self.x(T, E, C)]
+        missing &= T < self.P
+        if missing.any():
+            raise ValueError(
+                f"{missing.sum()} priced sale cells are not in the model, "
+                "build it over the live cells of every price tensor"
+            )
+
+        self.prices = prices
+        if fix_cost_sales is not None:
+            self.PARAMS = dict(self.PARAMS, fix_cost_sales=fix_cost_sales)
+        self.obj[:] = 0
+        self._build_objective()
+
+        # r_no_zero_price_sales, no_sales_final_period
+        self.ub[self.y(T, E, C)] = np.where(prices.ravel() > 0, np.inf, 0)
+        self.ub[self.y(self.P, E[T == 1], C[T == 1])] = 0
+
+    def _build_bounds(self):
+        P, M = self.P, self.M
+        T = np.arange(1, P + 1)
+        E = np.arange(-1, M + 1)
+        C = np.arange(1, self.nC + 1)
+
+        # binaries
+        for name in ("s", "k", "l"):
+            if name in self.blocks:
+                offset, shape = self.blocks[name]
+                self.ub[offset : offset + shape[0]] = 1
+                self.integrality[offset : offset + shape[0]] = 1
+
+        # r_initial_stock_set
+        e, c = self._grid(E, C)
+        self.lb[self.x(0, e, c)] = self.ub[self.x(0, e, c)] = self.initial_stock.ravel()
+
+        # r_non_negative_age_stock
+        t, c = self._grid(T, C)
+        self.ub[self.x(t, -1, c)] = 0
+
+        # r_no_zero_price_sales
+        t, e, c = self._grid(T, E, C)
+        self.ub[self.y(t, e, c)[self.prices.ravel() <= 0]] = 0
+
+        # no_sales_final_period
+        e, c = self._grid(E, C)
+        self.ub[self.y(P, e, c)] = 0
+
+        # r_no_transfers_initial_period, r_transfers_at_month
+        self.ub[self.w(0, E)] = 0
+        t, e = self._grid(T, E[E != 11])
+        self.ub[self.w(t, e)] = 0
+
+        # r_no_births_initial_period, r_control_births, r_no_births_class_3
+        not_august = [p for p in range(P + 1) if p not in self.august_periods]
+        t, c = self._grid(np.array(not_august, dtype=int), C)
+        self.ub[self.n(0, C)] = 0
+        self.ub[self.n(t, c)] = 0
+        self.ub[self.n(T, 3)] = 0
+
+        # decisiones del periodo 0 ya tomadas por la ventana anterior
+        e, c = self._grid(E, C)
+        if self.initial_sales is not None:
+            self.lb[self.y(0, e, c)] = self.ub[self.y(0, e, c)] = np.ravel(self.initial_sales)
+        if self.initial_transfers is not None:
+            self.lb[self.w(0, E)] = self.ub[self.w(0, E)] = self.initial_transfers
+
+    def _build_constraints(self):
+        P, M = self.P, self.M
+        T = np.arange(1, P + 1)
+        E = np.arange(-1, M + 1)
+        C = np.arange(1, self.nC + 1)
+
+        self._build_flow()
+
+        # r_minimum_sales / r_maximum_sales, ventas de clase 1 y 2 por periodo
+        t, e, c = np.meshgrid(T, E, [1, 2], indexing="ij")
+        ventas_c1_c2 = self.y(t, e, c).reshape(P, -1)
+        self._add_rows(
+            "r_minimum_sales",
+            [(ventas_c1_c2, 1), (self.s(T), -self.PARAMS["ventas_min_por_mes"])],
+            0,
+            np.inf,
+        )
+        self._add_rows(
+            "r_maximum_sales",
+            [(ventas_c1_c2, 1), (self.s(T), -self.PARAMS["virtual_ventas_max_por_mes"])],
+            -np.inf,
+            0,
+        )
+
+        # r_control_sales
+        t, e, c = self._grid(T, E, C)
+        self._add_rows(
+            "r_control_sales", [(self.y(t, e, c), 1), (self.x(t, e, c), -1)], -np.inf, 0
+        )
+
+        if self.PARAMS["mantain_c3_stock"] == 1 and self.c3_target is not None:
+            weights = np.zeros((self.nE, self.nC))
+            weights[:, 2] = 1
+            if self.c3_reach is not None:
+                weights = np.asarray(self.c3_reach, dtype=float)
+            e, c = np.nonzero(weights)
+            stock_c3_final = csr_matrix(
+                (weights[e, c], (np.zeros(len(e), dtype=int), self.x(P, e - 1, c + 1))),
+                shape=(1, self.n_vars),
+            )
+            self._add_matrix_rows(
+                "r_maintain_c3_bigger_or_equal_end_of_period_all",
+                stock_c3_final,
+                self.c3_target[0],
+                np.inf,
+            )
+            self._add_matrix_rows(
+                "r_maintain_c3_bigger_or_equal_end_of_period_young",
+                stock_c3_final,
+                self.c3_target[1],
+                np.inf,
+            )
+        elif self.PARAMS["mantain_c3_stock"] == 1:
+            self._add_rows(
+                "r_maintain_c3_bigger_or_equal_end_of_period_all",
+                [(self.x(P, E, 3)[None, :], 1), (self.x(0, E, 3)[None, :], -1)],
+                0,
+                np.inf,
+            )
+            self._add_rows(
+                "r_maintain_c3_bigger_or_equal_end_of_period_young",
+                [(self.x(P, E, 3)[None, :], 1), (self.x(0, E[E < 30], 3)[None, :], -1)],
+                0,
+                np.inf,
+            )
+
+        # r_control_transfers
+        t, e = self._grid(T, E)
+        self._add_rows(
+            "r_control_transfers",
+            [(self.w(t, e), 1), (self.x(t, e, 2), -1), (self.y(t, e, 2), 1)],
+            -np.inf,
+            0,
+        )
+
+        # r_births_c1 / r_births_c2
+        if self.august_periods:
+            august = np.array(self.august_periods)
+            t, e = np.meshgrid(august, E[E >= 24], indexing="ij")
+            for c in (1, 2):
+                self._add_rows(
+                    f"r_births_c{c}",
+                    [
+                        (self.n(august, c), 1),
+                        (self.x(t, e, 3), -self.PARAMS["pregnancy_index"] / 2),
+                    ],
+                    0,
+                    0,
+                )
+
+        # connect_age_0_and_births
+        t, c = self._grid(T, np.array([1, 2]))
+        self._add_rows(
+            "connect_age_0_and_births", [(self.x(t, 0, c), 1), (self.n(t, c), -1)], 0, 0
+        )
+
+    def _build_flow(self):
+        P, M = self.P, self.M
+        T = np.arange(1, P + 1)
+
+        # r_flow_class_1 / r_flow_class_2
+        t, e = self._grid(T, np.arange(1, M + 1))
+        self._add_rows(
+            "r_flow_class_1",
+            [(self.x(t, e, 1), 1), (self.x(t - 1, e - 1, 1), -1), (self.y(t - 1, e - 1, 1), 1)],
+            0,
+            0,
+        )
+        self._add_rows(
+            "r_flow_class_2",
+            [
+                (self.x(t, e, 2), 1),
+                (self.x(t - 1, e - 1, 2), -1),
+                (self.y(t - 1, e - 1, 2), 1),
+                (self.w(t - 1, e - 1), 1),
+            ],
+            0,
+            0,
+        )
+
+        # r_flow_class_3
+        t, e = self._grid(T, np.arange(0, M + 1))
+        self._add_rows(
+            "r_flow_class_3",
+            [
+                (self.x(t, e, 3), 1),
+                (self.x(t - 1, e - 1, 3), -1),
+                (self.y(t - 1, e - 1, 3), 1),
+                (self.w(t - 1, e - 1), -1),
+            ],
+            0,
+            0,
+        )
+
+    def _add_big_m_product(self, name, t, share, cols, binary, big_m):
+        """
+        share * n[t,2] == sum(cols) * binary, linearized with big_m >= max(share * n, sum(cols)):
+        binary = 1 gives the equality, binary = 0 forces n[t,2] = 0 and leaves cols free.
+        """
+        n_t = self.n(t, 2)
+        gap_terms = [(np.array([n_t]), share), (np.asarray(cols)[None, :], -1)]
+        self._add_rows(name, gap_terms + [(np.array([binary]), big_m)], -np.inf, big_m)
+        self._add_rows(name, gap_terms + [(np.array([binary]), -big_m)], -big_m, np.inf)
+        self._add_rows(
+            name, [(np.array([n_t]), share), (np.array([binary]), -big_m)], -np.inf, 0
+        )
+
+    def _build_heuristics(self):
+        P = self.P
+        ub_x, ub_w, ub_n = stock_upper_bounds(
+            self.initial_stock, self.august_periods, self.PARAMS, self.initial_transfers
+        )
+
+        for t in self.august_periods:
+            # heuristic_sales_1 / heuristic_sales_2: 30% de los nacimientos c2 a cada etapa de venta
+            for name, edades in HEURISTIC_SALES:
+                if t + edades[0] > P:
+                    continue
+                v = np.array([v for v in edades if t + v <= P])
+                if (name, t) in self.open_heuristics:
+                    # el resto de las edades cae en una ventana siguiente
+                    self._add_rows(
+                        name,
+                        [(self.y(t + v, v, 2)[None, :], 1), (np.array([self.n(t, 2)]), -0.3)],
+                        -np.inf,
+                        0,
+                    )
+                    continue
+                big_m = max(0.3 * ub_n[t, 1], ub_x[t + v, v + 1, 1].sum())
+                self._add_big_m_product(name, t, 0.3, self.y(t + v, v, 2), self.k(t), big_m)
+
+            # heuristic_transfers: 40% de los nacimientos c2 pasan a clase 3 a los 11 meses
+            if t + 11 <= P:
+                big_m = max(0.4 * ub_n[t, 1], ub_w[t + 11, 12])
+                self._add_big_m_product(
+                    "heuristic_transfers", t, 0.4, [self.w(t + 11, 11)], self.l(t), big_m
+                )
+
+        # nacimientos de ventanas anteriores: lo que falta vender de cada etapa y el traspaso
+        for t, births, sold, is_open in self.carried_births:
+            for (name, edades), done, stage_open in zip(HEURISTIC_SALES, sold, is_open):
+                v = np.array([v for v in edades if 0 < t + v <= P])
+                if not len(v):
+                    continue
+                # sin el ruido numerico de las ventanas anteriores
+                due = 0.3 * births - done if 0.3 * births - done > ZERO_TOL else 0
+                self._add_rows(
+                    name,
+                    [(self.y(t + v, v, 2)[None, :], 1)],
+                    -np.inf if stage_open else due,
+                    due,
+                )
+
+            if 0 < t + 11 <= P:
+                self.lb[self.w(t + 11, 11)] = self.ub[self.w(t + 11, 11)] = 0.4 * births
+
+    ### SOLVE ###
+
+    def solve(self, time_limit=None, mip_rel_gap=0.0, disp=False, bounds=None, presolve=True):
+        """
+        Solve with HiGHS through scipy.optimize.milp. The gap defaults to 0, same as SCIP.
+
+        Args:
+            bounds: (lb, ub) arrays over all cells replacing the model bounds, e.g. with
+                binaries fixed by reduced costs. The model bounds if None
+            presolve: False to skip HiGHS presolve
+
+        Returns:
+            dict with status, objective, x (over all cells), solving_time, nodes, gap (%)
+            and dual_bound
+        """
+        # scipy.optimize solo para resolver: los runners de SCIP importan live_cells de aca
+        from scipy.optimize import Bounds, LinearConstraint, milp
+
+        options = {"disp": disp, "mip_rel_gap": mip_rel_gap, "presolve": presolve}
+        if time_limit is not None:
+            options["time_limit"] = time_limit
+
+        cols = self.columns
+        lb, ub = bounds if bounds is not None else (self.lb, self.ub)
+        start = time.perf_counter()
+        res = milp(
+            -self.obj[cols],
+            integrality=self.integrality[cols],
+            bounds=Bounds(lb[cols], ub[cols]),
+            constraints=LinearConstraint(self.A, self.row_lo, self.row_hi),
+            options=options,
+        )
+        # el presolve de HiGHS declara infactibles algunos modelos que no lo son (las
+        # ventanas de rolling_horizon): se confirma sin presolve
+        if res.status == 2 and presolve:
+            res = milp(
+                -self.obj[cols],
+                integrality=self.integrality[cols],
+                bounds=Bounds(lb[cols], ub[cols]),
+                constraints=LinearConstraint(self.A, self.row_lo, self.row_hi),
+                options={**options, "presolve": False},
+            )
+        solving_time = time.perf_counter() - start
+
+        # solucion sobre el layout completo, las celdas muertas quedan en 0
+        x = None
+        if res.x is not None:
+            x = np.zeros(self.n_vars)
+            x[cols] = res.x
+
+        gap = getattr(res, "mip_gap", None)
+        dual_bound = getattr(res, "mip_dual_bound", None)
+        return {
+            "status": res.message,
+            "success": res.x is not None,
+            "objective": -res.fun if res.x is not None else None,
+            "x": x,
+            "solving_time": solving_time,
+            "nodes": getattr(res, "mip_node_count", None),
+            "gap": gap * 100 if gap is not None else None,
+            "dual_bound": -dual_bound if dual_bound is not None else None,
+        }
+
+    def relaxation(self, bounds=None):
+        """
+        LP relaxation with HiGHS through scipy.optimize.linprog: every binary in [0, 1].
+
+        Args:
+            bounds: (lb, ub) arrays over all cells replacing the model bounds, e.g. with the
+                binaries fixed to a pattern. The model bounds if None
+
+        Returns:
+            dict with success, objective (an upper bound of the MIP with the same bounds),
+            x and reduced_costs over all cells, both 0 in dead cells. Reduced costs are in
+            the maximization sense: what the objective changes per unit a cell moves away
+            from the bound it sits at
+        """
+        from scipy.optimize import linprog
+        from scipy.sparse import vstack
+
+        cols = self.columns
+        lb, ub = bounds if bounds is not None else (self.lb, self.ub)
+
+        # linprog no toma filas con dos lados: igualdades, <= hi y -A <= -lo
+        eq = self.row_lo == self.row_hi
+        upper = ~eq & np.isfinite(self.row_hi)
+        lower = ~eq & np.isfinite(self.row_lo)
+        A_ub = vstack([self.A[upper], -self.A[lower]]).tocsr()
+        b_ub = np.concatenate([self.row_hi[upper], -self.row_lo[lower]])
+
+        problem = dict(
+            c=-self.obj[cols],
+            A_ub=A_ub if A_ub.shape[0] else None,
+            b_ub=b_ub if A_ub.shape[0] else None,
+            A_eq=self.A[eq] if eq.any() else None,
+            b_eq=self.row_lo[eq] if eq.any() else None,
+            bounds=np.column_stack([lb[cols], ub[cols]]),
+            method="highs",
+        )
+        res = linprog(**problem)
+        # mismo falso infactible del presolve que en solve
+        if res.status == 2:
+            res = linprog(**problem, options={"presolve": False})
+
+        x = np.zeros(self.n_vars)
+        reduced_costs = np.zeros(self.n_vars)
+        if res.status == 0:
+            x[cols] = res.x
+            reduced_costs[cols] = -(res.lower.marginals + res.upper.marginals)
+
+        return {
+            "success": res.status == 0,
+            "objective": -res.fun if res.status == 0 else None,
+            "x": x,
+            "reduced_costs": reduced_costs,
+        }
+
+    def solution_frame(self, x):
+        """
+        Nonzero variables of a solution, same columns as parse_scip_log so format_log_df applies.
+        """
+        frames = []
+        for name, (offset, shape) in self.blocks.items():
+            block = x[offset : offset + int(np.prod(shape))]
+            idx = np.flatnonzero(np.abs(block) > ZERO_TOL)
+            pos = np.unravel_index(idx, shape)
+
+            # mismos indices posicionales que los nombres del log: n#t#c deja la clase en "age"
+            if name in ("x", "y"):
+                fields = [pos[0], pos[1] - 1, pos[2] + 1]
+            elif name == "w":
+                fields = [pos[0], pos[1] - 1]
+            elif name == "n":
+                fields = [pos[0], pos[1] + 1]
+            else:
+                fields = [pos[0] + 1]
+
+            variables = ["#".join(map(str, (name,) + f)) for f in zip(*[f.tolist() for f in fields])]
+            missing = [np.full(len(idx), i >= len(fields)) for i in range(3)]
+            fields += [np.zeros(len(idx), dtype=np.int64)] * (3 - len(fields))
+
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "variable": variables,
+                        "var": name,
+                        "t": pd.arrays.IntegerArray(fields[0].astype(np.int64), missing[0]),
+                        "age": pd.arrays.IntegerArray(fields[1].astype(np.int64), missing[1]),
+                        "class": pd.arrays.IntegerArray(fields[2].astype(np.int64), missing[2]),
+                        "value": block[idx],
+                        "unit_impact_on_obj_func": self.obj[offset + idx],
+                    }
+                )
+            )
+
+        return pd.concat(frames, ignore_index=True)
+
+    def write_log(self, log_path, result):
+        """
+        Write the solution in SCIP's log format, readable by read_scip_log and parse_scip_stats.
+        """
+        Log_df = self.solution_frame(result["x"]) if result["success"] else None
+        status = (
+            "problem is solved [optimal solution found]"
+            if result["success"] and result["gap"] in (None, 0)
+            else result["status"]
+        )
+
+        lines = [
+            f"native model strategy {self.strategy}: {self.n_cols} variables and {self.n_rows} constraints",
+            "",
+            f"SCIP Status        : {status}",
+            f"Solving Time (sec) : {result['solving_time']:.2f}",
+            f"Solving Nodes      : {result['nodes'] or 0}",
+        ]
+        if Log_df is not None:
+            lines += [
+                f"Primal Bound       : {result['objective']:+.14e} (1 solutions)",
+                f"Dual Bound         : {result['dual_bound'] or result['objective']:+.14e}",
+                f"Gap                : {result['gap'] or 0:.2f} %",
+                "",
+                "primal solution (original space):",
+                "=================================",
+                "",
+                f"objective value: {result['objective']:.15g}",
+            ]
+            lines += [
+                f"{variable:<40} {value:>15.15g} \t(obj:{coef:.15g})"
+                for variable, value, coef in zip(
+                    Log_df["variable"], Log_df["value"], Log_df["unit_impact_on_obj_func"]
+                )
+            ]
+        lines += ["", "Statistics", "=========="]
+
+        with open(log_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
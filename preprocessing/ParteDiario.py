@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from preprocessing.InputCache import file_digest
+
+# columnas del csv: stock diario, y ventas (mas FECHA)
+STOCK_COLS = list(range(0, 15))
+VENTAS_COLS = [1] + list(range(25, 34))
+
+VENTAS_RENAME = {
+    "VENTAS": "COMENTARIO",
+    "?": "SIN_ASIGNAR",
+    "vacas": "VACAS",
+    "vaquillonas": "VAQUILLONAS270",
+    "novillos": "NOVILLITOS391",
+    "novillitos": "NOVILLITOS300",
+    "toros": "TOROS",
+    "terneros": "TERNEROS_DESTETE",
+    "terneras": "TERNERAS_DESTETE",
+}
+
+# instancias ya levantadas, keyed por sha256 del csv
+_LOADED = {}
+
+
+class ParteDiario:
+    """
+    Parte diario csv parsed once: daily stock and sales, cleaned and indexed by FECHA.
+
+    Use load_parte_diario to share one instance per file.
+    """
+
+    def __init__(self, path):
+        df = pd.read_csv(path)
+        df.rename(
+            columns={"MACHOS": "OREJANO_MACHOS", "HEMBRAS": "OREJANO_HEMBRAS"}, inplace=True
+        )
+
+        # limpiar casos anomalos
+        df.loc[119, "FECHA"] = "11/15/2014"
+        df.loc[356, "FECHA"] = "6/28/2019"
+        fechas = pd.to_datetime(df["FECHA"], format="%m/%d/%Y")
+
+        self.stock = df.iloc[:, STOCK_COLS].copy()
+        self.stock["FECHA"] = fechas
+
+        self.ventas = df.iloc[:, VENTAS_COLS].fillna(0)
+        self.ventas["FECHA"] = fechas
+        self.ventas.rename(columns=VENTAS_RENAME, inplace=True)
+
+        # fechas ordenadas para searchsorted, estable para devolver las filas en orden del csv
+        self._order = np.argsort(fechas.to_numpy(), kind="stable")
+        self._fechas = fechas.to_numpy()[self._order]
+
+    @property
+    def stock_columns(self):
+        return self.stock.columns
+
+    def stock_row(self, fecha):
+        """
+        Stock rows of an exact date, empty if the date is not in the file.
+        """
+        fecha = np.datetime64(pd.Timestamp(fecha))
+        desde = np.searchsorted(self._fechas, fecha, side="left")
+        hasta = np.searchsorted(self._fechas, fecha, side="right")
+
+        return self.stock.iloc[np.sort(self._order[desde:hasta])].copy()
+
+    def next_stock_row(self, fecha):
+        """
+        Stock rows of the first date on or after fecha.
+
+        Returns:
+            tuple (rows, date found), (empty rows, None) past the last date of the file
+        """
+        i = np.searchsorted(self._fechas, np.datetime64(pd.Timestamp(fecha)), side="left")
+        if i == len(self._fechas):
+            return self.stock.iloc[[]].copy(), None
+
+        encontrada = pd.Timestamp(self._fechas[i])
+        return self.stock_row(encontrada), encontrada
+
+
+def load_parte_diario(path):
+    digest = file_digest(path)
+    if digest not in _LOADED:
+        _LOADED[digest] = ParteDiario(path)
+
+    return _LOADED[digest]
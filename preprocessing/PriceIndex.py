@@ -0,0 +1,69 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger("logger")
+
+# mas lejos que esto se usa el precio igual, pero se avisa
+MAX_DISTANCIA = pd.Timedelta("15 days")
+
+
+class PriceIndex:
+    """
+    Closest price row lookups over a prices dataframe, built once per df_precios.
+
+    PERIODO_INICIO is kept as a sorted datetime64 array and every column as a numpy array in
+    the same order, a lookup is a searchsorted over the dates. A date halfway between two
+    prices takes the earlier one.
+    """
+
+    def __init__(self, df_precios):
+        order = np.argsort(df_precios["PERIODO_INICIO"].to_numpy(), kind="stable")
+
+        self.columns = list(df_precios.columns)
+        self._values = {col: df_precios[col].to_numpy()[order] for col in self.columns}
+        self._fechas = self._values["PERIODO_INICIO"].astype("datetime64[ns]")
+
+    def __len__(self):
+        return len(self._fechas)
+
+    def positions(self, fechas):
+        """
+        Position of the closest price of every date, in the sorted order of the index.
+        """
+        fechas = np.asarray(fechas, dtype="datetime64[ns]")
+        after = np.clip(np.searchsorted(self._fechas, fechas, side="left"), 1, len(self) - 1)
+        before = after - 1
+
+        closest = np.where(
+            self._fechas[after] - fechas < fechas - self._fechas[before], after, before
+        )
+        if len(self) == 1:
+            closest = np.zeros_like(closest)
+
+        lejanos = np.abs(self._fechas[closest] - fechas) > MAX_DISTANCIA
+        for periodo in fechas[lejanos]:
+            log.debug(f"WARNING: diferencia de precio mayor a 15 dias for {pd.Timestamp(periodo)}")
+
+        return closest
+
+    def row(self, fecha):
+        """
+        Closest price row of a date.
+
+        Returns:
+            dict column -> value
+        """
+        i = self.positions([pd.Timestamp(fecha)])[0]
+        return {col: values[i] for col, values in self._values.items()}
+
+    def rows(self, fechas):
+        """
+        Closest price rows of an array of dates.
+
+        Returns:
+            dict column -> numpy array aligned with fechas
+        """
+        positions = self.positions(fechas)
+        return {col: values[positions] for col, values in self._values.items()}
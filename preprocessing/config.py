@@ -1,6 +1,9 @@
 SCRAMBLE_NUMS = False
 SCRAMBLE_MODIF = 0.5
 
+# semilla del muestreo de edades del stock inicial, None = un stock distinto en cada corrida
+STOCK_SEED = None
+
 version = "0.09"
 clases = 3
 meses_max_animales = 12 * 10  # 10 años, impacta en reproductoras
@@ -118,6 +121,7 @@ PARAMS = {
     "pregnancy_index": pregnancy_index,
     "SCRAMBLE_NUMS": SCRAMBLE_NUMS,
     "SCRAMBLE_MODIF": SCRAMBLE_MODIF,
+    "stock_seed": STOCK_SEED,
 }
 
 # ! WARNING, this will be deleted and regenerated when running build_model_inputs.py
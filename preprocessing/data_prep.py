@@ -2,37 +2,87 @@ import math
 import pandas as pd
 import os
 import numpy as np
-import seaborn as sns
-import itertools
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
-from matplotlib import pyplot as plt
-from skfda.representation.interpolation import SplineInterpolation
-from skfda.representation.grid import FDataGrid
-import itertools
+from scipy.special import ndtr
 import logging
-from preprocessing.DolarNormalizer import DolarNormalizer
+from preprocessing.CostCurve import CostCurve
+from preprocessing.DatWriter import sidecar_path, write_dat
+from preprocessing.DolarNormalizer import load_dolar_normalizer
+from preprocessing.InputCache import file_digest
+from preprocessing.ParteDiario import load_parte_diario
 
 log = logging.getLogger("logger")
 
+# graficos en preprocessing.plots (seaborn, matplotlib), importados recien cuando se piden
+PLOT_FUNCTIONS = ("plot_precios",)
 
-def write_line_to_file(path, line):
-    with open(path, "a") as f:
-        f.write(line)
+
+def __getattr__(name):
+    if name in PLOT_FUNCTIONS:
+        from preprocessing import plots
+
+        return getattr(plots, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_stock_inicial_test(PARAMS, output):
-    for edad_animal, clase in itertools.product(
-        range(-1, PARAMS["meses_max_animales"] + 1), range(1, PARAMS["clases"] + 1)
-    ):
-        if edad_animal == 1:
-            stock_init = 1
-        else:
-            stock_init = 0
+    edades, clases = np.meshgrid(
+        np.arange(-1, PARAMS["meses_max_animales"] + 1),
+        np.arange(1, PARAMS["clases"] + 1),
+        indexing="ij",
+    )
+    stock_init = (edades == 1).astype(int)
+
+    write_dat(output, edades.ravel(), clases.ravel(), stock_init.ravel())
+
+
+def edad_probs(cat, intervalo):
+    """
+    Probability of every integer age in [desde, hasta] for an animal of the category.
+
+    VACAS follow a normal(60, 10) truncated to the interval and cut to an integer age,
+    the rest are uniform over the interval.
+    """
+    desde, hasta = intervalo[0], intervalo[1]
+    edades = np.arange(desde, hasta + 1)
+
+    if cat == "VACAS":
+        # cdf de la normal(60, 10), sin importar scipy.stats
+        cdf = ndtr((np.clip(np.append(edades, hasta + 1), desde, hasta) - 60) / 10)
+        probs = np.diff(cdf)
+    else:
+        probs = np.ones(len(edades))
+
+    return edades, probs / probs.sum()
+
+
+def get_stock_inicial_matrix(stock_row, categorias, PARAMS, clases, meses_max_animales, intervalos):
+    """
+    Sample the initial stock of every (age, class) cell from a parte diario row.
+
+    The ages of each category are drawn at once with a multinomial over the ages of its
+    interval, so the time doesn't depend on the head count. PARAMS["stock_seed"] seeds the
+    draw, None gives a different stock on every run.
+
+    Returns:
+        array of shape (meses_max_animales + 2, clases), ages start at -1
+    """
+    rng = np.random.default_rng(PARAMS.get("stock_seed"))
+    stock = np.zeros((meses_max_animales + 2, clases), dtype=np.int64)
+
+    # DISTRIBUYE ESTOCASTICAMENTE LOS ANIMALES ENTRE LOS DOS PRIMEROS VALORES DE LA LISTA
+    # EL TERCER VALOR ES LA CLASE A LA QUE PERTENECE.
+    for cat in categorias:
+        edades, probs = edad_probs(cat, intervalos[cat])
+        stock[edades + 1, intervalos[cat][2] - 1] += rng.multinomial(
+            int(stock_row[cat].values[0]), probs
+        )
 
-        valores = [edad_animal, clase, stock_init, "\n"]
-        line = "\t".join(str(x) for x in valores)
-        write_line_to_file(output, line)
+    if PARAMS["SCRAMBLE_NUMS"]:
+        stock = stock * PARAMS["SCRAMBLE_MODIF"]
+
+    return stock
 
 
 def get_stock_inicial_from_parte_diario(
@@ -43,35 +93,39 @@ def get_stock_inicial_from_parte_diario(
     parte_diario_path,
     output,
     intervalos,
+    sidecar=False,
 ):
-    #### - ARMA STOCK INICIAL CON 0 STOCK PARA TODOS LOS VALORES POSIBLES
-
-    collect_df = pd.DataFrame()
-    for edad_animal, clase in itertools.product(
-        range(-1, meses_max_animales + 1), range(1, clases + 1)
-    ):
-        collect_df = pd.concat(
-            [
-                collect_df,
-                pd.Series({"edad": edad_animal, "clase": clase, "stock": 0})
-                .to_frame()
-                .T,
-            ]
-        )
-
     # LEVANTO EL PARTE DIARIO Y REEMPLAZO LOS VALORES QUE SI TENGO STOCK EN EDADES DISTRIBUIDAS DENTRO DE UN RANGO UNIFORMEMENTE
     # PARA CADA CATEOGRIA
+    stock_row, categorias = get_stock_inicial_row(parte_diario_path, FECHA_INICIO_MODELO)
+    stock = get_stock_inicial_matrix(
+        stock_row, categorias, PARAMS, clases, meses_max_animales, intervalos
+    )
 
-    # DISTRIBUYE ESTOCASTICAMENTE LOS ANIMALES ENTRE LOS DOS PRIMEROVS VALORES DE LA LISTA
-    # EL TERCER VALOR ES LA CLASE A LA QUE PERTENECE.
+    # con SCRAMBLE_NUMS el stock es float y la fila entera se escribia como float
+    tipo = float if stock.dtype.kind == "f" else int
+
+    edad_animal, clase = np.meshgrid(
+        np.arange(-1, meses_max_animales + 1), np.arange(1, clases + 1), indexing="ij"
+    )
+    write_dat(
+        output,
+        edad_animal.ravel().astype(tipo),
+        clase.ravel().astype(tipo),
+        stock.ravel(),
+        sidecar=sidecar,
+    )
+
+    return stock_row
+
+
+def get_stock_inicial_row(parte_diario_path, FECHA_INICIO_MODELO):
     FECHA_INICIO_MODELO = pd.to_datetime(FECHA_INICIO_MODELO, format="%d/%m/%Y")
 
     stock_row, parte_diario_cols = get_stock_row(parte_diario_path, FECHA_INICIO_MODELO)
 
     assert not stock_row.empty, f"{FECHA_INICIO_MODELO} FOR PARTE DIARIO IS EMPTY"
 
-    df_collect_parte_diario = pd.DataFrame()
-
     categorias = [
         col
         for col in parte_diario_cols
@@ -82,121 +136,174 @@ def get_stock_inicial_from_parte_diario(
         if math.isnan(stock_row[cat]):
             stock_row[cat] = 0
 
-        if cat == "VACAS":
-            edades_random = truncated_normal(
-                60,
-                10,
-                intervalos[cat][0],
-                intervalos[cat][1],
-                size=int(stock_row[cat].values[0]),
-            ).astype(int)
-        else:
-            edades_random = np.random.random_integers(
-                intervalos[cat][0], intervalos[cat][1], int(stock_row[cat].values[0])
-            )
-        data = pd.DataFrame(
-            {"edad": edades_random, "clase": intervalos[cat][2], "stock": 1}
-        )
-        df_collect_parte_diario = pd.concat([df_collect_parte_diario, data])
-
-    df_collect_parte_diario_agg = df_collect_parte_diario.groupby(
-        ["edad", "clase"]
-    ).sum()
-
-    for index, row in df_collect_parte_diario_agg.reset_index().iterrows():
-        collect_df.loc[
-            (collect_df["edad"] == row.edad) & (collect_df["clase"] == row.clase),
-            "stock",
-        ] = row.stock
-
-    if PARAMS['SCRAMBLE_NUMS']:
-        collect_df['stock'] = collect_df['stock'] * PARAMS['SCRAMBLE_MODIF']
-    for index, row in collect_df.iterrows():
-        list_row = list(row) + ["\n"]
-        line = "\t".join(str(x) for x in list_row)
-        write_line_to_file(output, line)
-    
-    
-    return stock_row
+    return stock_row, categorias
 
 
-def get_precios_scrapped(fecha_inicio, input):
+# columnas de precios del scrapping, como "x,y,AR$21"
+SCRAPPED_COLS = ["VAQUILLONAS270", "VAQUILLONAS391", "NOVILLITOS300", "NOVILLITOS391"]
+
+# filas de fin de periodo sin precio en el scrapping
+SCRAPPED_GAP_ROWS = list(range(101, 109))
+
+# scrapping ya parseado, un parquet por sha256 del csv y version del parser
+PRECIOS_SCRAPPED_CACHE_DIR = "model_inputs_cache/precios_scrapped"
+# subirla cuando cambia la salida de parse_precios_scrapped, los parquet viejos no se leen mas
+PRECIOS_SCRAPPED_PARSER_VERSION = 1
+
+
+def parse_precios_scrapped(input):
     df_scrapping = pd.read_csv(input)
 
-    df_scrapping["periodo"] = round(
-        (
-            pd.to_datetime(df_scrapping["periodo_inicio"], format="%d/%m/%Y")
-            - pd.to_datetime(fecha_inicio, format="%d/%m/%Y")
-        )
-        / np.timedelta64(1, "M"),
-        0,
-    ).astype(int)
-
-    append_list = []
-    for index, row in df_scrapping.iterrows():
-        clean_row = [
-            row["VAQUILLONAS270"].split(",")[2],
-            row["VAQUILLONAS391"].split(",")[2],
-            row["NOVILLITOS300"].split(",")[2],
-            row["NOVILLITOS391"].split(",")[2],
-        ]
-
-        clean_row = [x[3:] if len(x) > 3 else x for x in clean_row]
-        clean_row.append(row["periodo_inicio"])
-
-        append_list.append(clean_row)
-
-    df_precios = pd.DataFrame(
-        data=append_list,
-        columns=[
-            "VAQUILLONAS270",
-            "VAQUILLONAS391",
-            "NOVILLITOS300",
-            "NOVILLITOS391",
-            "PERIODO_INICIO",
-        ],
-    )
+    # tercer campo sin el "AR$"
+    precios = df_scrapping[SCRAPPED_COLS].apply(lambda col: col.str.split(",", expand=True)[2])
+    precios = precios.apply(lambda col: col.where(col.str.len() <= 3, col.str[3:]))
+
+    df_precios = precios.apply(pd.to_numeric)
     df_precios["PERIODO_INICIO"] = pd.to_datetime(
-        df_precios["PERIODO_INICIO"], format="%d/%m/%Y"
+        df_scrapping["periodo_inicio"], format="%d/%m/%Y"
     )
 
-    cols_to_numeric = [
-        "VAQUILLONAS270",
-        "VAQUILLONAS391",
-        "NOVILLITOS300",
-        "NOVILLITOS391",
-    ]
-    df_precios[cols_to_numeric] = df_precios[cols_to_numeric].apply(pd.to_numeric)
+    # ! manual fix for missing values at the end of period. I give a 2% monthly increase in price
+    # cada mes se redondea sobre el anterior redondeado, asi que no es un cumprod directo
+    ultimo = df_precios.loc[SCRAPPED_GAP_ROWS[0] - 1]
+    valores = ultimo[SCRAPPED_COLS].to_numpy(dtype=float)
+    fecha = ultimo["PERIODO_INICIO"]
+    extension = []
+    for _ in SCRAPPED_GAP_ROWS:
+        valores = np.round(valores * 1.02)
+        fecha = fecha + pd.DateOffset(months=1)
+        extension.append([*valores, fecha])
+
+    extension = pd.DataFrame(
+        extension, index=SCRAPPED_GAP_ROWS, columns=SCRAPPED_COLS + ["PERIODO_INICIO"]
+    )
+    df_precios = (
+        pd.concat([df_precios.drop(index=SCRAPPED_GAP_ROWS, errors="ignore"), extension])
+        .sort_index()
+        .reset_index(drop=True)
+    )
+    df_precios[SCRAPPED_COLS] = df_precios[SCRAPPED_COLS].astype(float)
+    df_precios["YYYYMM"] = df_precios.PERIODO_INICIO.dt.strftime("%Y%m")
 
-    columns = ["VAQUILLONAS270", "VAQUILLONAS391", "NOVILLITOS300", "NOVILLITOS391"]
+    return df_precios
 
-    # ! manual fix for missing values at the end of period. I give a 2% monthly increase in price
-    for counter, value in enumerate(range(101, 109)):
-        for col in columns:
-            df_precios.loc[value, col] = round(df_precios.loc[value - 1, col] * 1.02)
-        df_precios.loc[value, "PERIODO_INICIO"] = df_precios.loc[
-            value - 1, "PERIODO_INICIO"
-        ] + pd.DateOffset(months=1)
 
-        df_precios["YYYYMM"] = df_precios.PERIODO_INICIO.dt.strftime("%Y%m")
+def get_precios_scrapped(fecha_inicio, input, cache_dir=PRECIOS_SCRAPPED_CACHE_DIR):
+    # fecha_inicio no cambia los precios, el recorte al modelo es en get_precios_modelo
+    cached = os.path.join(
+        cache_dir, f"{file_digest(input)}_v{PRECIOS_SCRAPPED_PARSER_VERSION}.parquet"
+    )
+    if os.path.exists(cached):
+        return pd.read_parquet(cached)
+
+    df_precios = parse_precios_scrapped(input)
+
+    # escribo a un temporal y renombro, otro proceso puede estar leyendo el mismo csv
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{cached}.{os.getpid()}.tmp"
+    df_precios.to_parquet(tmp)
+    os.replace(tmp, cached)
 
     return df_precios
 
 
-def plot_precios(df_precios):
-    # plot precios v1 scrapping
-    df_melt = df_precios.drop(columns=["YYYYMM"])
-    df_melt = df_melt.melt(
-        value_vars=[x for x in df_melt.columns if x != ["PERIODO_INICIO"]],
-        id_vars="PERIODO_INICIO",
-        var_name="categoria",
-        value_name="precio_x_kg",
+def get_precios_modelo(df_precios, PARAMS):
+    df_precios_cut = df_precios[
+        df_precios["PERIODO_INICIO"]
+        >= pd.to_datetime(PARAMS["fecha_inicio"], format="%d/%m/%Y")
+    ]
+
+    # verifico que este la info de precios necesasria para todos los periodos del modelo
+    assert len(df_precios_cut) >= PARAMS["periodos_modelo"]
+
+    # una fila por periodo del modelo, periodo_mes_modelo 1..periodos_modelo
+    return df_precios_cut.iloc[: PARAMS["periodos_modelo"]]
+
+
+def get_price_tensor(df_precios_modelo, PARAMS, peso_prom_dict):
+    """
+    Build the sale price of every (period, age, class) cell at once.
+
+    Args:
+        df_precios_modelo: one price row per model period, as returned by get_precios_modelo
+        PARAMS: model parameters
+        peso_prom_dict: average weights per category (PESOS_PROMEDIO)
+
+    Returns:
+        int64 array of shape (periodos_modelo, meses_max_animales + 2, clases), ages start at -1
+    """
+    return price_tensor_from_columns(
+        {name: df_precios_modelo[name].to_numpy(dtype=float) for name in SCRAPPED_COLS},
+        PARAMS,
+        peso_prom_dict,
     )
-    df_melt.sort_values(by="PERIODO_INICIO", inplace=True)
-    df_melt["precio_x_kg"] = df_melt["precio_x_kg"].astype(int)
-    g = sns.lineplot(
-        data=df_melt, x="PERIODO_INICIO", y="precio_x_kg", hue="categoria"
-    ).set_title("Precios scrapped")
+
+
+def price_tensor_from_columns(columns, PARAMS, peso_prom_dict):
+    """
+    get_price_tensor over price columns given as arrays whose last axis is the period.
+
+    Leading axes are kept, e.g. (rates, periodos_modelo) columns give a
+    (rates, periodos_modelo, meses_max_animales + 2, clases) tensor.
+    """
+    SALES_PERIODS = PARAMS["SALES_PERIODS"]
+    edades = np.arange(-1, PARAMS["meses_max_animales"] + 1)
+    clases = np.arange(1, PARAMS["clases"] + 1)
+
+    # columnas de precio como (..., T, 1, 1) para broadcastear contra edad y clase
+    def col(name):
+        return np.asarray(columns[name], dtype=float)[..., None, None]
+
+    edad = edades[None, :, None]
+    clase = clases[None, None, :]
+    c1_c2 = (clase == 1) | (clase == 2)
+
+    precio_destete = (
+        col("NOVILLITOS300")
+        * peso_prom_dict["peso_prom_destete"]
+        * PARAMS["multiplicador_destete"]
+    )
+    # momento 1 16.5 meses
+    precio_momento_1 = np.where(
+        clase == 1,
+        col("VAQUILLONAS270") * peso_prom_dict["peso_prom_vaquillonas"],
+        col("NOVILLITOS300") * peso_prom_dict["peso_prom_novillitos"],
+    )
+    # momento 2
+    precio_momento_2 = np.where(
+        clase == 1,
+        col("VAQUILLONAS391") * peso_prom_dict["peso_prom_vaquillonas_pesados"],
+        col("NOVILLITOS391") * peso_prom_dict["peso_prom_novillos_pesados"],
+    )
+    # c3 se cotiza sobre el precio entero (truncado) de VAQUILLONAS270
+    precio_c3 = (
+        np.trunc(col("VAQUILLONAS270"))
+        * peso_prom_dict["peso_prom_vaquillonas"]
+        * PARAMS["multiplicador_c3"]
+    )
+
+    # mismo orden de prioridad que las ventanas de venta originales
+    precio = np.select(
+        [
+            np.isin(edad, SALES_PERIODS["venta_destete"]) & c1_c2,
+            np.isin(edad, SALES_PERIODS["venta_novillo_vaquillona"]) & c1_c2,
+            np.isin(edad, SALES_PERIODS["venta_pesados"]) & c1_c2,
+            (clase == 3) & (edad >= PARAMS["venta_c3_from"]),
+        ],
+        [
+            precio_destete,
+            precio_momento_1,
+            precio_momento_2,
+            precio_c3,
+        ],
+        default=0.0,
+    )
+
+    if np.isnan(precio).any():
+        raise ValueError("cannot convert float NaN to integer")
+
+    # round() de python y np.rint redondean ambos al par mas cercano
+    return np.rint(precio).astype(np.int64)
 
 
 def precios_scrapped_to_dat(
@@ -204,241 +311,112 @@ def precios_scrapped_to_dat(
     PARAMS,
     PATH_DAT_FILES,
     peso_prom_dict,
+    sidecar=False,
 ):
-    periodos_modelo = PARAMS["periodos_modelo"]
-    clases = PARAMS["clases"]
-    meses_max_animales = PARAMS["meses_max_animales"]
-    fecha_inicio = PARAMS["fecha_inicio"]
-    path_to_file_precios = PATH_DAT_FILES["precios"]
-
-    df_precios_cut = df_precios[
-        df_precios["PERIODO_INICIO"] >= pd.to_datetime(fecha_inicio, format="%d/%m/%Y")
-    ]
-    df_precios_cut["periodo_mes_modelo"] = np.arange(1, len(df_precios_cut) + 1)
+    df_precios_modelo = get_precios_modelo(df_precios, PARAMS)
+    write_price_tensor(
+        get_price_tensor(df_precios_modelo, PARAMS, peso_prom_dict),
+        PARAMS,
+        PATH_DAT_FILES,
+        sidecar=sidecar,
+    )
 
-    # verifico que este la info de precios necesasria para todos los periodos del modelo
-    assert max(df_precios_cut.periodo_mes_modelo) >= periodos_modelo
-
-    # datos sacados de kg prom por cabeza de pagina "venta de cabezas - la cepa"
-    peso_prom_destete = peso_prom_dict["peso_prom_destete"]
-    peso_prom_vaquillonas = peso_prom_dict["peso_prom_vaquillonas"]
-    peso_prom_novillitos = peso_prom_dict["peso_prom_novillitos"]
-    peso_prom_vaquillonas_pesados = peso_prom_dict["peso_prom_vaquillonas_pesados"]
-    peso_prom_novillos_pesados = peso_prom_dict["peso_prom_novillos_pesados"]
-
-    precios_append = []
-    for periodo, edad_animal, clase in itertools.product(
-        range(1, periodos_modelo + 1),
-        range(-1, meses_max_animales + 1),
-        range(1, clases + 1),
-    ):
-        row = df_precios_cut.loc[df_precios_cut["periodo_mes_modelo"] == periodo]
-
-        try:
-            # destete
-            if (edad_animal in [6, 7, 8]) & (clase in [1, 2]):
-                if clase == 1:
-                    precio = (
-                        float(row["NOVILLITOS300"])
-                        * peso_prom_destete
-                        * PARAMS["multiplicador_destete"]
-                    )
-                if clase == 2:
-                    precio = (
-                        float(row["NOVILLITOS300"])
-                        * peso_prom_destete
-                        * PARAMS["multiplicador_destete"]
-                    )
-
-            # momento 1 16.5 meses
-            elif (edad_animal in [16, 17, 18]) & (clase in [1, 2]):
-                if clase == 1:
-                    precio = float(row["VAQUILLONAS270"]) * peso_prom_vaquillonas
-                if clase == 2:
-                    precio = float(row["NOVILLITOS300"]) * peso_prom_novillitos
-
-            # momento 2
-            elif (edad_animal in [30, 31, 32, 33, 34, 35, 36]) & (clase in [1, 2]):
-                if clase == 1:
-                    precio = (
-                        float(row["VAQUILLONAS391"]) * peso_prom_vaquillonas_pesados
-                    )
-                if clase == 2:
-                    precio = float(row["NOVILLITOS391"]) * peso_prom_novillos_pesados
-
-            # elif clase == 3 & (periodo == periodos_modelo):
-            elif (clase == 3) & (edad_animal >= PARAMS["venta_c3_from"]):
-                precio = (
-                    int(row["VAQUILLONAS270"])
-                    * peso_prom_vaquillonas
-                    * PARAMS["multiplicador_c3"]
-                )
-
-            else:
-                precio = 0
-
-            precio = round(precio)
-
-        except TypeError:
-            log.info(f"ERROR  {row}, {periodo}")
-            break
-        # -------------------#
-
-        valores = [periodo, edad_animal, clase, precio, "\n"]
-        line = "\t".join(str(x) for x in valores)
-        write_line_to_file(path_to_file_precios, line)
-
-        # get fecha max y min en row para obtener periodo de precios mapeados
-        # para en get data cortar el linieplot entre esos periodos
-        precios_append.append(row["PERIODO_INICIO"].values[0])
-
-    precios_append = pd.Series(precios_append)
+    # get fecha max y min en row para obtener periodo de precios mapeados
+    # para en get data cortar el linieplot entre esos periodos
     precio_min_max = {
-        "fecha_min": datetime.strftime(precios_append.min(), "%d/%m/%Y"),
-        "fecha_max": datetime.strftime(precios_append.max(), "%d/%m/%Y"),
+        "fecha_min": datetime.strftime(
+            df_precios_modelo["PERIODO_INICIO"].min(), "%d/%m/%Y"
+        ),
+        "fecha_max": datetime.strftime(
+            df_precios_modelo["PERIODO_INICIO"].max(), "%d/%m/%Y"
+        ),
     }
 
     return precio_min_max
 
 
-def get_ventas_inicial_from_parte_diario(parte_diario_path):
-    pos_cols_ventas = [x for x in range(25, 34)]
-    pos_cols_ventas.extend([1])
-
-    ventas_df = pd.read_csv(parte_diario_path, usecols=pos_cols_ventas)
-    ventas_df.rename(
-        columns={"MACHOS": "OREJANO_MACHOS", "HEMBRAS": "OREJANO_HEMBRAS"}, inplace=True
+def write_price_tensor(precios, PARAMS, PATH_DAT_FILES, sidecar=False):
+    """
+    Write a price tensor as returned by get_price_tensor to prices.dat, and to prices.npy
+    with sidecar.
+    """
+    periodos, edades, clases = np.meshgrid(
+        np.arange(1, PARAMS["periodos_modelo"] + 1),
+        np.arange(-1, PARAMS["meses_max_animales"] + 1),
+        np.arange(1, PARAMS["clases"] + 1),
+        indexing="ij",
     )
-    ventas_df = ventas_df.fillna(0)
 
-    # limpiar casos anomalos
-    ventas_df.loc[119, "FECHA"] = "11/15/2014"
-    ventas_df.loc[356, "FECHA"] = "6/28/2019"
-    ventas_df["FECHA"] = pd.to_datetime(ventas_df["FECHA"], format="%m/%d/%Y")
-    ventas_df.rename(
-        columns={
-            "VENTAS": "COMENTARIO",
-            "?": "SIN_ASIGNAR",
-            "vacas": "VACAS",
-            "vaquillonas": "VAQUILLONAS270",
-            "novillos": "NOVILLITOS391",
-            "novillitos": "NOVILLITOS300",
-            "toros": "TOROS",
-            "terneros": "TERNEROS_DESTETE",
-            "terneras": "TERNERAS_DESTETE",
-        },
-        inplace=True,
+    # mismo orden que itertools.product(periodo, edad, clase)
+    write_dat(
+        PATH_DAT_FILES["precios"],
+        periodos.ravel(),
+        edades.ravel(),
+        clases.ravel(),
+        np.asarray(precios).ravel(),
+        sidecar=sidecar,
     )
 
-    return ventas_df
-
 
-def get_precios_del_periodo(periodo, df_precios):
-    closest_price = abs((df_precios.PERIODO_INICIO - periodo)).sort_values(
-        ascending=True
-    )
-    if closest_price[closest_price.index[0]] > pd.Timedelta("15 days"):
-        log.debug(f"WARNING: diferencia de precio mayor a 15 dias for {periodo}")
-    precios_periodo = df_precios.iloc[closest_price.index[0]]
-
-    return precios_periodo
+def get_ventas_inicial_from_parte_diario(parte_diario_path):
+    return load_parte_diario(parte_diario_path).ventas.copy()
 
 
 def clear_model_inputs(file_paths):
     for file in file_paths.values():
-        if os.path.exists(file):
-            os.remove(file)
+        for path in (file, sidecar_path(file)):
+            if os.path.exists(path):
+                os.remove(path)
 
 
 def costs_to_dat_test(PATH_DAT_FILES, periodos_modelo, meses_max_animales, clases):
-    collect_costos = []
-
-    with open(PATH_DAT_FILES["costos"], "w") as f:
-        for periodo, edad_animal, clase in itertools.product(
-            range(1, periodos_modelo + 1),
-            range(-1, meses_max_animales + 1),
-            range(1, clases + 1),
-        ):
-            # a mayor edad del animal, el impacto es positivo pero decreciente en funcion del tiempo
-            # a medida que avanzan los periodos, es menos costoso mantener a un animal
-            costo = 1 + edad_animal * 0.25
-
-            if math.isinf(costo) | math.isnan(costo):
-                costo = 1
-            # else:
-            if clase == 3:
-                costo = 0
-
-            # ! WARNING
-            costo = 0
-            valores = [periodo, edad_animal, clase, costo, "\n"]
-            line = "\t".join(str(x) for x in valores)
-            f.write(line)
-
-            # plot costos
-            collect_costos.append(
-                {
-                    "periodo": periodo,
-                    "costo": costo,
-                    "edad": edad_animal,
-                    "clase": clase,
-                }
-            )
+    periodo, edad_animal, clase = np.meshgrid(
+        np.arange(1, periodos_modelo + 1),
+        np.arange(-1, meses_max_animales + 1),
+        np.arange(1, clases + 1),
+        indexing="ij",
+    )
+    periodo, edad_animal, clase = periodo.ravel(), edad_animal.ravel(), clase.ravel()
+
+    # ! WARNING: costo 0 en todas las celdas, pisa el de test 1 + edad * 0.25 (0 en clase 3)
+    costos = np.zeros(len(periodo), dtype=int)
 
-    df_costos = pd.DataFrame(collect_costos)
+    write_dat(PATH_DAT_FILES["costos"], periodo, edad_animal, clase, costos)
+
+    # plot costos
+    df_costos = pd.DataFrame(
+        {"periodo": periodo, "costo": costos, "edad": edad_animal, "clase": clase}
+    )
 
     return df_costos
 
 
 def get_interplolator(PARAMS, output_plot_path=False):
-    DataGrid = FDataGrid(
-        list(PARAMS["costos_meses_usd_c1_c2_pre_norm"].values()),
-        list(PARAMS["costos_meses_usd_c1_c2_pre_norm"].keys()),
-    )
+    """
+    Monthly cost curve of c1/c2 animals, and the accumulated costs at 6, 17 and 21 months
+    and the intercept saved to PARAMS["costos_meses_usd_c1_c2"].
 
-    # Plot the total cost on the primary y-axis
-    DataGrid.interpolation = SplineInterpolation(
-        interpolation_order=3,
-        monotone=True,
+    Returns:
+        CostCurve, tabulated for ages -1..meses_max_animales
+    """
+    curve = CostCurve(
+        PARAMS["costos_meses_usd_c1_c2_pre_norm"], max_age=PARAMS["meses_max_animales"]
     )
-    monthly_cost = DataGrid.derivative()
 
     log.info("save accumulated costs to PARAMS")
 
     # adding the intercept of the non derivative base function
-    PARAMS["costos_meses_usd_c1_c2"][6] = float(
-        monthly_cost.evaluate(eval_points=[x for x in range(7)]).sum()
-        + DataGrid.evaluate(0)
-    )
-    PARAMS["costos_meses_usd_c1_c2"][17] = float(
-        monthly_cost.evaluate(eval_points=[x for x in range(18)]).sum()
-        + DataGrid.evaluate(0)
-    )
-    PARAMS["costos_meses_usd_c1_c2"][21] = float(
-        monthly_cost.evaluate(eval_points=[x for x in range(22)]).sum()
-        + DataGrid.evaluate(0)
-    )
-    PARAMS["costos_meses_usd_c1_c2"]["intercept"] = float(DataGrid.evaluate(0))
+    for edad in (6, 17, 21):
+        PARAMS["costos_meses_usd_c1_c2"][edad] = float(curve.cumulative(edad) + curve.intercept)
+    PARAMS["costos_meses_usd_c1_c2"]["intercept"] = curve.intercept
     log.info(PARAMS["costos_meses_usd_c1_c2"])
 
     if output_plot_path:
-        fig, ax1 = plt.subplots()
-        DataGrid.plot(axes=ax1, label="accumulated cost curve")
-        DataGrid.scatter(axes=ax1, c="C1")
-        ax1.set_xlabel("months")
-        ax1.set_ylabel("accumulated cost")
-
-        # Plot the monthly cost on the secondary y-axis
-        ax2 = ax1.twinx()
-        monthly_cost.plot(axes=ax2, label="monthly cost curve", c="C6")
-        ax2.set_ylabel("monthly cost")
+        from preprocessing.plots import plot_cost_curves
 
-        # Show the legend
-        fig.legend()
+        plot_cost_curves(curve, output_plot_path)
 
-        fig.savefig(output_plot_path, dpi=300, bbox_inches="tight")
-
-    return monthly_cost
+    return curve
 
 
 def get_month_cost(periods: list, interpolator, PARAMS):
@@ -451,40 +429,84 @@ def get_month_cost(periods: list, interpolator, PARAMS):
     return float(cost)
 
 
-def costs_to_dat_realistic(Interpolator, PATH_DAT_FILES, PARAMS):
-    with open(PATH_DAT_FILES["costos"], "w") as f:
-        for periodo, edad_animal, clase in itertools.product(
-            range(1, PARAMS["periodos_modelo"] + 1),
-            range(-1, PARAMS["meses_max_animales"] + 1),
-            range(1, PARAMS["clases"] + 1),
-        ):
-            if edad_animal == -1:
-                costo = 0
-            elif (clase == 3) & (edad_animal > 12):
-                costo = PARAMS["c3_costs"]["monthly_cost_over_12"]
-            elif (clase == 3) & (edad_animal <= 12):
-                costo = 0
-            
-            elif edad_animal == 0:
-                costo = (
-                    Interpolator.evaluate(0)
-                    + PARAMS["costos_meses_usd_c1_c2"]["intercept"]
-                )
+# matrices de costo (edad x clase) ya calculadas, no dependen del periodo
+_COST_MATRIX_CACHE = {}
+
+
+def get_cost_matrix(Interpolator, PARAMS):
+    """
+    Monthly cost of every (age, class) cell, from the tabulated cost curve.
+
+    The matrix is cached by the cost parameters, so experiments sharing them skip the curve.
+
+    Args:
+        Interpolator: monthly cost curve returned by get_interplolator
+        PARAMS: model parameters
+
+    Returns:
+        float array of shape (meses_max_animales + 2, clases), ages start at -1
+    """
+    key = (
+        tuple(sorted(PARAMS["costos_meses_usd_c1_c2_pre_norm"].items())),
+        tuple(sorted(PARAMS["c3_costs"].items())),
+        PARAMS["c1_over_cost"],
+        PARAMS["meses_max_animales"],
+        PARAMS["clases"],
+    )
+    if key in _COST_MATRIX_CACHE:
+        return _COST_MATRIX_CACHE[key]
+
+    edades = np.arange(-1, PARAMS["meses_max_animales"] + 1)
+
+    # pasados los 21 meses el costo mensual de c1 y c2 es el del mes 15
+    edades_eval = np.where(edades > 21, 15, np.clip(edades, 0, None))
+    costo_c1_c2 = np.ravel(Interpolator.evaluate(eval_points=edades_eval))
+
+    costo_c1_c2 = np.where(
+        edades == 0,
+        costo_c1_c2 + PARAMS["costos_meses_usd_c1_c2"]["intercept"],
+        costo_c1_c2,
+    )
+    costo_c1_c2 = np.where(edades == -1, 0.0, costo_c1_c2)
+
+    costos = np.empty((len(edades), PARAMS["clases"]))
+    for clase in range(1, PARAMS["clases"] + 1):
+        if clase == 3:
+            costo = np.where(edades > 12, PARAMS["c3_costs"]["monthly_cost_over_12"], 0.0)
+        elif clase == 1:
+            # desde la recria el macho cuesta 10% mas q hembra
+            costo = np.where(
+                edades > 14, costo_c1_c2 * (1 + PARAMS["c1_over_cost"]), costo_c1_c2
+            )
+        else:
+            costo = costo_c1_c2
+        costos[:, clase - 1] = np.where(costo > 0, costo, 0.0)
+
+    costos.setflags(write=False)
+    _COST_MATRIX_CACHE[key] = costos
 
-            elif edad_animal > 21:
-                costo = Interpolator.evaluate(eval_points=[15]).min()
+    return costos
 
-            else:
-                costo = Interpolator.evaluate(eval_points=[edad_animal]).min()
 
-            if (clase == 1) & (edad_animal > 14): #desde la recria el macho cuesta 10% mas q hembra
-                costo = costo * (1 + PARAMS["c1_over_cost"])
+def costs_to_dat_realistic(Interpolator, PATH_DAT_FILES, PARAMS, sidecar=False):
+    costos = get_cost_matrix(Interpolator, PARAMS)
 
-            costo = max(0, costo)
+    # el costo no depende del periodo: las columnas edad/clase/costo se repiten por periodo
+    edades, clases = np.meshgrid(
+        np.arange(-1, PARAMS["meses_max_animales"] + 1),
+        np.arange(1, PARAMS["clases"] + 1),
+        indexing="ij",
+    )
+    periodos = PARAMS["periodos_modelo"]
 
-            valores = [periodo, edad_animal, clase, float(costo), "\n"]
-            line = "\t".join(str(x) for x in valores)
-            f.write(line)
+    write_dat(
+        PATH_DAT_FILES["costos"],
+        np.repeat(np.arange(1, periodos + 1), costos.size),
+        np.tile(edades.ravel(), periodos),
+        np.tile(clases.ravel(), periodos),
+        np.tile(costos.ravel(), periodos),
+        sidecar=sidecar,
+    )
 
 
 def delete_files(file_paths):
@@ -493,39 +515,51 @@ def delete_files(file_paths):
             os.remove(file)
 
 
+def get_august_periods(PARAMS):
+    """
+    Split the model periods 0..periodos_modelo into birth (August) and non birth months.
+
+    Returns:
+        tuple (august periods, not august periods) as lists of ints
+    """
+    start_date = pd.to_datetime(PARAMS["fecha_inicio"], format="%d/%m/%Y")
+    august_periods, not_august_periods = [], []
+
+    for i in range(PARAMS["periodos_modelo"] + 1):
+        if (start_date + pd.DateOffset(months=i)).month == 8:
+            august_periods.append(i)
+        else:
+            not_august_periods.append(i)
+
+    return august_periods, not_august_periods
+
+
 def write_params_file(PATH_DAT_FILES, PARAMS):
     # Write parameters to file
-    with open(PATH_DAT_FILES["parameters"], "w") as f:
-        f.write("model params\n")
-        f.write(f"max_periods {PARAMS['periodos_modelo']}\n")
-        f.write(f"max_age_allowed {PARAMS['meses_max_animales']}\n")
-        f.write(f"virtual_venta_max {PARAMS['virtual_ventas_max_por_mes']}\n")
-        f.write(f"min_sell_qty_monthly {PARAMS['ventas_min_por_mes']}\n")
-        f.write(f"sell_c1_c2_before {PARAMS['sell_c1_c2_before']}\n")
-        f.write(f"mantain_stock_c3_at_end {PARAMS['mantain_c3_stock']}\n")
-        #f.write(f"end_c3_stock_as {PARAMS['c3_stock_at_end']}\n")
-        f.write(f"fix_cost_sales {PARAMS['fix_cost_sales']}\n")
-        f.write(f"pregnancy_index {PARAMS['pregnancy_index']}\n")
-        
+    params = {
+        "max_periods": PARAMS["periodos_modelo"],
+        "max_age_allowed": PARAMS["meses_max_animales"],
+        "virtual_venta_max": PARAMS["virtual_ventas_max_por_mes"],
+        "min_sell_qty_monthly": PARAMS["ventas_min_por_mes"],
+        "sell_c1_c2_before": PARAMS["sell_c1_c2_before"],
+        "mantain_stock_c3_at_end": PARAMS["mantain_c3_stock"],
+        # "end_c3_stock_as": PARAMS["c3_stock_at_end"],
+        "fix_cost_sales": PARAMS["fix_cost_sales"],
+        "pregnancy_index": PARAMS["pregnancy_index"],
+    }
+    write_dat(
+        PATH_DAT_FILES["parameters"],
+        list(params),
+        list(params.values()),
+        sep=" ",
+        end="\n",
+        header="model params",
+    )
 
     # Write August birth data to file
-    with open(PATH_DAT_FILES["agosto_si"], "w") as f_yes, open(
-        PATH_DAT_FILES["agosto_no"], "w"
-    ) as f_no:
-        start_date = pd.to_datetime(PARAMS["fecha_inicio"], format="%d/%m/%Y")
-
-        date_dict = {
-            (start_date + pd.DateOffset(months=i)).strftime("%Y-%m-%d"): (i, 1)
-            if (start_date + pd.DateOffset(months=i)).month == 8
-            else (i, 0)
-            for i in range(PARAMS["periodos_modelo"] + 1)
-        }
-
-        for key, value in date_dict.items():
-            if value[1] == 1:
-                f_yes.write(f"{value[0]}\n")
-            else:
-                f_no.write(f"{value[0]}\n")
+    august_periods, not_august_periods = get_august_periods(PARAMS)
+    write_dat(PATH_DAT_FILES["agosto_si"], august_periods, end="\n")
+    write_dat(PATH_DAT_FILES["agosto_no"], not_august_periods, end="\n")
 
     SALES_PERIODS = PARAMS["SALES_PERIODS"]
 
@@ -542,151 +576,109 @@ def write_params_file(PATH_DAT_FILES, PARAMS):
 
 
 def write_costs_file_test(PATH_DAT_FILES, periodos_modelo, meses_max_animales, clases):
-    collect_costos = []
-
-    with open(PATH_DAT_FILES["costos"], "w") as f:
-        for periodo, edad_animal, clase in itertools.product(
-            range(1, periodos_modelo + 1),
-            range(-1, meses_max_animales + 1),
-            range(1, clases + 1),
-        ):
-            # a mayor edad del animal, el impacto es positivo pero decreciente en funcion del tiempo
-            # a medida que avanzan los periodos, es menos costoso mantener a un animal
-            costo = 1 + edad_animal * 0.25
-
-            if math.isinf(costo) | math.isnan(costo):
-                costo = 1
-            # else:
-            if clase == 3:
-                costo = 0
-
-            # ! WARNING
-            costo = 0
-            valores = [periodo, edad_animal, clase, costo, "\n"]
-            line = "\t".join(str(x) for x in valores)
-            f.write(line)
-
-            # plot costos
-            collect_costos.append(
-                {
-                    "periodo": periodo,
-                    "costo": costo,
-                    "edad": edad_animal,
-                    "clase": clase,
-                }
-            )
-
-    df_costos = pd.DataFrame(collect_costos)
-
-    return df_costos
+    return costs_to_dat_test(PATH_DAT_FILES, periodos_modelo, meses_max_animales, clases)
 
 
 def append_daily_income_and_cost(
-    df_ventas, df_precios, PARAMS, PESOS_PROMEDIO, costs_interpolator
+    df_ventas, price_index, PARAMS, PESOS_PROMEDIO, costs_interpolator
 ):
     df_ventas = df_ventas.loc[
         (df_ventas.FECHA >= PARAMS["fecha_inicio"])
         & (df_ventas.FECHA <= PARAMS["fecha_fin_ejercicio"])
-    ]
-    for index, row in df_ventas.iterrows():
-        precios = get_precios_del_periodo(row.FECHA, df_precios)
-
-        # SALES_EARNINGS
-        earned_VAQUILLONAS270 = (
-            row["VAQUILLONAS270"]
-            * precios["VAQUILLONAS270"]
-            * PESOS_PROMEDIO["peso_prom_vaquillonas"]
-        )
-        earned_NOVILLITOS391 = (
-            row["NOVILLITOS391"]
-            * precios["NOVILLITOS391"]
-            * PESOS_PROMEDIO["peso_prom_novillos_pesados"]
-        )
-        earned_NOVILLITOS300 = (
-            row["NOVILLITOS300"]
-            * precios["NOVILLITOS300"]
-            * PESOS_PROMEDIO["peso_prom_novillitos"]
-        )
-        # earned_TOROS = row['TOROS'] * precios['TOROS']
-
-        earned_VACAS = row["VACAS"] * (
-            precios["VAQUILLONAS270"] * 0.5 * PESOS_PROMEDIO["peso_prom_vaquillonas"]
-        )
+    ].copy()
+    # precio mas cercano de cada venta
+    precios = price_index.rows(df_ventas["FECHA"])
 
-        earned_TERNEROS_DESTETE = (
-            row["TERNEROS_DESTETE"]
-            * precios["NOVILLITOS300"]
-            * PARAMS["multiplicador_destete"]
-            * PESOS_PROMEDIO["peso_prom_destete"]
-        )
-        earned_TERNERAS_DESTETE = (
-            row["TERNERAS_DESTETE"]
-            * precios["NOVILLITOS300"]
-            * PARAMS["multiplicador_destete"]
-            * PESOS_PROMEDIO["peso_prom_destete"]
-        )
+    # SALES_EARNINGS
+    earned_VAQUILLONAS270 = (
+        df_ventas["VAQUILLONAS270"]
+        * precios["VAQUILLONAS270"]
+        * PESOS_PROMEDIO["peso_prom_vaquillonas"]
+    )
+    earned_NOVILLITOS391 = (
+        df_ventas["NOVILLITOS391"]
+        * precios["NOVILLITOS391"]
+        * PESOS_PROMEDIO["peso_prom_novillos_pesados"]
+    )
+    earned_NOVILLITOS300 = (
+        df_ventas["NOVILLITOS300"]
+        * precios["NOVILLITOS300"]
+        * PESOS_PROMEDIO["peso_prom_novillitos"]
+    )
+    # earned_TOROS = df_ventas['TOROS'] * precios['TOROS']
 
-        VENTA_TOT_DIA = (
-            earned_VAQUILLONAS270
-            + earned_NOVILLITOS391
-            + earned_NOVILLITOS300
-            + earned_VACAS
-            # +    earned_TOROS
-            + earned_TERNEROS_DESTETE
-            + earned_TERNERAS_DESTETE
-        )
+    earned_VACAS = df_ventas["VACAS"] * (
+        precios["VAQUILLONAS270"] * 0.5 * PESOS_PROMEDIO["peso_prom_vaquillonas"]
+    )
 
-        df_ventas.loc[index, "VENTA_VALOR"] = VENTA_TOT_DIA
+    earned_TERNEROS_DESTETE = (
+        df_ventas["TERNEROS_DESTETE"]
+        * precios["NOVILLITOS300"]
+        * PARAMS["multiplicador_destete"]
+        * PESOS_PROMEDIO["peso_prom_destete"]
+    )
+    earned_TERNERAS_DESTETE = (
+        df_ventas["TERNERAS_DESTETE"]
+        * precios["NOVILLITOS300"]
+        * PARAMS["multiplicador_destete"]
+        * PESOS_PROMEDIO["peso_prom_destete"]
+    )
 
-        # SALES COSTS
-        cost_VAQUILLONAS270 = (
-            row["VAQUILLONAS270"] * PARAMS["costos_meses_usd_c1_c2"][17]
-        )
-        cost_NOVILLITOS391 = row["NOVILLITOS391"] * PARAMS["costos_meses_usd_c1_c2"][21]
+    df_ventas["VENTA_VALOR"] = (
+        earned_VAQUILLONAS270
+        + earned_NOVILLITOS391
+        + earned_NOVILLITOS300
+        + earned_VACAS
+        # +    earned_TOROS
+        + earned_TERNEROS_DESTETE
+        + earned_TERNERAS_DESTETE
+    ).astype(float)
 
-        cost_NOVILLITOS300 = row["NOVILLITOS300"] * PARAMS["costos_meses_usd_c1_c2"][17]
+    # SALES COSTS
+    cost_VAQUILLONAS270 = (
+        df_ventas["VAQUILLONAS270"] * PARAMS["costos_meses_usd_c1_c2"][17]
+    )
+    cost_NOVILLITOS391 = df_ventas["NOVILLITOS391"] * PARAMS["costos_meses_usd_c1_c2"][21]
 
-        cost_VACAS = row["VACAS"] * get_month_cost(
-            [x for x in range(13)] + [12] * (24),
-            costs_interpolator,
-            PARAMS,
-        )
+    cost_NOVILLITOS300 = df_ventas["NOVILLITOS300"] * PARAMS["costos_meses_usd_c1_c2"][17]
 
-        # cost_TOROS = row['TOROS'] *
+    # costo de una vaca, el mismo para todas las ventas
+    costo_vaca = get_month_cost(
+        [x for x in range(13)] + [12] * (24),
+        costs_interpolator,
+        PARAMS,
+    )
+    cost_VACAS = df_ventas["VACAS"] * costo_vaca
 
-        cost_TERNEROS_DESTETE = (
-            row["TERNEROS_DESTETE"] * PARAMS["costos_meses_usd_c1_c2"][6]
-        )
-        cost_TERNERAS_DESTETE = (
-            row["TERNERAS_DESTETE"] * PARAMS["costos_meses_usd_c1_c2"][6]
-        )
+    # cost_TOROS = df_ventas['TOROS'] *
 
-        COSTO_TOT_DIA = (
-            cost_VAQUILLONAS270
-            + cost_NOVILLITOS391
-            + cost_NOVILLITOS300
-            + cost_VACAS
-            # +    cost_TOROS
-            + cost_TERNEROS_DESTETE
-            + cost_TERNERAS_DESTETE
-        )
+    cost_TERNEROS_DESTETE = (
+        df_ventas["TERNEROS_DESTETE"] * PARAMS["costos_meses_usd_c1_c2"][6]
+    )
+    cost_TERNERAS_DESTETE = (
+        df_ventas["TERNERAS_DESTETE"] * PARAMS["costos_meses_usd_c1_c2"][6]
+    )
 
-        df_ventas.loc[index, "COSTO_VALOR"] = float(COSTO_TOT_DIA)
+    df_ventas["COSTO_VALOR"] = (
+        cost_VAQUILLONAS270
+        + cost_NOVILLITOS391
+        + cost_NOVILLITOS300
+        + cost_VACAS
+        # +    cost_TOROS
+        + cost_TERNEROS_DESTETE
+        + cost_TERNERAS_DESTETE
+    ).astype(float)
 
     df_ventas["MARGIN"] = df_ventas["VENTA_VALOR"] - df_ventas["COSTO_VALOR"]
 
-    df_ventas.to_csv('test.csv')
-
     return df_ventas
 
 
 def prices_to_usd_b(df_prices_ars, usd_b_path, cols_to_normalize, n=7):
-    dln = DolarNormalizer(usd_b_path)
+    dln = load_dolar_normalizer(usd_b_path)
 
     log.info(f"using mean {n} days for USD_B normalization")
-    df_prices_ars["usd_b"] = df_prices_ars.apply(
-        lambda x: dln.mean_last_n_days(x["PERIODO_INICIO"], n), axis=1
-    )
+    df_prices_ars["usd_b"] = dln.mean_last_n_days(df_prices_ars["PERIODO_INICIO"], n)
 
     df_prices_ars[cols_to_normalize] = df_prices_ars[cols_to_normalize].div(
         df_prices_ars["usd_b"], axis=0
@@ -696,21 +688,10 @@ def prices_to_usd_b(df_prices_ars, usd_b_path, cols_to_normalize, n=7):
 
 
 def get_stock_row(parte_diario_path, FECHA_INICIO_MODELO):
-    df_stock_parte = pd.read_csv(parte_diario_path, usecols=[x for x in range(0, 15)])
-    df_stock_parte.rename(
-        columns={"MACHOS": "OREJANO_MACHOS", "HEMBRAS": "OREJANO_HEMBRAS"}, inplace=True
-    )
-
-    # limpiar casos anomalos
-    df_stock_parte.loc[119, "FECHA"] = "11/15/2014"
-    df_stock_parte.loc[356, "FECHA"] = "6/28/2019"
-
-    df_stock_parte["FECHA"] = pd.to_datetime(df_stock_parte["FECHA"], format="%m/%d/%Y")
-
     #### - LEER STOCK DIARIO Y REEMPLAZAR STOCK INICIAL CON VALORES REALES - ####
-    row = df_stock_parte.loc[df_stock_parte["FECHA"] == FECHA_INICIO_MODELO]
+    parte_diario = load_parte_diario(parte_diario_path)
 
-    return row, df_stock_parte.columns
+    return parte_diario.stock_row(FECHA_INICIO_MODELO), parte_diario.stock_columns
 
 
 def quote_stock(prices, stock_row, PESOS_PROMEDIO, costs_interpolator, PARAMS):
@@ -842,7 +823,7 @@ def quote_stock(prices, stock_row, PESOS_PROMEDIO, costs_interpolator, PARAMS):
 
 
 def business_exercise_value(
-    df_ventas, df_precios, PARAMS, path_parte_diario, PESOS_PROMEDIO, costs_interpolator
+    df_ventas, price_index, PARAMS, path_parte_diario, PESOS_PROMEDIO, costs_interpolator
 ):
     fecha_fin_ejercicio = pd.to_datetime(
         PARAMS["fecha_fin_ejercicio"], format="%d/%m/%Y"
@@ -856,23 +837,23 @@ def business_exercise_value(
 
     ## -- stock to value -- ##
     init_date = fecha_fin_ejercicio
-    end_stock_row = None
 
-    # iterate day by day until data exist in stock diario file
-    while end_stock_row is None or end_stock_row[0].empty:
-        end_stock_row = get_stock_row(path_parte_diario, fecha_fin_ejercicio)
-        fecha_fin_ejercicio = fecha_fin_ejercicio + relativedelta(days=1)
-    end_stock_row = end_stock_row[0].fillna(0)
+    # primer dia con datos en el stock diario desde el fin del ejercicio
+    end_stock_row, fecha_con_datos = load_parte_diario(path_parte_diario).next_stock_row(
+        fecha_fin_ejercicio
+    )
+    end_stock_row = end_stock_row.fillna(0)
 
     assert not end_stock_row.empty, f"{fecha_fin_ejercicio} FOR PARTE DIARIO IS EMPTY"
 
+    # el recorrido dia a dia terminaba un dia despues de la fecha con datos
+    fecha_fin_ejercicio = fecha_con_datos + relativedelta(days=1)
+
     log.info(
         f"moved {(fecha_fin_ejercicio - init_date).days} from {init_date} to find data in stock diario file"
     )
 
-    prices_final_period = get_precios_del_periodo(
-        fecha_fin_ejercicio, df_precios
-    ).to_dict()
+    prices_final_period = price_index.row(fecha_fin_ejercicio)
 
     df_final_stock_value = quote_stock(
         prices_final_period, end_stock_row, PESOS_PROMEDIO, costs_interpolator, PARAMS
@@ -920,13 +901,44 @@ def apply_contant_prices(df_precios):
         "NOVILLITOS391": 1.81,
     }
 
-    for index, row in df_precios.iterrows():
-        for col in cols.keys():
-            df_precios.loc[index, col] = cols[col]
+    for col, value in cols.items():
+        df_precios[col] = value
 
     return df_precios
 
 
+def discount_multipliers(fechas, discount_factor_percent, fecha_inicio):
+    """
+    Compound discount (1 - rate)^months of every date, 1 up to fecha_inicio.
+
+    Args:
+        fechas: price dates
+        discount_factor_percent: rate as percentage, or an array of rates
+        fecha_inicio: Start date in format '%d/%m/%Y'
+
+    Returns:
+        array of shape (len(fechas),), or (rates, len(fechas)) for an array of rates
+    """
+    fechas = pd.DatetimeIndex(fechas)
+    start_date = pd.to_datetime(fecha_inicio, format="%d/%m/%Y")
+
+    periods_from_start = (fechas.year - start_date.year) * 12 + (
+        fechas.month - start_date.month
+    )
+    discount_rate = np.asarray(discount_factor_percent, dtype=float) / 100.0
+
+    # (1 - r)^k con el pow de python una vez por cantidad de meses distinta: el pow
+    # vectorizado de numpy difiere en el ultimo bit
+    meses, posicion = np.unique(periods_from_start.to_numpy(), return_inverse=True)
+    tabla = np.array(
+        [[(1 - float(rate)) ** int(k) for k in meses] for rate in discount_rate.reshape(-1)]
+    ).reshape(discount_rate.shape + meses.shape)
+    multiplier = tabla[..., posicion]
+
+    # solo se descuentan los periodos futuros
+    return np.where(fechas.to_numpy() > start_date.to_datetime64(), multiplier, 1.0)
+
+
 def apply_discount_factor_to_prices(df_precios, discount_factor_percent, fecha_inicio):
     """
     Apply a discount factor to future prices period by period.
@@ -939,47 +951,44 @@ def apply_discount_factor_to_prices(df_precios, discount_factor_percent, fecha_i
     Returns:
         DataFrame with discounted prices
     """
-    df_precios = df_precios.copy()
-
-    # Convert discount percentage to decimal (e.g., 0.5% -> 0.005, 1% -> 0.01)
-    discount_rate = discount_factor_percent / 100.0
-
-    # Price columns to apply discount to
-    price_cols = [
-        "VAQUILLONAS270",
-        "VAQUILLONAS391",
-        "NOVILLITOS300",
-        "NOVILLITOS391",
-    ]
-
     # Sort by date to ensure proper ordering
     df_precios = df_precios.sort_values('PERIODO_INICIO').reset_index(drop=True)
 
-    # Get the start date
-    start_date = pd.to_datetime(fecha_inicio, format="%d/%m/%Y")
+    multiplier = discount_multipliers(
+        df_precios["PERIODO_INICIO"], discount_factor_percent, fecha_inicio
+    )
+    df_precios[SCRAPPED_COLS] = (
+        df_precios[SCRAPPED_COLS].to_numpy(dtype=float) * multiplier[:, None]
+    )
 
-    # Apply discount factor period by period for future periods
-    for index, row in df_precios.iterrows():
-        if row['PERIODO_INICIO'] > start_date:
-            # Calculate number of periods from start
-            periods_from_start = (row['PERIODO_INICIO'].year - start_date.year) * 12 + \
-                                (row['PERIODO_INICIO'].month - start_date.month)
+    log.info(f"Applied {discount_factor_percent}% discount factor to future prices")
 
-            # Apply compound discount: price * (1 - discount_rate)^periods
-            discount_multiplier = (1 - discount_rate) ** periods_from_start
+    return df_precios
 
-            for col in price_cols:
-                df_precios.loc[index, col] = df_precios.loc[index, col] * discount_multiplier
 
-    log.info(f"Applied {discount_factor_percent}% discount factor to future prices")
+def get_discounted_price_tensors(df_precios, disc_facts, PARAMS, peso_prom_dict):
+    """
+    Price tensors of many discount rates in one pass, as apply_discount_factor_to_prices,
+    get_precios_modelo and get_price_tensor would give for each rate.
 
-    return df_precios
+    Args:
+        df_precios: undiscounted prices (constant prices already applied, if any)
+        disc_facts: discount rates as percentages
+
+    Returns:
+        int64 array of shape (len(disc_facts), periodos_modelo, meses_max_animales + 2, clases)
+    """
+    df_precios = df_precios.sort_values("PERIODO_INICIO").reset_index(drop=True)
+    df_precios_modelo = get_precios_modelo(df_precios, PARAMS)
 
+    multiplier = discount_multipliers(
+        df_precios_modelo["PERIODO_INICIO"],
+        np.asarray(disc_facts, dtype=float).reshape(-1),
+        PARAMS["fecha_inicio"],
+    )
+    columns = {
+        name: df_precios_modelo[name].to_numpy(dtype=float)[None, :] * multiplier
+        for name in SCRAPPED_COLS
+    }
 
-def truncated_normal(mean, std, lower_bound, upper_bound, size=1):
-    samples = []
-    while len(samples) < size:
-        x = np.random.normal(mean, std)
-        if lower_bound <= x <= upper_bound:
-            samples.append(x)
-    return np.array(samples)
+    return price_tensor_from_columns(columns, PARAMS, peso_prom_dict)
@@ -0,0 +1,339 @@
+import copy
+import logging
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from EDA.eda_utils import parse_scip_stats, write_scip_sol
+from preprocessing.generate_LP_inputs import build_LP_inputs, build_native_inputs
+from preprocessing.InputCache import InputCache
+from preprocessing.NativeModel import NativeModel
+from preprocessing.rolling_horizon import solve_rolling_horizon
+
+log = logging.getLogger("logger")
+
+SCIP_CMD = "sudo docker exec scipTeach2 scip -f {model} -l {log}"
+
+# same run through the interactive shell, reading a starting solution before optimizing
+SCIP_WARM_START_CMD = (
+    "sudo docker exec scipTeach2 scip -l {log} -c "
+    '"read {model} read {sol} optimize display solution display statistics quit"'
+)
+
+# heuristic model first, then the free model, same as the serial runners
+MODELS = [
+    ("_h", "model_strategy_2eng.zpl"),
+    ("", "model_strategy_1eng.zpl"),
+]
+
+# same order for the in-memory models: suffix -> NativeModel strategy
+NATIVE_STRATEGIES = [("_h", 2), ("", 1)]
+
+# binaries of the heuristic model that model_strategy_1eng.zpl doesn't declare
+HEURISTIC_VARS = ("k", "l")
+
+# experiment keys that are build_LP_inputs flags, everything else overrides PARAMS
+EXPERIMENT_FLAGS = ("fix_prices", "disc_fact")
+
+
+def wall_time(results):
+    # inputs + llamadas al solver, sin los tiempos que reporta scip en el log
+    return sum(v for k, v in results.items() if k.startswith(("inputs_time", "solve_time")))
+
+
+def experiment_params(PARAMS, items):
+    params = copy.deepcopy(PARAMS)
+    params.update({k: v for k, v in items.items() if k not in EXPERIMENT_FLAGS})
+
+    return params
+
+
+def params_record(PARAMS, exp_grid):
+    """
+    What lp_logs/params.json holds: the PARAMS every experiment starts from, as the notebooks
+    read it, and under "experiments" the params each experiment of exp_grid runs with.
+    Call it before the results are merged into exp_grid.
+    """
+    return {
+        **PARAMS,
+        "experiments": {
+            experiment: experiment_params(PARAMS, items) for experiment, items in exp_grid.items()
+        },
+    }
+
+
+def prepare_workspace(workspace, PATH_DAT_FILES, models=MODELS):
+    """
+    Create an isolated copy of the models with its own model_inputs/ directory.
+
+    SCIP's ZIMPL reader changes into the model's directory before parsing
+    (reading/zplreader/changedir, on by default), so the relative
+    "model_inputs/..." paths in the .zpl resolve inside the workspace.
+    """
+    dat_files = {k: os.path.join(workspace, v) for k, v in PATH_DAT_FILES.items()}
+    for path in dat_files.values():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    for _, model in models:
+        shutil.copyfile(model, os.path.join(workspace, os.path.basename(model)))
+
+    return dat_files
+
+
+def run_scip(
+    model, log_path, scip_cmd=SCIP_CMD, sol=None, warm_start_cmd=SCIP_WARM_START_CMD
+):
+    cmd = scip_cmd if sol is None else warm_start_cmd
+
+    start = time.perf_counter()
+    returncode = subprocess.run(
+        cmd.format(model=model, log=log_path, sol=sol), shell=True
+    ).returncode
+    if returncode != 0:
+        log.info(f"WARNING: scip exited with {returncode} for {model}")
+
+    return time.perf_counter() - start
+
+
+def run_experiment(
+    experiment,
+    items,
+    PARAMS,
+    PATH_DAT_FILES,
+    path_scrapped_prices_df,
+    PESOS_PROMEDIO,
+    path_parte_diario,
+    intervalos_madurez,
+    workspaces_dir="workspaces",
+    log_dir="lp_logs",
+    scip_cmd=SCIP_CMD,
+    cache_dir="model_inputs_cache",
+    solver="scip",
+    warm_start=True,
+    scip_warm_start_cmd=SCIP_WARM_START_CMD,
+    models=MODELS,
+    rolling_horizon=None,
+):
+    """
+    Generate the inputs and solve both strategies for one experiment in its own workspace.
+
+    With warm_start the solution of the heuristic model (always feasible for the free
+    model, which only drops constraints) is the starting incumbent of the free model.
+    SCIP's solving time and time to first solution are recorded for both.
+
+    With solver="native" the inputs stay in memory and both strategies are solved with
+    NativeModel (HiGHS), no .dat files nor docker involved. Logs are written in SCIP's format.
+    rolling_horizon=(window, step) solves them with solve_rolling_horizon instead: a plan
+    that violates the model (e.g. mantain_c3_stock dropped) is logged with its status and
+    no solution, max_violation and c3_dropped are recorded either way.
+
+    Returns:
+        tuple (experiment, results dict, input cache stats)
+    """
+    params = experiment_params(PARAMS, items)
+    assert rolling_horizon is None or solver == "native", "rolling horizon needs solver='native'"
+
+    if solver == "native":
+        return run_experiment_native(
+            experiment,
+            items,
+            params,
+            PESOS_PROMEDIO,
+            path_parte_diario,
+            intervalos_madurez,
+            log_dir,
+            rolling_horizon,
+        )
+
+    workspace = os.path.join(workspaces_dir, experiment)
+    dat_files = prepare_workspace(workspace, PATH_DAT_FILES, models)
+    input_cache = InputCache(cache_dir) if cache_dir else None
+
+    start = time.perf_counter()
+    lp_stock_history_cost, _ = build_LP_inputs(
+        params,
+        dat_files,
+        path_scrapped_prices_df,
+        PESOS_PROMEDIO,
+        path_parte_diario,
+        intervalos_madurez,
+        COST_TEST=False,
+        INITIAL_STOCK_TEST=False,
+        fix_prices=items["fix_prices"],
+        disc_fact=items.get("disc_fact", None),
+        input_cache=input_cache,
+        costs_plot_path=os.path.join(workspace, "interpolator_costs.png"),
+    )
+    results = {
+        "lp_stock_history_cost": lp_stock_history_cost,
+        "inputs_time": time.perf_counter() - start,
+    }
+
+    sol = None
+    for suffix, model in models:
+        log_path = os.path.join(log_dir, f"{experiment}{suffix}.log")
+        results[f"solve_time{suffix}"] = run_scip(
+            os.path.join(workspace, os.path.basename(model)),
+            log_path,
+            scip_cmd,
+            sol,
+            scip_warm_start_cmd,
+        )
+        results[f"warm_start{suffix}"] = sol is not None
+        if not os.path.exists(log_path):
+            continue
+
+        stats = parse_scip_stats(log_path)
+        results[f"solving_time{suffix}"] = stats["solving_time"]
+        results[f"first_solution_time{suffix}"] = stats["first_solution_time"]
+
+        if warm_start and suffix == "_h":
+            sol = write_scip_sol(
+                log_path, os.path.join(workspace, f"{experiment}_h.sol"), HEURISTIC_VARS
+            )
+
+    log.info(f"{experiment} done in {wall_time(results):.1f}s")
+
+    return experiment, results, input_cache.stats if input_cache else {}
+
+
+def run_experiment_native(
+    experiment,
+    items,
+    params,
+    PESOS_PROMEDIO,
+    path_parte_diario,
+    intervalos_madurez,
+    log_dir,
+    rolling_horizon=None,
+):
+    start = time.perf_counter()
+    inputs, lp_stock_history_cost = build_native_inputs(
+        params,
+        PESOS_PROMEDIO,
+        path_parte_diario,
+        intervalos_madurez,
+        fix_prices=items["fix_prices"],
+        disc_fact=items.get("disc_fact", None),
+    )
+    results = {
+        "lp_stock_history_cost": lp_stock_history_cost,
+        "inputs_time": time.perf_counter() - start,
+    }
+
+    for suffix, strategy in NATIVE_STRATEGIES:
+        if rolling_horizon is None:
+            model = NativeModel(PARAMS=params, strategy=strategy, **inputs)
+            result = model.solve()
+        else:
+            window, step = rolling_horizon
+            result = solve_rolling_horizon(
+                PARAMS=params, window=window, step=step, strategy=strategy, **inputs
+            )
+            model = result["model"]
+            results[f"max_violation{suffix}"] = result["max_violation"]
+            results[f"c3_dropped{suffix}"] = result["c3_dropped"]
+            if not result["success"]:
+                log.info(f"WARNING: {experiment}{suffix} rolling horizon: {result['status']}")
+        model.write_log(os.path.join(log_dir, f"{experiment}{suffix}.log"), result)
+        results[f"solve_time{suffix}"] = result["solving_time"]
+
+    log.info(f"{experiment} done in {wall_time(results):.1f}s")
+
+    return experiment, results, {}
+
+
+def merge_results(exp_grid, experiment, results, stats, cache_stats):
+    exp_grid[experiment].update(results)
+
+    for artifact, counts in stats.items():
+        total = cache_stats.setdefault(artifact, {"hits": 0, "misses": 0})
+        total["hits"] += counts["hits"]
+        total["misses"] += counts["misses"]
+
+
+def run_experiments_serial(
+    exp_grid,
+    PARAMS,
+    PATH_DAT_FILES,
+    path_scrapped_prices_df,
+    PESOS_PROMEDIO,
+    path_parte_diario,
+    intervalos_madurez,
+    **kwargs,
+):
+    """
+    Run every experiment of exp_grid one after the other with run_experiment, each with its
+    own PARAMS copy and workspace, same results as run_experiments_parallel.
+
+    Results are merged into exp_grid in place.
+
+    Returns:
+        input cache stats summed over all experiments
+    """
+    cache_stats = {}
+
+    for experiment, items in exp_grid.items():
+        merge_results(
+            exp_grid,
+            *run_experiment(
+                experiment,
+                items,
+                PARAMS,
+                PATH_DAT_FILES,
+                path_scrapped_prices_df,
+                PESOS_PROMEDIO,
+                path_parte_diario,
+                intervalos_madurez,
+                **kwargs,
+            ),
+            cache_stats,
+        )
+
+    return cache_stats
+
+
+def run_experiments_parallel(
+    exp_grid,
+    PARAMS,
+    PATH_DAT_FILES,
+    path_scrapped_prices_df,
+    PESOS_PROMEDIO,
+    path_parte_diario,
+    intervalos_madurez,
+    max_workers=None,
+    **kwargs,
+):
+    """
+    Run every experiment of exp_grid across a process pool, each with its own PARAMS copy.
+
+    Results are merged into exp_grid in place.
+
+    Returns:
+        input cache stats summed over all experiments
+    """
+    cache_stats = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                run_experiment,
+                experiment,
+                items,
+                PARAMS,
+                PATH_DAT_FILES,
+                path_scrapped_prices_df,
+                PESOS_PROMEDIO,
+                path_parte_diario,
+                intervalos_madurez,
+                **kwargs,
+            )
+            for experiment, items in exp_grid.items()
+        ]
+
+        for future in as_completed(futures):
+            merge_results(exp_grid, *future.result(), cache_stats)
+
+    return cache_stats
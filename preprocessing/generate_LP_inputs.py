@@ -1,4 +1,6 @@
 import logging
+import time
+
 import pandas as pd
 
 from preprocessing.data_prep import (
@@ -6,20 +8,74 @@ from preprocessing.data_prep import (
     write_params_file,
     costs_to_dat_test,
     get_interplolator,
-    get_precios_scrapped,
-    prices_to_usd_b,
     precios_scrapped_to_dat,
     get_stock_inicial_test,
     get_stock_inicial_from_parte_diario,
-    get_precios_del_periodo,
+    get_stock_inicial_row,
+    get_stock_inicial_matrix,
+    get_precios_modelo,
+    get_price_tensor,
+    get_cost_matrix,
+    get_august_periods,
     quote_stock,
     costs_to_dat_realistic,
     apply_contant_prices,
     apply_discount_factor_to_prices,
 )
 
+from preprocessing.DatWriter import sidecar_path
+from preprocessing.NativeModel import live_cells
+from preprocessing.PriceIndex import PriceIndex
+
 log = logging.getLogger("logger")
 
+path_precios_forecast = "data/df_precios_usd_w_forecast203301.csv"
+
+
+def get_forecast_prices(PARAMS, fix_prices=False, disc_fact=None):
+    df_precios = pd.read_csv(path_precios_forecast)
+    df_precios['PERIODO_INICIO'] = pd.to_datetime(df_precios['PERIODO_INICIO'])
+    if fix_prices:
+        df_precios = apply_contant_prices(df_precios)
+
+    # Apply discount factor if specified
+    if disc_fact is not None:
+        log.info(f"Applying discount factor of {disc_fact}% to prices")
+        df_precios = apply_discount_factor_to_prices(
+            df_precios,
+            disc_fact,
+            PARAMS["fecha_inicio"]
+        )
+
+    return df_precios
+
+
+def build_artifact(
+    input_cache, artifact, outputs, build, params, sources=(), flags=None, timings=None
+):
+    """
+    Generate the output files with build(), or materialize them from input_cache.
+    With timings, the seconds it took are stored under the artifact name.
+
+    Returns:
+        tuple (cached, result of build() or None on a cache hit)
+    """
+    start = time.perf_counter()
+    if input_cache is None:
+        cached, result = False, build()
+    else:
+        key = input_cache.key(artifact, params, sources=sources, flags=flags)
+        cached = input_cache.fetch(artifact, key, outputs)
+        result = None
+        if not cached:
+            result = build()
+            input_cache.store(artifact, key, outputs)
+
+    if timings is not None:
+        timings[artifact] = time.perf_counter() - start
+
+    return cached, result
+
 
 def build_LP_inputs(
     PARAMS,
@@ -32,91 +88,178 @@ def build_LP_inputs(
     INITIAL_STOCK_TEST=False,
     fix_prices=False,
     disc_fact=None,
+    input_cache=None,
+    costs_plot_path="interpolator_costs.png",
+    dat_sidecars=False,
+    timings=None,
 ):
+    """
+    Write every .dat file the .zpl models read.
+
+    Prices come from the USD forecast (get_forecast_prices), path_scrapped_prices_df is
+    not read: it stays in the signature for the runners.
+
+    With dat_sidecars the costs, prices and realistic initial stock tables are also saved
+    as .npy next to their .dat (see DatWriter), for backends that don't parse ZIMPL text.
+    timings (dict) gets the seconds spent on each .dat artifact, see build_artifact.
+    """
     log.info(f"cleaning .dat files from {PATH_DAT_FILES}")
     clear_model_inputs(PATH_DAT_FILES)
 
+    def outputs(artifact):
+        path = PATH_DAT_FILES[artifact]
+        return [path, sidecar_path(path)] if dat_sidecars else [path]
+
     ### COSTS ###
 
+    costs_params = {
+        k: PARAMS[k]
+        for k in (
+            "costos_meses_usd_c1_c2_pre_norm",
+            "c3_costs",
+            "c1_over_cost",
+            "periodos_modelo",
+            "meses_max_animales",
+            "clases",
+        )
+    }
+
     if COST_TEST:
         log.info("building costs.dat test mode ON")
-        costs_to_dat_test(
-            PATH_DAT_FILES,
-            PARAMS["periodos_modelo"],
-            PARAMS["meses_max_animales"],
-            PARAMS["clases"],
+        build_artifact(
+            input_cache,
+            "costos",
+            [PATH_DAT_FILES["costos"]],
+            lambda: costs_to_dat_test(
+                PATH_DAT_FILES,
+                PARAMS["periodos_modelo"],
+                PARAMS["meses_max_animales"],
+                PARAMS["clases"],
+            ),
+            costs_params,
+            flags={"COST_TEST": COST_TEST},
+            timings=timings,
         )
     else:
         log.info("building costs.dat realistic")
-        costs_interpolator = get_interplolator(PARAMS, output_plot_path='interpolator_costs.png')
-        costs_to_dat_realistic(costs_interpolator, PATH_DAT_FILES, PARAMS)
+        # also sets PARAMS["costos_meses_usd_c1_c2"], needed even when costs.dat is cached
+        costs_interpolator = get_interplolator(PARAMS, output_plot_path=costs_plot_path)
+        build_artifact(
+            input_cache,
+            "costos",
+            outputs("costos"),
+            lambda: costs_to_dat_realistic(
+                costs_interpolator, PATH_DAT_FILES, PARAMS, sidecar=dat_sidecars
+            ),
+            costs_params,
+            flags={"COST_TEST": COST_TEST},
+            timings=timings,
+        )
 
     ### PRICES ###
-    log.info("getting prices from historical scrapped data")
-    df_precios = get_precios_scrapped(
-        fecha_inicio=PARAMS["fecha_inicio"], input=path_scrapped_prices_df
-    )
+    # los precios del modelo salen del forecast en USD, no de los scrapeados
+    df_precios = get_forecast_prices(PARAMS, fix_prices, disc_fact)
 
-    log.info("prices to USD B")
-    df_precios = prices_to_usd_b(
-        df_prices_ars=df_precios,
-        usd_b_path="data/usd_b_fill.csv",
-        cols_to_normalize=[
-            "VAQUILLONAS270",
-            "VAQUILLONAS391",
-            "NOVILLITOS300",
-            "NOVILLITOS391",
-        ],
-    )
-
-    df_precios = pd.read_csv('data/df_precios_usd_w_forecast203301.csv')
-    df_precios['PERIODO_INICIO'] = pd.to_datetime(df_precios['PERIODO_INICIO'])
-    if fix_prices:
-        df_precios = apply_contant_prices(df_precios)
-
-    # Apply discount factor if specified
-    if disc_fact is not None:
-        log.info(f"Applying discount factor of {disc_fact}% to prices")
-        df_precios = apply_discount_factor_to_prices(
-            df_precios,
-            disc_fact,
-            PARAMS["fecha_inicio"]
-        )
+    prices_params = {
+        "PESOS_PROMEDIO": PESOS_PROMEDIO,
+        **{
+            k: PARAMS[k]
+            for k in (
+                "fecha_inicio",
+                "periodos_modelo",
+                "meses_max_animales",
+                "clases",
+                "multiplicador_destete",
+                "multiplicador_c3",
+                "venta_c3_from",
+                "SALES_PERIODS",
+            )
+        },
+    }
 
     log.info("writing prices.dat file")
-    precios_scrapped_to_dat(
-        df_precios,
-        PARAMS,
-        PATH_DAT_FILES,
-        PESOS_PROMEDIO,
+    build_artifact(
+        input_cache,
+        "precios",
+        outputs("precios"),
+        lambda: precios_scrapped_to_dat(
+            df_precios,
+            PARAMS,
+            PATH_DAT_FILES,
+            PESOS_PROMEDIO,
+            sidecar=dat_sidecars,
+        ),
+        prices_params,
+        sources=[path_precios_forecast],
+        flags={"fix_prices": fix_prices, "disc_fact": disc_fact},
+        timings=timings,
     )
 
     ### INITIAL STOCK ###
 
+    stock_params = {
+        "intervalos_madurez": intervalos_madurez,
+        **{
+            k: PARAMS[k]
+            for k in (
+                "fecha_inicio",
+                "meses_max_animales",
+                "clases",
+                "SCRAMBLE_NUMS",
+                "SCRAMBLE_MODIF",
+            )
+        },
+        "stock_seed": PARAMS.get("stock_seed"),
+    }
+
     if INITIAL_STOCK_TEST:
         log.info("building stock_inicial.dat test mode ON")
-        get_stock_inicial_test(PARAMS, PATH_DAT_FILES["stock_inicial"])
+        build_artifact(
+            input_cache,
+            "stock_inicial",
+            [PATH_DAT_FILES["stock_inicial"]],
+            lambda: get_stock_inicial_test(PARAMS, PATH_DAT_FILES["stock_inicial"]),
+            stock_params,
+            flags={"INITIAL_STOCK_TEST": INITIAL_STOCK_TEST},
+            timings=timings,
+        )
 
     else:
         log.info("building stock_inicial.dat realistic")
-        initial_stock_row = get_stock_inicial_from_parte_diario(
-            PARAMS,
-            PARAMS["fecha_inicio"],
-            PARAMS["clases"],
-            PARAMS["meses_max_animales"],
-            parte_diario_path=path_parte_diario,
-            output=PATH_DAT_FILES["stock_inicial"],
-            intervalos=intervalos_madurez,
+        # sin semilla el muestreo cambia en cada corrida, no se cachea
+        stock_cached, initial_stock_row = build_artifact(
+            input_cache if PARAMS.get("stock_seed") is not None else None,
+            "stock_inicial",
+            outputs("stock_inicial"),
+            lambda: get_stock_inicial_from_parte_diario(
+                PARAMS,
+                PARAMS["fecha_inicio"],
+                PARAMS["clases"],
+                PARAMS["meses_max_animales"],
+                parte_diario_path=path_parte_diario,
+                output=PATH_DAT_FILES["stock_inicial"],
+                intervalos=intervalos_madurez,
+                sidecar=dat_sidecars,
+            ),
+            stock_params,
+            sources=[path_parte_diario],
+            flags={"INITIAL_STOCK_TEST": INITIAL_STOCK_TEST},
+            timings=timings,
         )
+        if stock_cached:
+            # the sampled stock comes from the cache, only the parte diario row is needed
+            initial_stock_row, _ = get_stock_inicial_row(
+                path_parte_diario, PARAMS["fecha_inicio"]
+            )
     log.info(
         """get costs from stock before the model starts, 
         so we can substract to LP revenue so its comparable to 
         business which sells and pays cost for all its stock"""
     )
     # get initial stock cost only (no income)
-    prices_initial_period = get_precios_del_periodo(
-        pd.to_datetime(PARAMS["fecha_inicio"], format="%d/%m/%Y"), df_precios
-    ).to_dict()
+    prices_initial_period = PriceIndex(df_precios).row(
+        pd.to_datetime(PARAMS["fecha_inicio"], format="%d/%m/%Y")
+    )
     initial_stock_cost = quote_stock(
         prices_initial_period, initial_stock_row, PESOS_PROMEDIO, costs_interpolator, PARAMS
     )["cost"].sum()
@@ -125,10 +268,90 @@ def build_LP_inputs(
 
     if not PARAMS.get('virtual_ventas_max_por_mes'):
         PARAMS['virtual_ventas_max_por_mes']  = int(initial_stock_row['TOTAL'].values[0].replace(',','')) * PARAMS['virtual_venta_max_mult']
-    
-    
-    write_params_file(PATH_DAT_FILES, PARAMS)
+
+    build_artifact(
+        input_cache,
+        "parameters",
+        [
+            PATH_DAT_FILES["parameters"],
+            PATH_DAT_FILES["agosto_si"],
+            PATH_DAT_FILES["agosto_no"],
+        ],
+        lambda: write_params_file(PATH_DAT_FILES, PARAMS),
+        {
+            k: PARAMS[k]
+            for k in (
+                "fecha_inicio",
+                "periodos_modelo",
+                "meses_max_animales",
+                "virtual_ventas_max_por_mes",
+                "ventas_min_por_mes",
+                "sell_c1_c2_before",
+                "mantain_c3_stock",
+                "fix_cost_sales",
+                "pregnancy_index",
+            )
+        },
+        timings=timings,
+    )
 
     log.info(f"MODEL initial stock cost: {initial_stock_cost}")
 
     return initial_stock_cost, df_precios
+
+
+def build_native_inputs(
+    PARAMS,
+    PESOS_PROMEDIO,
+    path_parte_diario,
+    intervalos_madurez,
+    fix_prices=False,
+    disc_fact=None,
+    costs_plot_path=False,
+):
+    """
+    Same realistic inputs as build_LP_inputs, kept as arrays for NativeModel instead of .dat files.
+
+    Returns:
+        tuple (dict with prices, costs, initial_stock, august_periods and the live cells,
+        initial stock cost)
+    """
+    costs_interpolator = get_interplolator(PARAMS, output_plot_path=costs_plot_path)
+    costs = get_cost_matrix(costs_interpolator, PARAMS)
+
+    df_precios = get_forecast_prices(PARAMS, fix_prices, disc_fact)
+    prices = get_price_tensor(get_precios_modelo(df_precios, PARAMS), PARAMS, PESOS_PROMEDIO)
+
+    initial_stock_row, categorias = get_stock_inicial_row(
+        path_parte_diario, PARAMS["fecha_inicio"]
+    )
+    initial_stock = get_stock_inicial_matrix(
+        initial_stock_row,
+        categorias,
+        PARAMS,
+        PARAMS["clases"],
+        PARAMS["meses_max_animales"],
+        intervalos_madurez,
+    )
+
+    prices_initial_period = PriceIndex(df_precios).row(
+        pd.to_datetime(PARAMS["fecha_inicio"], format="%d/%m/%Y")
+    )
+    initial_stock_cost = quote_stock(
+        prices_initial_period, initial_stock_row, PESOS_PROMEDIO, costs_interpolator, PARAMS
+    )["cost"].sum()
+
+    if not PARAMS.get('virtual_ventas_max_por_mes'):
+        PARAMS['virtual_ventas_max_por_mes']  = int(initial_stock_row['TOTAL'].values[0].replace(',','')) * PARAMS['virtual_venta_max_mult']
+
+    august_periods, _ = get_august_periods(PARAMS)
+
+    log.info(f"MODEL initial stock cost: {initial_stock_cost}")
+
+    return {
+        "prices": prices,
+        "costs": costs,
+        "initial_stock": initial_stock,
+        "august_periods": august_periods,
+        "live": live_cells(initial_stock, prices, august_periods, PARAMS),
+    }, initial_stock_cost
@@ -9,6 +9,7 @@ from preprocessing.data_prep import (
     business_exercise_value,
     get_interplolator,
 )
+from preprocessing.PriceIndex import PriceIndex
 
 def business_variant(PARAMS, PESOS_PROMEDIO, path_parte_diario, path_scrapped_prices_df):
 
@@ -29,6 +30,8 @@ def business_variant(PARAMS, PESOS_PROMEDIO, path_parte_diario, path_scrapped_pr
             "NOVILLITOS391",
         ],
     )
+    # un solo indice de precios para las ventas y el stock final
+    price_index = PriceIndex(df_precios)
 
     ### PROCESS BUSINESS SALES TO BUILD UP EXPERIMENT ###
     log.info(f"get business sales qty per category during the exercise")
@@ -41,13 +44,13 @@ def business_variant(PARAMS, PESOS_PROMEDIO, path_parte_diario, path_scrapped_pr
     costs_interpolator = get_interplolator(PARAMS, output_plot_path=None)
     
     log.info(f"add cost and income to business sales")
-    df_ventas = append_daily_income_and_cost(df_ventas, df_precios, PARAMS, PESOS_PROMEDIO, costs_interpolator)
+    df_ventas = append_daily_income_and_cost(df_ventas, price_index, PARAMS, PESOS_PROMEDIO, costs_interpolator)
 
     
 
     log.info(f"combine sales and final stock value to get final business value")
     business_grand_total_dict, df_final_stock_value = business_exercise_value(
-        df_ventas, df_precios, PARAMS, path_parte_diario, PESOS_PROMEDIO, costs_interpolator
+        df_ventas, price_index, PARAMS, path_parte_diario, PESOS_PROMEDIO, costs_interpolator
     )
 
     c3_qty_at_end = df_final_stock_value.loc[df_final_stock_value.cat.isin(['VACAS', 'VAQ. 1-2 Servicio', 'VAQ. 2-3'])]['qty'].sum()
@@ -0,0 +1,42 @@
+import numpy as np
+import seaborn as sns
+from matplotlib import pyplot as plt
+
+
+def plot_precios(df_precios):
+    # plot precios v1 scrapping
+    df_melt = df_precios.drop(columns=["YYYYMM"])
+    df_melt = df_melt.melt(
+        value_vars=[x for x in df_melt.columns if x != ["PERIODO_INICIO"]],
+        id_vars="PERIODO_INICIO",
+        var_name="categoria",
+        value_name="precio_x_kg",
+    )
+    df_melt.sort_values(by="PERIODO_INICIO", inplace=True)
+    df_melt["precio_x_kg"] = df_melt["precio_x_kg"].astype(int)
+    g = sns.lineplot(
+        data=df_melt, x="PERIODO_INICIO", y="precio_x_kg", hue="categoria"
+    ).set_title("Precios scrapped")
+
+
+def plot_cost_curves(curve, output_plot_path):
+    """
+    Accumulated and monthly cost curves of get_interplolator, saved to output_plot_path.
+    """
+    meses = np.linspace(curve.accumulated.x[0], curve.accumulated.x[-1], 200)
+
+    fig, ax1 = plt.subplots()
+    ax1.plot(meses, curve.accumulated(meses), label="accumulated cost curve")
+    ax1.scatter(curve.accumulated.x, curve.accumulated.y, c="C1")
+    ax1.set_xlabel("months")
+    ax1.set_ylabel("accumulated cost")
+
+    # Plot the monthly cost on the secondary y-axis
+    ax2 = ax1.twinx()
+    ax2.plot(meses, curve.monthly(meses), label="monthly cost curve", c="C6")
+    ax2.set_ylabel("monthly cost")
+
+    # Show the legend
+    fig.legend()
+
+    fig.savefig(output_plot_path, dpi=300, bbox_inches="tight")
@@ -0,0 +1,314 @@
+import logging
+
+import numpy as np
+
+from preprocessing.NativeModel import (
+    HEURISTIC_SALES,
+    ZERO_TOL,
+    NativeModel,
+    live_cells,
+    stock_upper_bounds,
+)
+
+log = logging.getLogger("logger")
+
+# violacion maxima del plan unido en el modelo completo para darlo por factible
+FEASIBILITY_TOL = 1e-6
+
+
+def window_august_periods(august_periods, start, periods):
+    # los nacimientos del periodo inicial ya estan en el stock de la ventana
+    return [t - start for t in august_periods if 0 < t - start <= periods]
+
+
+def terminal_values(prices, costs, PARAMS, august_periods):
+    """
+    Value of a head left in stock at (t, e, c), once the cost and births of period t are
+    accounted for: the best of selling it at a later period of its cohort or keeping it
+    to the end of the horizon, net of the holding costs until then, plus the value of the
+    calves it gives birth to in the August periods it goes through as a class 3 head of 24
+    months or more. Class 2 heads of 11 months may also go on as class 3.
+
+    It is the value of one more head in the model without the sales rows, the fixed sale
+    cost and the class 3 maintain rule.
+
+    Args:
+        prices: (periodos, edades, clases) array, as returned by get_price_tensor
+        costs: (edades, clases) array as returned by get_cost_matrix, or (periodos, edades, clases)
+        PARAMS: model parameters
+        august_periods: birth periods as returned by get_august_periods
+
+    Returns:
+        (periodos + 1, edades, clases) array, ages start at -1
+    """
+    P = PARAMS["periodos_modelo"]
+    prices = np.asarray(prices, dtype=float)
+    costs = np.broadcast_to(np.asarray(costs, dtype=float), prices.shape)
+    august = set(august_periods)
+
+    # costs[t] y prices[t] son los del periodo t + 1, la edad e esta en e + 1
+    V = np.zeros((P + 1,) + prices.shape[1:])
+    for t in range(P - 1, -1, -1):
+        keep = np.zeros(prices.shape[1:])
+        keep[:-1] = V[t + 1, 1:] - costs[t, 1:]
+        if t + 1 in august:
+            # un ternero c1 y uno c2 por cada pregnancy_index / 2 vacas, entran a la edad 0
+            calf = (V[t + 1, 1, :2] - costs[t, 1, :2]).sum()
+            keep[24:-1, 2] += PARAMS["pregnancy_index"] / 2 * calf
+        # traspaso a los 11 meses: sigue como clase 3 de 12
+        keep[12, 1] = max(keep[12, 1], V[t + 1, 13, 2] - costs[t, 13, 2])
+        # y[0] no tiene precio y no se vende en el ultimo periodo
+        sell = np.where(prices[t - 1] > 0, prices[t - 1], -np.inf) if t > 0 else -np.inf
+        V[t] = np.maximum(keep, sell)
+
+    return V
+
+
+def c3_reach(PARAMS, august_periods, strategy=1):
+    """
+    Class 3 stock at the end of the horizon one head at (t, e, c) can still become, with no
+    more sales and every class 2 head transferred at 11 months (40% of the class 2 calves
+    in strategy 2, as heuristic_transfers fixes), calves of the August periods included.
+    It is linear in the stock, so the reach of a window's last period is one row.
+
+    Returns:
+        (periodos + 1, edades, clases) array, ages start at -1
+    """
+    P, nE = PARAMS["periodos_modelo"], PARAMS["meses_max_animales"] + 2
+    august = set(august_periods)
+    transfer_share = 0.4 if strategy == 2 else 1.0
+
+    G = np.zeros((P + 1, nE, 3))
+    G[P, :, 2] = 1
+    for t in range(P - 1, -1, -1):
+        G[t, :-1] = G[t + 1, 1:]
+        G[t, 12, 1] = G[t + 1, 13, 2]
+        if t + 1 in august:
+            calves = G[t + 1, 1, 0] + transfer_share * G[t + 1, 1, 1]
+            G[t, 24:-1, 2] += PARAMS["pregnancy_index"] / 2 * calves
+
+    return G
+
+
+def open_stages(prices, t, end):
+    """
+    For each heuristic sales stage of the class 2 calves born in period t, whether they can
+    still be sold from period end on: some age of the stage has a price in a later window
+    (a window doesn't sell in its last period, nor the whole horizon in period P).
+    """
+    P = len(prices)
+    return tuple(
+        any(prices[t + v - 1, v + 1, 1] > 0 for v in edades if end <= t + v < P)
+        for _, edades in HEURISTIC_SALES
+    )
+
+
+def carried_births(plan, prices, august_periods, start, end):
+    """
+    Class 2 births of the periods before start, as NativeModel's carried_births for a window
+    over start..end, with the heads of each sales stage the plan already sold.
+    """
+    carried = []
+    for t in august_periods:
+        births = plan["n"][t, 1] if 0 < t <= start else 0
+        if births <= ZERO_TOL:
+            continue
+        sold = tuple(
+            sum(plan["y"][t + v, v + 1, 1] for v in edades if t + v <= start)
+            for _, edades in HEURISTIC_SALES
+        )
+        carried.append((t - start, births, sold, open_stages(prices, t, end)))
+
+    return carried
+
+
+def solve_rolling_horizon(
+    prices,
+    costs,
+    initial_stock,
+    PARAMS,
+    august_periods,
+    window,
+    step,
+    strategy=1,
+    live=None,
+    time_limit=None,
+):
+    """
+    Receding horizon solve: optimize `window` periods, keep the first `step` periods and
+    start the next window from the stock reached, until periodos_modelo is covered.
+
+    Consecutive windows overlap in one period: the stock of the first period of a window and
+    its sales and transfers come from the previous window. In strategy 2 the heuristic
+    sales and transfers of a birth are split among the windows its ages go through: an
+    intermediate window sells at most 30% of the calves in each stage, the next windows
+    get the rest as carried_births. The stock an intermediate window
+    leaves is valued with terminal_values, over the prices and costs of the whole horizon,
+    instead of at 0, so windows don't sell it off before they end.
+
+    With mantain_c3_stock every window has to end with a stock that can still reach the
+    class 3 stock of the original initial stock by the end of the horizon (c3_reach), or as
+    much as it can from its initial state. A window that still can't is solved without the
+    rule and the result is flagged c3_dropped. The joined
+    plan is checked against every row of the monolithic model: it is only a success, with
+    an objective, if every window was solved and the plan violates no constraint by more
+    than FEASIBILITY_TOL.
+
+    Args:
+        prices, costs, initial_stock, PARAMS, august_periods: same inputs as NativeModel
+        window: periods optimized in each window
+        step: periods kept from each window, the last window keeps all of its periods
+        strategy: NativeModel strategy
+        live: if given (e.g. the live sets of build_native_inputs), every window is solved
+            over its own live cells
+        time_limit: seconds per window
+
+    Returns:
+        dict with success, status, objective (None unless success), x over the monolithic
+        model layout, solving_time, windows (start, periods, objective, solving_time, status
+        and mantain_c3_stock of each window), c3_dropped, the monolithic `model` used to
+        evaluate the plan and its max_violation. gap is infinite and dual_bound unknown, as
+        SCIP reports a plan without a bound, so model.write_log applies
+    """
+    assert 0 < step <= window, (step, window)
+    P = PARAMS["periodos_modelo"]
+    full_costs = np.broadcast_to(np.asarray(costs, dtype=float), np.shape(prices))
+    stock_value = terminal_values(prices, full_costs, PARAMS, august_periods)
+    reach = c3_reach(PARAMS, august_periods, strategy)
+
+    model = NativeModel(prices, costs, initial_stock, PARAMS, august_periods, strategy)
+    plan = {name: np.zeros(shape) for name, (_, shape) in model.blocks.items()}
+    plan["x"][0] = initial_stock
+
+    # edades desplazadas en 1: las menores de 30 meses son los primeros 31 indices
+    stock_c3 = np.asarray(initial_stock, dtype=float)[:, 2]
+    c3_target = (stock_c3.sum(), stock_c3[: 30 + 1].sum())
+
+    windows = []
+    start, state, sales, transfers = 0, np.asarray(initial_stock, dtype=float), None, None
+    while start < P:
+        periods = min(window, P - start)
+        last = start + periods == P
+        keep = periods if last else step
+
+        params = dict(PARAMS, periodos_modelo=periods)
+        august = window_august_periods(august_periods, start, periods)
+        window_prices = prices[start : start + periods]
+        # el stock c3 inicial, o el maximo alcanzable al final del horizonte (sin ventas,
+        # todas las transferencias) si las vacas que salen por edad no lo permiten
+        ub_x, _, _ = stock_upper_bounds(
+            state if sales is None else state - sales,
+            window_august_periods(august_periods, start, P - start),
+            dict(PARAMS, periodos_modelo=P - start),
+            transfers,
+        )
+        window_c3_target = tuple(min(v, ub_x[-1, :, 2].sum()) for v in c3_target)
+
+        window_live = None
+        if live is not None:
+            window_live = live_cells(state, window_prices, august, params, transfers)
+
+        # con las heuristicas de la estrategia 2 el maximo alcanzable es menor: si la
+        # ventana no llega, se resuelve sin mantener el stock c3
+        for mantain_c3_stock in dict.fromkeys([PARAMS["mantain_c3_stock"], 0]):
+            window_model = NativeModel(
+                window_prices,
+                full_costs[start : start + periods],
+                state,
+                dict(params, mantain_c3_stock=mantain_c3_stock),
+                august,
+                strategy,
+                live=window_live,
+                initial_sales=sales,
+                initial_transfers=transfers,
+                c3_target=window_c3_target,
+                c3_reach=None if last else reach[start + periods],
+                terminal_value=None if last else stock_value[start + periods],
+                open_heuristics=[
+                    (name, t)
+                    for t in august
+                    for (name, _), is_open in zip(
+                        HEURISTIC_SALES, open_stages(prices, start + t, start + periods)
+                    )
+                    if is_open
+                ],
+                carried_births=carried_births(
+                    plan, prices, august_periods, start, start + periods
+                ),
+            )
+            result = window_model.solve(time_limit=time_limit)
+            if result["success"]:
+                break
+
+        windows.append(
+            {
+                "start": start,
+                "periods": periods,
+                "objective": result["objective"],
+                "solving_time": result["solving_time"],
+                "status": result["status"],
+                "mantain_c3_stock": mantain_c3_stock,
+            }
+        )
+        log.info(f"window {start}-{start + periods}: {result['status']}")
+        if not result["success"]:
+            break
+
+        # periodos 1..keep de la ventana son los periodos start+1..start+keep, el periodo 0
+        # es de la ventana anterior salvo en la primera (y[0] queda libre como en el .zpl)
+        first = 0 if start == 0 else 1
+        for name in plan:
+            values = window_model.values(result["x"], name)
+            if name in ("s", "k", "l"):
+                plan[name][start : start + keep] = values[:keep]
+            else:
+                plan[name][start + first : start + keep + 1] = values[first : keep + 1]
+
+        # sin el ruido numerico del solver, que dejaria cotas fijas inconsistentes
+        state, sales, transfers = (
+            np.where(plan[name][start + keep] > ZERO_TOL, plan[name][start + keep], 0)
+            for name in ("x", "y", "w")
+        )
+        start += keep
+
+    # k y l del modelo completo: cada nacimiento c2 cumple sus heuristicas entre las ventanas
+    if strategy == 2:
+        t = np.array([t for t in august_periods if t > 0], dtype=int)
+        born = plan["n"][t, 1] > ZERO_TOL
+        plan["k"][t - 1] = born
+        plan["l"][t - 1] = born & (t + 11 <= P)
+
+    x = np.concatenate([plan[name].ravel() for name in model.blocks])
+
+    # violacion maxima del plan en el modelo completo
+    activity = model.A @ x
+    max_violation = max(
+        np.max(model.row_lo - activity, initial=0),
+        np.max(activity - model.row_hi, initial=0),
+        np.max(model.lb - x, initial=0),
+        np.max(x - model.ub, initial=0),
+    )
+
+    c3_dropped = any(w["mantain_c3_stock"] != PARAMS["mantain_c3_stock"] for w in windows)
+    if start < P:
+        status = f"window {windows[-1]['start']}: {windows[-1]['status']}"
+    elif max_violation > FEASIBILITY_TOL:
+        status = f"infeasible plan, max violation {max_violation:.2e}"
+    else:
+        status = f"rolling horizon plan, window {window} step {step}"
+    success = start >= P and max_violation <= FEASIBILITY_TOL
+
+    return {
+        "success": success,
+        "status": status + (" (mantain_c3_stock dropped)" if c3_dropped else ""),
+        "objective": model.obj @ x if success else None,
+        "x": x,
+        "solving_time": sum(w["solving_time"] for w in windows),
+        "nodes": None,
+        "gap": np.inf,
+        "dual_bound": np.inf,
+        "windows": windows,
+        "c3_dropped": c3_dropped,
+        "model": model,
+        "max_violation": max_violation,
+    }
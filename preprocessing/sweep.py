@@ -0,0 +1,530 @@
+import copy
+import itertools
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from EDA.eda_utils import parse_scip_log, parse_scip_stats, write_scip_sol
+from preprocessing.data_prep import (
+    get_discounted_price_tensors,
+    write_params_file,
+    write_price_tensor,
+)
+from preprocessing.experiment_runner import (
+    HEURISTIC_VARS,
+    MODELS,
+    NATIVE_STRATEGIES,
+    SCIP_CMD,
+    SCIP_WARM_START_CMD,
+    experiment_params,
+    prepare_workspace,
+    run_scip,
+)
+from preprocessing.generate_LP_inputs import (
+    build_LP_inputs,
+    build_native_inputs,
+    get_forecast_prices,
+)
+from preprocessing.InputCache import InputCache
+from preprocessing.NativeModel import NativeModel, live_cells
+
+log = logging.getLogger("logger")
+
+# disc_fact solo cambia el tensor de precios (prices.dat)
+PRICE_PARAMS = ("disc_fact",)
+
+# campos de parameters.dat que no cambian el tamaño del modelo ni los otros .dat
+MODEL_PARAMS = (
+    "pregnancy_index",
+    "fix_cost_sales",
+    "ventas_min_por_mes",
+    "virtual_ventas_max_por_mes",
+    "sell_c1_c2_before",
+    "mantain_c3_stock",
+)
+
+# solo cambian el objetivo: los puntos de una cadena sobre estos comparten el modelo nativo
+OBJECTIVE_PARAMS = ("disc_fact", "fix_cost_sales")
+
+MODEL_NAMES = {"_h": "heuristic", "": "free"}
+
+# tolerancia relativa para dar por alcanzada la cota de la relajacion
+SCREEN_TOL = 1e-7
+
+
+def sweep_chains(grid):
+    """
+    Split the grid points into chains along its last parameter.
+
+    Neighbouring points of a chain are solved in order, each one warm started from the
+    previous one, and chains are independent of each other.
+
+    Returns:
+        list of chains, each a list of point dicts
+    """
+    names = list(grid)
+    *outer, inner = names
+    return [
+        [dict(zip(names, fixed + (value,))) for value in grid[inner]]
+        for fixed in itertools.product(*(grid[name] for name in outer))
+    ]
+
+
+def point_name(experiment, point):
+    return "_".join([experiment] + [f"{k}_{v}" for k, v in point.items()])
+
+
+def run_sweep(
+    experiment,
+    items,
+    grid,
+    PARAMS,
+    PATH_DAT_FILES,
+    path_scrapped_prices_df,
+    PESOS_PROMEDIO,
+    path_parte_diario,
+    intervalos_madurez,
+    workspaces_dir="workspaces",
+    log_dir="lp_logs",
+    solver="scip",
+    max_workers=None,
+    warm_start=True,
+    scip_cmd=SCIP_CMD,
+    scip_warm_start_cmd=SCIP_WARM_START_CMD,
+    cache_dir="model_inputs_cache",
+    screen=False,
+):
+    """
+    Sensitivity sweep of one experiment over a grid of discount rates and model parameters.
+
+    The inputs of the experiment are built once (the same sampled initial stock for every
+    point) and each point only rewrites what its parameters change: the price tensor for
+    disc_fact, parameters.dat for the MODEL_PARAMS. Chains of points (see sweep_chains)
+    run in a process pool, each point with its own PARAMS copy and, with warm_start, the
+    SCIP solution of the previous point of its chain as starting incumbent. The first
+    point of a chain starts the free model from its heuristic solution, as run_experiment.
+
+    With solver="native" the points are solved in memory with NativeModel. A chain that only
+    moves OBJECTIVE_PARAMS builds its two models once, over the live cells of all its price
+    tensors, and each point swaps the prices and fixed sale cost (NativeModel.set_prices)
+    before solving. scipy's milp takes no starting basis or solution, so the points are
+    still solved from scratch. With screen each point is first screened with the LP
+    relaxation (see screened_solve), warm started with warm_start from the binary pattern
+    of the previous point of its chain (the free model of the first point from the one of
+    its heuristic solution).
+
+    Args:
+        experiment, items: base experiment, as in the exp_grid of the runners
+        grid: dict parameter -> list of values, from PRICE_PARAMS and MODEL_PARAMS
+
+    Returns:
+        DataFrame with one row per point and model: the grid parameters, model (heuristic
+        or free), objective, solving_time, first_solution_time, warm_start and experiment,
+        plus branched and fixed_binaries for the native solver with screen.
+        Also written to <log_dir>/<experiment>_sweep.csv
+    """
+    unknown = set(grid) - set(PRICE_PARAMS) - set(MODEL_PARAMS)
+    if unknown:
+        raise ValueError(f"cannot sweep {sorted(unknown)}, only {PRICE_PARAMS + MODEL_PARAMS}")
+
+    params = experiment_params(PARAMS, items)
+    os.makedirs(log_dir, exist_ok=True)
+
+    if solver == "native":
+        shared, _ = build_native_inputs(
+            params,
+            PESOS_PROMEDIO,
+            path_parte_diario,
+            intervalos_madurez,
+            fix_prices=items["fix_prices"],
+            disc_fact=items.get("disc_fact", None),
+        )
+    else:
+        # inputs completos una sola vez, los puntos copian estos .dat
+        base_workspace = os.path.join(workspaces_dir, experiment, "base")
+        shared = prepare_workspace(base_workspace, PATH_DAT_FILES)
+        build_LP_inputs(
+            params,
+            shared,
+            path_scrapped_prices_df,
+            PESOS_PROMEDIO,
+            path_parte_diario,
+            intervalos_madurez,
+            fix_prices=items["fix_prices"],
+            disc_fact=items.get("disc_fact", None),
+            input_cache=InputCache(cache_dir) if cache_dir else None,
+            costs_plot_path=os.path.join(base_workspace, "interpolator_costs.png"),
+        )
+
+    # todos los tensores de precios de una pasada
+    price_tensors = {}
+    if "disc_fact" in grid:
+        df_precios = get_forecast_prices(params, items["fix_prices"])
+        tensors = get_discounted_price_tensors(
+            df_precios, grid["disc_fact"], params, PESOS_PROMEDIO
+        )
+        price_tensors = dict(zip(grid["disc_fact"], tensors))
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                run_sweep_chain,
+                experiment,
+                chain,
+                params,
+                PATH_DAT_FILES,
+                shared,
+                price_tensors,
+                workspaces_dir,
+                log_dir,
+                solver,
+                warm_start,
+                scip_cmd,
+                scip_warm_start_cmd,
+                screen,
+            )
+            for chain in sweep_chains(grid)
+        ]
+        for future in as_completed(futures):
+            rows += future.result()
+
+    table = pd.DataFrame(rows).sort_values(list(grid) + ["model"], ignore_index=True)
+    table.to_csv(os.path.join(log_dir, f"{experiment}_sweep.csv"), index=False)
+
+    return table
+
+
+def point_params(params, point):
+    params = copy.deepcopy(params)
+    params.update({k: v for k, v in point.items() if k in MODEL_PARAMS})
+
+    return params
+
+
+def run_sweep_chain(
+    experiment,
+    chain,
+    params,
+    PATH_DAT_FILES,
+    shared,
+    price_tensors,
+    workspaces_dir,
+    log_dir,
+    solver,
+    warm_start,
+    scip_cmd,
+    scip_warm_start_cmd,
+    screen=False,
+):
+    rows, previous = [], {}
+    if solver == "native":
+        models = chain_models(chain, params, shared, price_tensors)
+        for point in chain:
+            point_rows, patterns = run_native_point(
+                experiment,
+                point,
+                params,
+                shared,
+                price_tensors,
+                log_dir,
+                previous if warm_start else None,
+                models,
+                screen,
+            )
+            rows += point_rows
+            previous.update({k: v for k, v in patterns.items() if v is not None})
+
+        return rows
+
+    for point in chain:
+        point_rows, solutions = run_scip_point(
+            experiment,
+            point,
+            params,
+            PATH_DAT_FILES,
+            shared,
+            price_tensors,
+            workspaces_dir,
+            log_dir,
+            previous if warm_start else None,
+            scip_cmd,
+            scip_warm_start_cmd,
+        )
+        rows += point_rows
+        # un punto sin solucion no corta la cadena, el siguiente arranca del ultimo que tuvo
+        previous.update({k: v for k, v in solutions.items() if v is not None})
+
+    return rows
+
+
+def run_scip_point(
+    experiment,
+    point,
+    params,
+    PATH_DAT_FILES,
+    shared,
+    price_tensors,
+    workspaces_dir,
+    log_dir,
+    previous,
+    scip_cmd,
+    scip_warm_start_cmd,
+):
+    name = point_name(experiment, point)
+    params = point_params(params, point)
+
+    workspace = os.path.join(workspaces_dir, experiment, name)
+    dat_files = prepare_workspace(workspace, PATH_DAT_FILES)
+    for artifact, path in shared.items():
+        shutil.copyfile(path, dat_files[artifact])
+
+    # solo los .dat que cambian en este punto
+    if any(k in MODEL_PARAMS for k in point):
+        write_params_file(dat_files, params)
+    if "disc_fact" in point:
+        write_price_tensor(price_tensors[point["disc_fact"]], params, dat_files)
+
+    rows, solutions, heuristic_sol = [], {}, None
+    for suffix, model in MODELS:
+        log_path = os.path.join(log_dir, f"{name}{suffix}.log")
+
+        # la solucion del punto vecino con el mismo modelo, o la heuristica de este punto
+        sol = None
+        if previous is not None:
+            sol = previous.get(suffix, heuristic_sol if suffix == "" else None)
+
+        run_scip(
+            os.path.join(workspace, os.path.basename(model)),
+            log_path,
+            scip_cmd,
+            sol,
+            scip_warm_start_cmd,
+        )
+
+        row = {
+            **point,
+            "model": MODEL_NAMES[suffix],
+            "objective": None,
+            "solving_time": None,
+            "first_solution_time": None,
+            "warm_start": sol is not None,
+            "experiment": name,
+        }
+        solutions[suffix] = None
+        if os.path.exists(log_path):
+            stats = parse_scip_stats(log_path)
+            row["objective"] = parse_scip_log(log_path)[0]
+            row["solving_time"] = stats["solving_time"]
+            row["first_solution_time"] = stats["first_solution_time"]
+
+            solutions[suffix] = write_scip_sol(
+                log_path, os.path.join(workspace, f"{name}{suffix}_full.sol")
+            )
+            if suffix == "_h":
+                # sin k, l para el modelo libre, que no las declara
+                heuristic_sol = write_scip_sol(
+                    log_path, os.path.join(workspace, f"{name}_h.sol"), HEURISTIC_VARS
+                )
+        rows.append(row)
+
+    log.info(f"{name} done")
+
+    return rows, solutions
+
+
+def chain_models(chain, params, shared, price_tensors):
+    """
+    One NativeModel per strategy for a chain whose points only differ in OBJECTIVE_PARAMS,
+    over the live cells of every price tensor of the chain. None if its points change the
+    constraints, then each point builds its own.
+
+    Returns:
+        dict suffix -> NativeModel, or None
+    """
+    moving = {k for k in chain[0] if len({point[k] for point in chain}) > 1}
+    if not moving <= set(OBJECTIVE_PARAMS):
+        return None
+
+    params = point_params(params, chain[0])
+    prices = np.max(
+        [price_tensors.get(point.get("disc_fact"), shared["prices"]) for point in chain], axis=0
+    )
+    live = live_cells(shared["initial_stock"], prices, shared["august_periods"], params)
+
+    return {
+        suffix: NativeModel(
+            prices=prices,
+            costs=shared["costs"],
+            initial_stock=shared["initial_stock"],
+            august_periods=shared["august_periods"],
+            live=live,
+            PARAMS=params,
+            strategy=strategy,
+        )
+        for suffix, strategy in NATIVE_STRATEGIES
+    }
+
+
+def binary_pattern(model, x):
+    """
+    Values of the binaries (s, and k, l in strategy 2) of a solution, by block name.
+    """
+    return {
+        name: np.round(model.values(x, name))
+        for name in ("s", "k", "l")
+        if name in model.blocks
+    }
+
+
+def screened_solve(model, pattern=None):
+    """
+    Solve a NativeModel trying to answer it from its LP relaxation before branching.
+
+    - a relaxation with every binary at 0 or 1 is the MIP optimum
+    - the LP with the binaries fixed to pattern (the previous point of the chain) is a plan
+      of this point: when it reaches the relaxation bound no other pattern does better
+    - otherwise each binary the relaxation leaves at a bound is fixed there when its
+      reduced cost takes every plan that flips it below that plan (reduced cost fixing),
+      and the MIP branches only on the rest
+
+    Args:
+        pattern: binaries of a previous solution by block name, as returned by
+            binary_pattern. Blocks this model doesn't have are ignored
+
+    Returns:
+        result dict of NativeModel.solve plus branched and fixed_binaries
+    """
+    start = time.perf_counter()
+    binaries = np.flatnonzero(model.integrality)
+
+    relaxed = model.relaxation()
+    if not relaxed["success"]:
+        return dict(model.solve(), branched=True, fixed_binaries=0)
+
+    bound = relaxed["objective"]
+    tol = SCREEN_TOL * max(1.0, abs(bound))
+
+    def answer(status, result):
+        return {
+            "status": status,
+            "success": True,
+            "objective": result["objective"],
+            "x": result["x"],
+            "solving_time": time.perf_counter() - start,
+            "nodes": 0,
+            "gap": 0.0,
+            "dual_bound": bound,
+            "branched": False,
+            "fixed_binaries": len(binaries),
+        }
+
+    values = relaxed["x"][binaries]
+    if np.abs(values - np.round(values)).max(initial=0) <= 1e-6:
+        # la relajacion ya es entera, se resuelve con los binarios en su valor
+        lb, ub = model.lb.copy(), model.ub.copy()
+        lb[binaries] = ub[binaries] = np.round(values)
+        fixed = model.relaxation((lb, ub))
+        if fixed["success"]:
+            return answer("optimal (integral relaxation)", fixed)
+
+    incumbent = None
+    if pattern:
+        lb, ub = model.lb.copy(), model.ub.copy()
+        for name, value in pattern.items():
+            if name in model.blocks:
+                offset, shape = model.blocks[name]
+                lb[offset : offset + shape[0]] = ub[offset : offset + shape[0]] = value
+        fixed = model.relaxation((lb, ub))
+        if fixed["success"]:
+            if bound - fixed["objective"] <= tol:
+                return answer("optimal (previous binaries at the relaxation bound)", fixed)
+            incumbent = fixed["objective"]
+
+    # un binario en su cota cuyo costo reducido deja por debajo del incumbente todo plan
+    # que lo cambie conserva su valor
+    lb, ub = model.lb.copy(), model.ub.copy()
+    n_fixed = 0
+    if incumbent is not None:
+        at_bound = np.abs(values - np.round(values)) <= 1e-6
+        cut = bound - np.abs(relaxed["reduced_costs"][binaries]) < incumbent - tol
+        fix = binaries[at_bound & cut]
+        lb[fix] = ub[fix] = np.round(relaxed["x"][fix])
+        n_fixed = len(fix)
+
+    result = model.solve(bounds=(lb, ub))
+    result["solving_time"] = time.perf_counter() - start
+    if result["dual_bound"] is not None:
+        result["dual_bound"] = min(result["dual_bound"], bound)
+
+    return dict(result, branched=True, fixed_binaries=n_fixed)
+
+
+def run_native_point(
+    experiment,
+    point,
+    params,
+    shared,
+    price_tensors,
+    log_dir,
+    previous=None,
+    models=None,
+    screen=False,
+):
+    name = point_name(experiment, point)
+    params = point_params(params, point)
+
+    prices = price_tensors.get(point.get("disc_fact"), shared["prices"])
+    inputs = {
+        "prices": prices,
+        "costs": shared["costs"],
+        "initial_stock": shared["initial_stock"],
+        "august_periods": shared["august_periods"],
+    }
+    if models is None:
+        live = live_cells(shared["initial_stock"], prices, shared["august_periods"], params)
+
+    rows, patterns, heuristic_pattern = [], {}, None
+    for suffix, strategy in NATIVE_STRATEGIES:
+        if models is None:
+            model = NativeModel(PARAMS=params, strategy=strategy, live=live, **inputs)
+        else:
+            # el modelo de la cadena, con los precios y el costo fijo de este punto
+            model = models[suffix]
+            model.set_prices(prices, params["fix_cost_sales"])
+
+        # el patron del punto vecino con el mismo modelo, o el de la heuristica de este punto
+        pattern = None
+        if screen and previous is not None:
+            pattern = previous.get(suffix, heuristic_pattern if suffix == "" else None)
+
+        result = screened_solve(model, pattern) if screen else model.solve()
+        model.write_log(os.path.join(log_dir, f"{name}{suffix}.log"), result)
+        row = {
+            **point,
+            "model": MODEL_NAMES[suffix],
+            "objective": result["objective"],
+            "solving_time": result["solving_time"],
+            "first_solution_time": None,
+            "warm_start": pattern is not None,
+            "experiment": name,
+        }
+        if screen:
+            row["branched"] = result["branched"]
+            row["fixed_binaries"] = result["fixed_binaries"]
+        rows.append(row)
+
+        patterns[suffix] = None
+        if screen and result["success"]:
+            patterns[suffix] = binary_pattern(model, result["x"])
+            if suffix == "_h":
+                heuristic_pattern = patterns[suffix]
+
+    log.info(f"{name} done")
+
+    return rows, patterns
@@ -0,0 +1,103 @@
+import logging
+import os
+import warnings
+import json
+from preprocessing.config import (
+    PARAMS,
+    PATH_DAT_FILES,
+    PESOS_PROMEDIO,
+    path_parte_diario,
+    path_scrapped_prices_df,
+    intervalos_madurez,
+)
+from preprocessing.data_prep import delete_log_files
+from preprocessing.experiment_runner import params_record, run_experiments_parallel
+
+warnings.filterwarnings("ignore")
+
+# number of experiments solved at once, each one in its own workspaces/<experiment> directory
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", os.cpu_count()))
+
+# "scip" solves the .zpl models in docker, "native" solves in memory with HiGHS
+SOLVER = os.environ.get("SOLVER", "scip")
+
+# "window,step" solves the native models by rolling horizon, e.g. ROLLING_HORIZON=48,24
+ROLLING_HORIZON = os.environ.get("ROLLING_HORIZON")
+
+if __name__ == "__main__":
+    log = logging.getLogger("logger")
+    log.setLevel(logging.DEBUG)
+    formatter = logging.Formatter("%(message)s")
+    fh = logging.FileHandler("test.log", mode="w", encoding="utf-8")
+    fh.setLevel(logging.DEBUG)
+    fh.setFormatter(formatter)
+    log.addHandler(fh)
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    ch.setFormatter(formatter)
+    log.addHandler(ch)
+
+    delete_log_files("lp_logs")
+
+    # business parameter changes go in the experiment itself, each worker gets its own PARAMS copy
+    exp_grid = {
+        # # var prices
+        '2019_24periods' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': False, "mantain_c3_stock": 1},
+        'm2019_24periods' : {'fecha_inicio': '07/06/2019', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '03/06/2021', 'fix_prices': False, "mantain_c3_stock": 1},
+        '2020_24periods' : {'fecha_inicio': '03/01/2020', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '06/01/2022', 'fix_prices': False, "mantain_c3_stock": 1},
+        '2019_36periods' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 36, 'fecha_fin_ejercicio': '06/01/2022', 'fix_prices': False, "mantain_c3_stock": 1},
+        '2019_42periods' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 42, 'fecha_fin_ejercicio': '02/06/2022', 'fix_prices': False, "mantain_c3_stock": 1},
+        '2019_48periods' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 48, 'fecha_fin_ejercicio': '05/01/2023', 'fix_prices': False, "mantain_c3_stock": 1},
+        
+        # # fix prices
+        '2019_24periods_fix_prices' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': True, "mantain_c3_stock": 1},
+        'm2019_24periods_fix_prices' : {'fecha_inicio': '07/06/2019', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '03/06/2021', 'fix_prices': True, "mantain_c3_stock": 1},
+        '2020_24periods_fix_prices' : {'fecha_inicio': '03/01/2020', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '06/01/2022', 'fix_prices': True, "mantain_c3_stock": 1},
+        '2019_36periods_fix_prices' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 36, 'fecha_fin_ejercicio': '06/01/2022', 'fix_prices': True, "mantain_c3_stock": 1},
+        '2019_42periods_fix_prices' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 42, 'fecha_fin_ejercicio': '02/06/2022', 'fix_prices': True, "mantain_c3_stock": 1},
+        '2019_48periods_fix_prices' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 48, 'fecha_fin_ejercicio': '05/01/2023', 'fix_prices': True, "mantain_c3_stock": 1},
+
+        # # forcasted prices, fix and var prices
+        '2019_120periods_fcst' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 120, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': False, "mantain_c3_stock": 1},
+        '2019_120periods_fix_prices_fcst' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 120, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': True, "mantain_c3_stock": 1},
+        '2023_24periods_fcst': {'fecha_inicio': '05/01/2023', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '05/01/2025', 'fix_prices': False, "mantain_c3_stock": 1},
+        '2023_48periods_fcst': {'fecha_inicio': '05/01/2023', 'periodos_modelo': 48, 'fecha_fin_ejercicio': '05/01/2027', 'fix_prices': False, "mantain_c3_stock": 1},
+        '2023_72periods_fcst': {'fecha_inicio': '05/01/2023', 'periodos_modelo': 72, 'fecha_fin_ejercicio': '05/01/2029', 'fix_prices': False, "mantain_c3_stock": 1},
+
+        # changes in business parameters
+        '2019_24periods_p_index_70' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': False, "mantain_c3_stock": 1, "pregnancy_index": 0.7},
+        '2019_24periods_fix_sales_costs_100' : {'fecha_inicio': '18/01/2019', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': False, "mantain_c3_stock": 1, "fix_cost_sales": 100},
+
+        # discount factor experiments
+        '2019_24periods_disc_fact_0.5perc': {'fecha_inicio': '18/01/2019', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': False, "mantain_c3_stock": 1, 'disc_fact': 0.5},
+        '2019_24periods_disc_fact_1perc': {'fecha_inicio': '18/01/2019', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': False, "mantain_c3_stock": 1, 'disc_fact': 1.0},
+        '2019_120periods_fcst_disc_fact_0.5perc': {'fecha_inicio': '18/01/2019', 'periodos_modelo': 120, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': False, "mantain_c3_stock": 1, 'disc_fact': 0.5},
+        '2019_120periods_fcst_disc_fact_1perc': {'fecha_inicio': '18/01/2019', 'periodos_modelo': 120, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': False, "mantain_c3_stock": 1, 'disc_fact': 1.0},
+    }
+
+    # antes de correr, los resultados se mezclan en exp_grid
+    params = params_record(PARAMS, exp_grid)
+
+    cache_stats = run_experiments_parallel(
+        exp_grid,
+        PARAMS,
+        PATH_DAT_FILES,
+        path_scrapped_prices_df,
+        PESOS_PROMEDIO,
+        path_parte_diario,
+        intervalos_madurez,
+        max_workers=MAX_WORKERS,
+        solver=SOLVER,
+        rolling_horizon=(
+            tuple(int(v) for v in ROLLING_HORIZON.split(",")) if ROLLING_HORIZON else None
+        ),
+    )
+    log.info(f"input cache stats: {cache_stats}")
+
+    log.info("saving experiment results at lp_logs/experiments_results.json")
+    with open("lp_logs/experiments_results.json", "w") as json_file:
+        json.dump(exp_grid, json_file)
+
+    log.info("saving experiment params at lp_logs/params.json")
+    with open("lp_logs/params.json", "w") as json_file:
+        json.dump(params, json_file)
@@ -0,0 +1,77 @@
+import logging
+import os
+import warnings
+import json
+from preprocessing.config import (
+    PARAMS,
+    PATH_DAT_FILES,
+    PESOS_PROMEDIO,
+    path_parte_diario,
+    path_scrapped_prices_df,
+    intervalos_madurez,
+)
+from preprocessing.experiment_runner import experiment_params
+from preprocessing.sweep import point_name, point_params, run_sweep, sweep_chains
+
+warnings.filterwarnings("ignore")
+
+# number of grid chains solved at once, each point in its own workspaces/<experiment>/<point>
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", os.cpu_count()))
+
+# "scip" solves the .zpl models in docker, "native" solves in memory with HiGHS
+SOLVER = os.environ.get("SOLVER", "scip")
+
+if __name__ == "__main__":
+    log = logging.getLogger("logger")
+    log.setLevel(logging.DEBUG)
+    formatter = logging.Formatter("%(message)s")
+    fh = logging.FileHandler("test.log", mode="w", encoding="utf-8")
+    fh.setLevel(logging.DEBUG)
+    fh.setFormatter(formatter)
+    log.addHandler(fh)
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    ch.setFormatter(formatter)
+    log.addHandler(ch)
+
+    os.makedirs("lp_logs", exist_ok=True)
+
+    # the business parameter and discount factor experiments of the 3_rev grid, as one sweep
+    experiment = "2019_24periods"
+    items = {'fecha_inicio': '18/01/2019', 'periodos_modelo': 24, 'fecha_fin_ejercicio': '08/01/2021', 'fix_prices': False, "mantain_c3_stock": 1}
+    grid = {
+        "pregnancy_index": [0.7, PARAMS["pregnancy_index"]],
+        "fix_cost_sales": [PARAMS["fix_cost_sales"], 100],
+        "disc_fact": [0.0, 0.5, 1.0],
+    }
+
+    table = run_sweep(
+        experiment,
+        items,
+        grid,
+        PARAMS,
+        PATH_DAT_FILES,
+        path_scrapped_prices_df,
+        PESOS_PROMEDIO,
+        path_parte_diario,
+        intervalos_madurez,
+        max_workers=MAX_WORKERS,
+        solver=SOLVER,
+    )
+    log.info(f"\n{table.drop(columns='experiment').to_string()}")
+
+    # PARAMS base y los params con que corrio cada punto, como params_record
+    params = experiment_params(PARAMS, items)
+    log.info("saving sweep params at lp_logs/params.json")
+    with open("lp_logs/params.json", "w") as json_file:
+        json.dump(
+            {
+                **PARAMS,
+                "experiments": {
+                    point_name(experiment, point): point_params(params, point)
+                    for chain in sweep_chains(grid)
+                    for point in chain
+                },
+            },
+            json_file,
+        )